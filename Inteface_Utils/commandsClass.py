@@ -92,6 +92,42 @@ commands_data = [
         ],
         'description': 'Функция для методов чтения контракт'
     },
+    {
+        'name': 'watch',
+        'after_name': '-wt',
+        'function': 'watch_command',
+        'arguments': [
+            {
+                'name': '--method',
+                'after_name': '-m',
+                'is_input': True,
+                'type': list,
+                'description': '(method или method:arg1:arg2, через пробел) Методы чтения для отслеживания'
+            },
+            {
+                'name': '--interval',
+                'after_name': '-t',
+                'is_input': True,
+                'type': float,
+                'description': '(секунды, optional) Интервал опроса новых блоков. По умолчанию подбирается по интервалу блоков сети'
+            },
+            {
+                'name': '--blocks',
+                'after_name': '-b',
+                'is_input': True,
+                'type': int,
+                'description': '(optional) Количество блоков, после которого отслеживание завершается'
+            },
+            {
+                'name': '--output',
+                'after_name': '-o',
+                'is_input': True,
+                'type': str,
+                'description': '(path, optional) CSV-файл для записи временного ряда изменений'
+            }
+        ],
+        'description': 'Отслеживает значения методов чтения на каждом новом блоке и выводит изменения'
+    },
     {
         'name': 'command_story',
         'after_name': '-cs',
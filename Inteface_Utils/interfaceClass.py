@@ -1,4 +1,11 @@
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from Web3_Utils import Web3Utils, UserWallet, config
+from Web3_Utils.blockWatcherClass import BlockWatcher
 
 from Inteface_Utils.commandsClass import Command, Arguments
 
@@ -56,6 +63,8 @@ class Interface:
         'command_story': 'command_story',
         '-w': 'wallets_list',
         'wallets': 'wallets_list',
+        '-wt': 'watch',
+        'watch': 'watch',
     }
 
     arguments = {
@@ -70,17 +79,22 @@ class Interface:
         '-a': 'args',
         '--args': 'args',
         '-d': 'doubles',
-        '--doubles': 'doubles'
+        '--doubles': 'doubles',
+        '-t': 'interval',
+        '--interval': 'interval',
+        '-b': 'blocks',
+        '--blocks': 'blocks',
+        '-o': 'output',
+        '--output': 'output'
     }
 
     def __init__(self):
         self.web3 = None
         self.wallets = None
         self.command_context = None
-
-    def run(self):
-        print(f'Interface v.{self.interface_version} started')
-        command_handlers = {
+        # Методы чтения контракта, заполняются при инициализации контракта (init_command)
+        self.read_methods = []
+        self.command_handlers = {
             '-h': self.help_command,
             'help': self.help_command,
             '-r': self.read_method_command,
@@ -88,9 +102,14 @@ class Interface:
             '-i': self.init_command,
             'init': self.init_command,
             '-cs': self.command_story_command,
-            'command_story': self.command_story_command
+            'command_story': self.command_story_command,
+            '-wt': self.watch_command,
+            'watch': self.watch_command
         }
 
+    def run(self):
+        print(f'Interface v.{self.interface_version} started')
+
         while True:
             request_text = input('Enter command_name:\n')
             result = self.parse_text_to_dict(request_text)
@@ -98,7 +117,7 @@ class Interface:
                 print('Incorrect command_name or input. \n[h], [help]: Справка')
                 continue
 
-            handler = command_handlers.get(self.command_context.command_name)
+            handler = self.command_handlers.get(self.command_context.command_name)
             if handler:
                 handler()
             else:
@@ -134,7 +153,7 @@ class Interface:
             return
 
         method = None
-        read_methods = self.web3.list_methods()['read_methods']
+        read_methods = self.read_methods
 
         if '-m' in self.command_context.arguments or '--method' in self.command_context.arguments:
             if '-m' in self.command_context.arguments:
@@ -295,9 +314,72 @@ class Interface:
         self.web3 = Web3Utils(contract_config=network,
                               contract_address=contract_address,
                               path_abi=path_abi)
+        self.read_methods = self.web3.list_methods()['read_methods']
 
         print('Web3Utils initialized')
 
+    def watch_command(self):
+        """
+        Отслеживает значения методов чтения на каждом новом блоке и выводит только изменения.
+
+        Методы указываются в -m в виде method или method:arg1:arg2. Все методы читаются одним пакетным
+        запросом, зафиксированным на блоке. При указании -o изменения дописываются в CSV-файл
+        (block, time, значения всех методов) для построения графиков.
+        """
+        if self.web3 is None:
+            print('Не заданы конфигурационные методы сети и контракта\n')
+            return
+
+        arguments = self.command_context.arguments
+        specs = self.get_argument(arguments, '-m', '--method')
+        if specs is None:
+            print('Укажите методы: -m method или method:arg1:arg2')
+            return
+        if type(specs) is str:
+            specs = [specs]
+
+        views = []
+        try:
+            for spec in specs:
+                method_name, *args = spec.split(':')
+                method, call_args = self.prepare_read({'-m': method_name, '-a': args})
+                views.append((spec, method['name'], call_args))
+            interval = self.get_argument(arguments, '-t', '--interval')
+            interval = float(interval) if interval is not None else None
+            max_blocks = self.get_argument(arguments, '-b', '--blocks')
+            max_blocks = int(max_blocks) if max_blocks is not None else None
+        except ValueError as e:
+            print(e)
+            return
+
+        output_path = self.get_argument(arguments, '-o', '--output')
+        series = open(output_path, 'a', encoding='utf-8') if output_path else None
+        if series is not None and series.tell() == 0:
+            series.write(','.join(['block', 'time'] + specs) + '\n')
+
+        print(f'Watching {", ".join(specs)}. Ctrl+C для остановки')
+        watcher = BlockWatcher(self.web3, poll_interval=interval)
+        previous = {}
+        try:
+            for block_number in watcher.blocks(max_blocks):
+                values = self.web3.batch_call([(method_name, args, block_number) for _, method_name, args in views])
+                current = dict(zip(specs, values))
+                changes = {spec: value for spec, value in current.items() if spec not in previous or previous[spec] != value}
+                if not changes:
+                    continue
+                for spec, value in changes.items():
+                    print(f'[{block_number}] {spec}: {previous.get(spec, "-")} -> {value}')
+                if series is not None:
+                    series.write(','.join([str(block_number), f'{time.time():.3f}'] +
+                                          [str(current[spec]) for spec in specs]) + '\n')
+                    series.flush()
+                previous = current
+        except KeyboardInterrupt:
+            print('Watch stopped')
+        finally:
+            if series is not None:
+                series.close()
+
     def command_story_command(self):
         doubles = False
         if '-d' in self.command_context.arguments or '--doubles' in self.command_context.arguments:
@@ -318,33 +400,48 @@ class Interface:
                 print(f'\t\t{self.arguments[arg]}   {value}')
 
 
+    @staticmethod
+    def parse_command(text):
+        """
+        Разбирает строку команды на имя команды и словарь аргументов без побочных эффектов.
+
+        Returns:
+            tuple[str, dict]: Имя команды и аргументы (значение — строка или список строк).
+
+        Raises:
+            IndexError: Если строка пустая.
+        """
+        parts = text.split(' ')
+        cleaned_parts = [part.strip() for part in parts if part.strip() != '']
+
+        # Первое слово — это команда, не идет в словарь аргументов
+        command_name = cleaned_parts.pop(0)
+
+        dictionary = {}
+        key = None
+        values = ''
+        for part in cleaned_parts:
+            if part.startswith('-'):  # Проверяем, является ли часть ключом
+                if key:
+                    # Присваиваем предыдущему ключу собранные значения (как строку или список)
+                    dictionary[key] = values if len(values.split(',')) == 1 else values.split(',')
+                key = part
+                values = ''
+            else:
+                # Собираем значения, относящиеся к ключу
+                values += (',' if values else '') + part
+
+        # Не забываем добавить последний набор данных
+        if key and values:
+            dictionary[key] = values if len(values.split(',')) == 1 else values.split(',')
+
+        return command_name, dictionary
+
     def parse_text_to_dict(self, text):
         try:
+            command_name, dictionary = self.parse_command(text)
             command_context = CommandContext()
-            parts = text.split(' ')
-            cleaned_parts = [part.strip() for part in parts if part.strip() != '']
-
-            # Первое слово — это команда, не идет в словарь аргументов
-            command_context.command_name = cleaned_parts[0]
-            cleaned_parts.pop(0)
-
-            dictionary = {}
-            key = None
-            for part in cleaned_parts:
-                if part.startswith('-'):  # Проверяем, является ли часть ключом
-                    if key:
-                        # Присваиваем предыдущему ключу собранные значения (как строку или список)
-                        dictionary[key] = values if len(values.split(',')) == 1 else values.split(',')
-                    key = part
-                    values = ''
-                else:
-                    # Собираем значения, относящиеся к ключу
-                    values += (',' if values else '') + part
-
-            # Не забываем добавить последний набор данных
-            if key and values:
-                dictionary[key] = values if len(values.split(',')) == 1 else values.split(',')
-
+            command_context.command_name = command_name
             command_context.arguments = dictionary
             print(dictionary)
             self.command_context = command_context
@@ -353,6 +450,166 @@ class Interface:
             print(f"An error occurred: {e}")
             return False
 
+    @staticmethod
+    def get_argument(arguments, short_name, long_name, default=None):
+        if short_name in arguments:
+            return arguments[short_name]
+        return arguments.get(long_name, default)
+
+    def prepare_read(self, arguments):
+        """
+        Находит метод чтения и приводит аргументы команды read без интерактивного ввода.
+
+        Returns:
+            tuple[dict, list]: Описание метода и список аргументов вызова.
 
-interface = Interface()
-interface.run()
+        Raises:
+            ValueError: Если метод не найден или аргументы не соответствуют входам метода.
+        """
+        method_name = self.get_argument(arguments, '-m', '--method')
+        if method_name is None:
+            raise ValueError('Method is not specified')
+
+        method = None
+        if method_name.isdigit() and 0 < int(method_name) <= len(self.read_methods):
+            method = self.read_methods[int(method_name) - 1]
+        else:
+            for read_method in self.read_methods:
+                if read_method['name'] == method_name:
+                    method = read_method
+                    break
+        if method is None:
+            raise ValueError('Incorrect method_name')
+
+        args = self.get_argument(arguments, '-a', '--args', [])
+        if type(args) is str:
+            args = [args]
+        if len(method['inputs']) != len(args):
+            raise ValueError(f'Incorrect argument: inputs in method {len(method["inputs"])}, you entered {len(args)}')
+
+        args = list(args)
+        for number_input, (arg, input_method) in enumerate(zip(args, method['inputs'])):
+            if input_method['type'] == 'uint256':
+                if not arg.isdigit():
+                    raise ValueError(f'Incorrect argument {number_input + 1} {input_method["name"]}: uint256')
+                args[number_input] = int(arg)
+        return method, args
+
+    def init_script(self, arguments):
+        """
+        Инициализирует Web3Utils по аргументам команды init без интерактивного ввода.
+
+        Raises:
+            ValueError: Если сеть или адрес контракта не указаны или указаны неверно.
+        """
+        chain_id = self.get_argument(arguments, '-n', '--network')
+        contract_address = self.get_argument(arguments, '-c', '--contract')
+        path_abi = self.get_argument(arguments, '-pa', '--path_abi')
+
+        network = None
+        for network_config in config.ContractConfig.all_configs:
+            if chain_id is not None and str(network_config.chain_id) == chain_id:
+                network = network_config
+                break
+        if network is None:
+            raise ValueError('Incorrect chain_id')
+        if contract_address is None or len(contract_address) != 42:
+            raise ValueError('Incorrect contract_address')
+
+        self.web3 = Web3Utils(contract_config=network, contract_address=contract_address, path_abi=path_abi)
+        self.read_methods = self.web3.list_methods()['read_methods']
+
+    def run_script(self, lines, output=None, max_workers=16):
+        """
+        Выполняет команды из файла или потока без интерактивного ввода и выводит результаты в формате JSON Lines.
+
+        Поддерживаются команды init и read. Все команды выполняются на одном объекте Web3Utils, созданном
+        последней командой init. Команды read, идущие после одной и той же init, независимы и выполняются
+        параллельно в пуле потоков, результаты выводятся в порядке строк. Одновременно ожидают вывода не более
+        2 * max_workers чтений, поэтому память не растет с длиной скрипта. Пустые строки и строки,
+        начинающиеся с '#', пропускаются.
+
+        Args:
+            lines: Итерируемый источник строк команд (файл, sys.stdin, список).
+            output: Поток для вывода результатов. По умолчанию sys.stdout.
+            max_workers (int): Количество потоков для выполнения команд read.
+
+        Returns:
+            int: Количество команд, завершившихся ошибкой.
+        """
+        output = output or sys.stdout
+        errors = 0
+        pending = deque()
+
+        def write(record):
+            output.write(json.dumps(record, ensure_ascii=False, default=self._json_default) + '\n')
+
+        def drain(keep=0):
+            # Выводит чтения из начала очереди по порядку, пока в очереди больше keep чтений
+            nonlocal errors
+            while len(pending) > keep:
+                record, future = pending.popleft()
+                try:
+                    record['result'] = future.result()
+                except Exception as e:
+                    record['error'] = str(e)
+                    errors += 1
+                write(record)
+            output.flush()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for line_number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+
+                record = {'line': line_number}
+                try:
+                    command_name, arguments = self.parse_command(line)
+                    command = self.commands.get(command_name)
+                    record['command'] = command or command_name
+                    if command == 'read':
+                        if self.web3 is None:
+                            raise ValueError('Web3Utils is not initialized, use init first')
+                        method, args = self.prepare_read(arguments)
+                        record['method'] = method['name']
+                        record['args'] = args
+                        pending.append((record, executor.submit(self.web3.read_method, method['name'], *args)))
+                        if len(pending) >= 2 * max_workers:
+                            drain(max_workers)
+                        continue
+
+                    # Остальные команды меняют состояние, поэтому сначала дожидаемся уже запущенных чтений
+                    drain()
+                    if command == 'init':
+                        self.init_script(arguments)
+                        record['result'] = self.web3.contract_obj.address
+                    else:
+                        raise ValueError(f'Command {command_name} is not supported in script mode')
+                except Exception as e:
+                    drain()
+                    record['error'] = str(e)
+                    errors += 1
+                write(record)
+            drain()
+        return errors
+
+    @staticmethod
+    def _json_default(value):
+        if isinstance(value, (bytes, bytearray)):
+            return '0x' + bytes(value).hex()
+        return str(value)
+
+
+if __name__ == '__main__':
+    # python -m Inteface_Utils.interfaceClass [файл команд | -]
+    # Без аргументов и при вводе с терминала запускается интерактивный режим,
+    # иначе команды читаются из файла или stdin и выполняются в пакетном режиме
+    interface = Interface()
+    if len(sys.argv) > 1 and sys.argv[1] != '-':
+        with open(sys.argv[1], 'r', encoding='utf-8') as script:
+            sys.exit(1 if interface.run_script(script) else 0)
+    elif len(sys.argv) > 1 or not sys.stdin.isatty():
+        sys.exit(1 if interface.run_script(sys.stdin) else 0)
+    else:
+        interface.run()
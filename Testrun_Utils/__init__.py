@@ -1,2 +1,5 @@
 from .reportClass import TestRun
+from .reportSinkClass import JsonlReportSink, SqliteReportSink, open_report_sink, rebuild_report
+from .snapshotClass import ViewSet, Snapshot
+from .loadScenarioClass import LoadScenario
 from .testrunScenarioClass import TestrunScenario
@@ -0,0 +1,268 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from Web3_Utils import UserWallet
+from Web3_Utils.fundingPlannerClass import FundingPlanner
+from Web3_Utils.metricsClass import percentiles, to_ms
+
+
+class LoadScenario:
+    """
+    Нагрузочный сценарий для токен-контракта: смесь операций transfer/approve/transferFrom с заданной частотой.
+
+    Планирование открытое (open-loop): i-я транзакция отправляется в момент start + i / tps независимо от того,
+    подтвердились ли предыдущие, поэтому медленный узел не снижает подаваемую нагрузку, а отставание
+    от расписания учитывается в отчете. Транзакции распределяются по N производным кошелькам владельца,
+    nonce каждого кошелька ведется локально. Подтверждения собираются отдельным потоком пакетными
+    запросами квитанций.
+
+    Формат конфигурации (data):
+        wallets.owner_private_key: Ключ владельца, который пополняет кошельки нагрузки и может минтить токены.
+        id: Идентификатор прогона, входит в метку производных кошельков.
+        load.tps (float): Целевая частота отправки транзакций.
+        load.duration (float): Длительность отправки в секундах.
+        load.wallets (int): Количество кошельков нагрузки (не меньше 2).
+        load.mix (dict): Доли операций, например {'transfer': 0.6, 'approve': 0.2, 'transferFrom': 0.2}.
+        load.gas (int): Лимит газа одной транзакции. По умолчанию 100000.
+        load.max_workers (int): Количество потоков отправки. По умолчанию 32.
+        load.receipt_timeout (float): Сколько секунд ждать подтверждений после окончания отправки. По умолчанию 120.
+        load.seed (int, optional): Зерно генератора для воспроизводимой последовательности операций.
+    """
+    operations = ('transfer', 'approve', 'transferFrom')
+
+    def __init__(self, web3_utils, data):
+        self.web3_obj = web3_utils
+        self.owner = UserWallet.generate_user_from_private_key(data["wallets"]["owner_private_key"], "owner")
+        self.id = data['id']
+        load = data['load']
+        self.tps = float(load['tps'])
+        self.duration = float(load['duration'])
+        self.wallet_count = max(int(load.get('wallets', 4)), 2)
+        self.mix = load.get('mix', {'transfer': 1})
+        self.gas = load.get('gas', 100000)
+        self.max_workers = load.get('max_workers', 32)
+        self.receipt_timeout = load.get('receipt_timeout', 120)
+        self.random = random.Random(load.get('seed'))
+
+        unknown = set(self.mix) - set(self.operations)
+        if unknown:
+            raise ValueError(f"Неизвестные операции в mix: {', '.join(sorted(unknown))}")
+
+        self.wallets = [UserWallet.generate_derived_wallet(self.owner.private_key, f'{self.id}:load:{index}',
+                                                           f'load{index}')
+                        for index in range(self.wallet_count)]
+        self.amount = 1
+        self._nonces = {}
+        self._wallet_locks = {wallet.public_key: threading.Lock() for wallet in self.wallets}
+        self._records = []
+        self._records_lock = threading.Lock()
+
+    def total_transactions(self) -> int:
+        return int(self.tps * self.duration)
+
+    def prepare(self):
+        """
+        Пополняет кошельки нагрузки нативной валютой на газ и токенами, а также выдает каждому кошельку
+        аллованс для следующего по кругу кошелька, чтобы тот мог выполнять transferFrom.
+        Пополнение выполняется через FundingPlanner, уже пополненные кошельки пропускаются.
+        """
+        web3 = self.web3_obj.web3
+        gas_price = web3.eth.gasPrice
+        txs_per_wallet = self.total_transactions() // self.wallet_count + 2
+        native_amount = int(txs_per_wallet * self.gas * gas_price * 1.2)
+        token_amount = txs_per_wallet * self.amount * 2
+
+        FundingPlanner(self.web3_obj, [self.owner], token_method='mint').fund(
+            [(wallet.public_key, native_amount, token_amount) for wallet in self.wallets])
+
+        tx_hashes = []
+        for index, wallet in enumerate(self.wallets):
+            spender = self.wallets[(index + 1) % self.wallet_count]
+            if self.web3_obj.read_method('allowance', wallet.public_key, spender.public_key) < token_amount:
+                tx_hashes.append(self.web3_obj.send_transaction('approve', spender.public_key, 2 ** 255,
+                                                                user_wallet=wallet, gas=self.gas))
+        self._wait_all(tx_hashes)
+
+        for wallet in self.wallets:
+            self._nonces[wallet.public_key] = web3.eth.getTransactionCount(wallet.public_key, 'pending')
+
+    def _wait_all(self, tx_hashes):
+        for tx_hash in tx_hashes:
+            if tx_hash:
+                self.web3_obj.wait_transaction_receipt(tx_hash)
+
+    def plan(self) -> list:
+        """
+        Составляет расписание нагрузки: список (смещение в секундах, операция, индекс кошелька).
+        """
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        return [(index / self.tps, self.random.choices(names, weights)[0], index % self.wallet_count)
+                for index in range(self.total_transactions())]
+
+    def _send(self, scheduled_at, operation, wallet_index):
+        wallet = self.wallets[wallet_index]
+        partner = self.wallets[(wallet_index + 1) % self.wallet_count]
+        if operation == 'transfer':
+            sender, args = wallet, (partner.public_key, self.amount)
+        elif operation == 'approve':
+            sender, args = wallet, (partner.public_key, 2 ** 255)
+        else:
+            # partner имеет аллованс от wallet и переводит токены wallet на свой адрес
+            sender, args = partner, (wallet.public_key, partner.public_key, self.amount)
+
+        record = {'operation': operation, 'scheduled': scheduled_at, 'submitted': None, 'included': None,
+                  'tx_hash': None, 'status': None, 'gas_used': None, 'error': None}
+        # Nonce выдается и транзакция отправляется под блокировкой кошелька, чтобы узел получал
+        # транзакции одного отправителя в порядке nonce
+        with self._wallet_locks[sender.public_key]:
+            nonce = self._nonces[sender.public_key]
+            record['started'] = time.monotonic()
+            try:
+                tx_hash = self.web3_obj.send_transaction(operation, *args, user_wallet=sender, gas=self.gas,
+                                                         nonce=nonce)
+            except Exception as e:
+                print(f"Ошибка при отправке транзакции {operation}: {e}")
+                tx_hash = False
+            if tx_hash:
+                self._nonces[sender.public_key] = nonce + 1
+        record['submitted'] = time.monotonic()
+        if tx_hash:
+            record['tx_hash'] = tx_hash
+        else:
+            record['error'] = 'send failed'
+        with self._records_lock:
+            self._records.append(record)
+
+    def _collect_receipts(self, stop_event, deadline_holder):
+        """
+        Запрашивает квитанции еще не подтвержденных транзакций одним пакетным запросом и отмечает момент их
+        обнаружения как момент включения. Опросы планируются по ожидаемому появлению блоков
+        (Web3Utils.block_time_estimator).
+        """
+        estimator = self.web3_obj.block_time_estimator
+        estimator.ensure(self.web3_obj)
+        while True:
+            with self._records_lock:
+                pending = [record for record in self._records if record['tx_hash'] and record['included'] is None]
+            if pending:
+                receipts = self.web3_obj.get_transaction_receipts([record['tx_hash'] for record in pending])
+                now = time.monotonic()
+                for record, receipt in zip(pending, receipts):
+                    if receipt:
+                        estimator.observe(self.web3_obj.to_int(receipt['blockNumber']))
+                        record['included'] = now
+                        record['status'] = bool(self.web3_obj.to_int(receipt['status']))
+                        record['gas_used'] = self.web3_obj.to_int(receipt['gasUsed'])
+            elif stop_event.is_set():
+                return
+            if stop_event.is_set() and deadline_holder[0] is not None and time.monotonic() > deadline_holder[0]:
+                return
+            estimator.sleep()
+
+    def run(self, prepare=True) -> dict:
+        """
+        Выполняет нагрузку по расписанию и возвращает отчет (см. build_report).
+
+        Args:
+            prepare (bool): Пополнить кошельки нагрузки перед запуском.
+        """
+        if prepare:
+            self.prepare()
+        elif not self._nonces:
+            for wallet in self.wallets:
+                self._nonces[wallet.public_key] = self.web3_obj.web3.eth.getTransactionCount(wallet.public_key,
+                                                                                             'pending')
+
+        schedule = self.plan()
+        self._records = []
+        stop_event = threading.Event()
+        deadline_holder = [None]
+        collector = threading.Thread(target=self._collect_receipts, args=(stop_event, deadline_holder), daemon=True)
+        collector.start()
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for offset, operation, wallet_index in schedule:
+                delay = start + offset - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._send, start + offset, operation, wallet_index)
+        send_finished = time.monotonic()
+
+        deadline_holder[0] = send_finished + self.receipt_timeout
+        stop_event.set()
+        collector.join()
+        return self.build_report(start, send_finished)
+
+    def build_report(self, start, send_finished) -> dict:
+        """
+        Считает итоги нагрузки: фактическую частоту отправки и подтверждения, перцентили задержки от отправки
+        до включения и отставания от расписания, долю откатившихся транзакций и газ по операциям.
+        """
+        records = self._records
+        sent = [record for record in records if record['tx_hash']]
+        included = [record for record in sent if record['included'] is not None]
+        reverted = [record for record in included if record['status'] is False]
+        last_included = max((record['included'] for record in included), default=send_finished)
+
+        operations = {}
+        for name in self.mix:
+            op_records = [record for record in included if record['operation'] == name]
+            operations[name] = {
+                'sent': sum(1 for record in sent if record['operation'] == name),
+                'included': len(op_records),
+                'reverted': sum(1 for record in op_records if record['status'] is False),
+                'gasUsed': percentiles([record['gas_used'] for record in op_records]),
+                'latencyMs': percentiles([to_ms(record['included'] - record['submitted']) for record in op_records])
+            }
+
+        return {
+            'dateTime': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'targetTps': self.tps,
+            'duration': self.duration,
+            'wallets': self.wallet_count,
+            'scheduled': len(records),
+            'sent': len(sent),
+            'sendErrors': len(records) - len(sent),
+            'included': len(included),
+            'pending': len(sent) - len(included),
+            'achievedSendTps': round(len(sent) / max(send_finished - start, 1e-9), 3),
+            'achievedIncludedTps': round(len(included) / max(last_included - start, 1e-9), 3),
+            'revertRate': round(len(reverted) / len(included), 4) if included else None,
+            # Задержка считается от запланированного момента отправки, чтобы отставание генератора
+            # от расписания не скрывало медленные ответы узла
+            'latencyMs': percentiles([to_ms(record['included'] - record['scheduled']) for record in included]),
+            'submitToInclusionMs': percentiles([to_ms(record['included'] - record['submitted'])
+                                                for record in included]),
+            'scheduleLagMs': percentiles([to_ms(record['started'] - record['scheduled']) for record in records]),
+            'operations': operations
+        }
+
+    @staticmethod
+    def view_results(report):
+        print(f"Нагрузочный прогон: {report['dateTime']}")
+        print(f"Целевая частота: {report['targetTps']} tx/s, длительность: {report['duration']} с, "
+              f"кошельков: {report['wallets']}")
+        print(f"Запланировано: {report['scheduled']}, отправлено: {report['sent']}, ошибок отправки: "
+              f"{report['sendErrors']}, подтверждено: {report['included']}, не подтверждено: {report['pending']}")
+        print(f"Фактическая частота отправки: {report['achievedSendTps']} tx/s, "
+              f"подтверждения: {report['achievedIncludedTps']} tx/s")
+        print(f"Доля откатившихся транзакций: {report['revertRate']}")
+        for key in ('latencyMs', 'submitToInclusionMs', 'scheduleLagMs'):
+            print(f"{key}: " + ", ".join(f"{name}={value}" for name, value in report[key].items()))
+        for name, stats in report['operations'].items():
+            print(f"\nОперация {name}: отправлено {stats['sent']}, подтверждено {stats['included']}, "
+                  f"откатилось {stats['reverted']}")
+            print("    gasUsed: " + ", ".join(f"{key}={value}" for key, value in stats['gasUsed'].items()))
+            print("    latencyMs: " + ", ".join(f"{key}={value}" for key, value in stats['latencyMs'].items()))
+
+    @staticmethod
+    def save_json(report, path="load_report.json"):
+        with open(path, "w", encoding="utf-8") as json_file:
+            json.dump(report, json_file, ensure_ascii=False, indent=4)
+        return report
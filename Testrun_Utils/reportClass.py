@@ -1,6 +1,10 @@
 from enum import Enum, auto
 from Web3_Utils.classWeb3Utils import Web3Utils
+from Web3_Utils.metricsClass import TimingRecorder, to_ms
+from Testrun_Utils.reportSinkClass import summarize, summarize_timings
 import json
+import threading
+import time
 
 
 class TestResult(Enum):
@@ -11,17 +15,31 @@ class TestResult(Enum):
 
 
 class TestStep:
-    def __init__(self, name, description, expected_result=None, actual_result=None, result=None):
+    """
+    Шаг тест-кейса. Длительность шага (duration_ms) считается по монотонным часам от завершения предыдущего
+    шага (для первого шага — от начала тест-кейса) до установки результата, поэтому включает транзакции
+    и чтения, выполненные ради этой проверки.
+    """
+    __slots__ = ('name', 'description', 'expected_result', 'actual_result', 'result', 'started', 'finished')
+
+    def __init__(self, name, description, expected_result=None, actual_result=None, result=None, started=None):
         self.name = name
         self.description = description
         self.expected_result = expected_result
         self.actual_result = actual_result
         self.result: TestResult | None = result
+        self.started = time.monotonic() if started is None else started
+        self.finished = None
+
+    @property
+    def duration_ms(self) -> float | None:
+        return None if self.finished is None else to_ms(self.finished - self.started)
 
     # Метод для установки фактического результата и результата шага
     def set_results(self, expected_result, actual_result):
         self.expected_result = expected_result
         self.actual_result = actual_result
+        self.finished = time.monotonic()
 
         # Автоматическая установка результата на основе сравнения ожидаемого и фактического
         if self.expected_result == self.actual_result:
@@ -30,23 +48,68 @@ class TestStep:
             self.result = TestResult.TOTAL_FAILURE
 
 
+class TransactionRecord:
+    """
+    Транзакция тест-кейса, статус которой определяется не в момент добавления, а позже.
+
+    Статус, использованный газ и номер блока заполняются одним пакетным запросом квитанций
+    для всех транзакций тест-рана (TestRun.resolve_transactions) либо напрямую через set_receipt,
+    поэтому добавление транзакции в тест-кейс не ожидает ее подтверждения.
+    """
+    __slots__ = ('tx_hash', 'description', 'url', 'web3_utils', 'tx_status', 'gas_used', 'block_number', 'resolved')
+
+    def __init__(self, tx_hash, description, web3_utils):
+        self.tx_hash = tx_hash
+        self.description = description
+        self.url = web3_utils.give_url_tx(tx_hash) if tx_hash else None
+        self.web3_utils = web3_utils
+        self.tx_status: bool | None = None
+        self.gas_used: int | None = None
+        self.block_number: int | None = None
+        self.resolved = not tx_hash
+
+    def set_receipt(self, receipt):
+        self.tx_status = bool(self.web3_utils.to_int(receipt['status']))
+        self.gas_used = self.web3_utils.to_int(receipt['gasUsed'])
+        self.block_number = self.web3_utils.to_int(receipt['blockNumber'])
+        self.resolved = True
+
+    # Доступ по ключам для совместимости со словарями, которые раньше хранились в TestCase.transactions
+    def __getitem__(self, key):
+        return {'url': self.url, 'description': self.description, 'tx_status': self.tx_status}[key]
+
+
 class TestCase:
-    def __init__(self, name, description):
+    """
+    Тест-кейс: шаги, транзакции и результат.
+
+    Атрибут timings (TimingRecorder) собирает длительности операций Web3Utils, выполненных в потоке
+    тест-кейса от его создания в TestRun.add_test_case до вызова set_result.
+    """
+    __slots__ = ('name', 'description', 'steps', 'transactions', 'result', 'run', 'timings')
+
+    def __init__(self, name, description, run=None):
         self.name = name
         self.description = description
         self.steps = []
         self.transactions = []
         self.result: TestResult | None = None
+        self.run = run
+        self.timings = TimingRecorder()
 
     def add_step(self, name, description):
-        teststep = TestStep(name, description)
+        if self.steps:
+            started = self.steps[-1].finished
+        else:
+            started = self.timings.started
+        teststep = TestStep(name, description, started=started)
         self.steps.append(teststep)
         return teststep
 
     def add_transaction(self, tx_hash: str, description: str, web3_utils: Web3Utils):
-        tx_url = web3_utils.give_url_tx(tx_hash)
-        tx_status = web3_utils.get_transaction_status(tx_hash)
-        self.transactions.append({"url": tx_url, "description": description, 'tx_status': tx_status})
+        transaction = TransactionRecord(tx_hash, description, web3_utils)
+        self.transactions.append(transaction)
+        return transaction
 
     def set_result(self):
         count = 0
@@ -61,12 +124,23 @@ class TestCase:
         elif count == 0:
             self.result = TestResult.TOTAL_FAILURE
 
+        self.timings.deactivate()
+        if self.run is not None:
+            self.run.finish_case(self)
+
 
 from datetime import datetime
 
 
 class TestRun:
-    def __init__(self, description, date_time=None):
+    """
+    Тест-ран: набор тест-кейсов и итоговая статистика.
+
+    Если передан приемник отчета (sink, см. reportSinkClass), каждый тест-кейс записывается в поток сразу
+    после завершения (TestCase.set_result) и удаляется из памяти, а save_json собирает итоговый отчет из потока.
+    """
+
+    def __init__(self, description, date_time=None, sink=None):
         self.description = description
         self.date_time = date_time if date_time else datetime.now()
         self.test_cases = []
@@ -76,86 +150,198 @@ class TestRun:
             'total_failures': 0,
             'not_reproducible': 0
         }
+        self.sink = sink
+        self.parent = None
+        # Тест-кейсы, прочитанные из потока отчета; сбрасываются при записи нового кейса в поток
+        self._sink_cases = None
+        self._lock = threading.Lock()
+
+        if self.sink is not None:
+            self.sink.write_header({
+                "testRunDescription": self.description,
+                "dateTime": self.date_time.strftime('%Y-%m-%d %H:%M:%S')
+            })
 
     def add_test_case(self, name, description):
-        testcase = TestCase(name, description)
+        testcase = TestCase(name, description, self)
+        testcase.timings.activate()
         self.test_cases.append(testcase)
         return testcase
 
+    def fork(self):
+        """
+        Создает дочерний тест-ран для параллельного выполнения кейсов. Завершенные кейсы дочернего
+        тест-рана передаются в поток отчета родителя.
+        """
+        run = TestRun(self.description, self.date_time)
+        run.parent = self
+        return run
+
+    def finish_case(self, case):
+        """
+        Обрабатывает завершенный тест-кейс: при наличии потока отчета разрешает его транзакции,
+        записывает кейс в поток и освобождает память.
+        """
+        if self.parent is not None:
+            self.parent.finish_case(case)
+            if self.parent.sink is not None and case in self.test_cases:
+                self.test_cases.remove(case)
+            return
+
+        if self.sink is None:
+            return
+
+        self.resolve_transactions([case])
+        case_data = self.case_to_dict(case)
+        with self._lock:
+            self.sink.write_case(case_data)
+            self._sink_cases = None
+            if case in self.test_cases:
+                self.test_cases.remove(case)
+
+    def resolve_transactions(self, cases=None):
+        """
+        Заполняет статусы, газ и номера блоков всех еще не обработанных транзакций тест-рана.
+
+        Квитанции запрашиваются одним пакетным запросом на каждый объект Web3Utils. Ожидание подтверждения
+        выполняется только для транзакций, которые к этому моменту еще не попали в блок.
+
+        Args:
+            cases (list, optional): Тест-кейсы для обработки. По умолчанию все тест-кейсы тест-рана.
+        """
+        pending = {}
+        for case in self.test_cases if cases is None else cases:
+            for tx in case.transactions:
+                if not tx.resolved:
+                    pending.setdefault(id(tx.web3_utils), []).append((case, tx))
+
+        for transactions in pending.values():
+            web3_utils = transactions[0][1].web3_utils
+            receipts = web3_utils.get_transaction_receipts([tx.tx_hash for case, tx in transactions])
+            for (case, tx), receipt in zip(transactions, receipts):
+                if receipt is None:
+                    receipt = web3_utils.wait_transaction_receipt(tx.tx_hash)
+                tx.set_receipt(receipt)
+                # Момент включения неизвестен, но задержку в блоках можно определить по квитанции
+                case.timings.included(tx.tx_hash, tx.block_number, waited=False)
+
     def calculate_results(self):
-        for case in self.test_cases:
-            if case.result == TestResult.SUCCESS:
-                self.result['success'] += 1
-            elif case.result == TestResult.PARTIAL_FAILURE:
-                self.result['partial_failures'] += 1
-            elif case.result == TestResult.TOTAL_FAILURE:
-                self.result['total_failures'] += 1
-            elif self.result == TestResult.NOT_REPRODUCIBLE:
-                self.result['not_reproducible'] += 1
+        self.resolve_transactions()
+        self.result = summarize(self.collect_cases())
+
+    def collect_cases(self) -> list:
+        """
+        Возвращает все тест-кейсы тест-рана в формате отчета: записанные в поток и оставшиеся в памяти.
+        Поток читается один раз, пока в него не записан новый тест-кейс.
+        """
+        cases = []
+        if self.sink is not None:
+            with self._lock:
+                if self._sink_cases is None:
+                    self.sink.flush()
+                    self._sink_cases = type(self.sink).load(self.sink.path)[1]
+                cases = self._sink_cases
+        return cases + [self.case_to_dict(case) for case in self.test_cases]
+
+    @staticmethod
+    def case_to_dict(case) -> dict:
+        """
+        Сериализует тест-кейс в формат отчета с английскими ключами.
+        """
+        case_data = {
+            "testCaseName": case.name,
+            "description": case.description,
+            "steps": [],
+            "transactions": [],
+            "result": case.result.name if case.result else "Undefined",
+            "timings": {
+                "durationMs": case.timings.duration_ms,
+                "samples": case.timings.samples,
+                "summary": case.timings.summary()
+            }
+        }
+
+        for step in case.steps:
+            step_data = {
+                "stepName": step.name,
+                "description": step.description,
+                "expectedResult": step.expected_result,
+                "actualResult": step.actual_result,
+                "result": step.result.name if step.result else "Undefined",
+                "durationMs": step.duration_ms
+            }
+            case_data["steps"].append(step_data)
+
+        for tx in case.transactions:
+            tx_data = {
+                "transactionDescription": tx.description,
+                "url": tx.url,
+                "tx_status": tx.tx_status,
+                "txHash": tx.tx_hash,
+                "gasUsed": tx.gas_used,
+                "blockNumber": tx.block_number,
+                **case.timings.transactions.get(tx.tx_hash, {})
+            }
+            case_data["transactions"].append(tx_data)
+
+        return case_data
 
     def view_results(self):
+        self.resolve_transactions()
         print(f"Отчет по тест-рану: {self.description}")
         print(f"Дата и время выполнения: {self.date_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        for case in self.test_cases:
-            print(f"\nТест-кейс: {case.name} - {case.description}")
-            print(f"Результат тест-кейса: {case.result.name if case.result else 'Не определен'}")
-            for step in case.steps:
-                print(f"    Шаг: {step.name} - {step.description}")
-                print(f"    Ожидаемый результат: {step.expected_result}")
-                print(f"    Фактический результат: {step.actual_result}")
-                print(f"    Результат шага: {step.result.name if step.result else 'Не определен'}")
-            if case.transactions:
+        cases = self.collect_cases()
+        for case in cases:
+            print(f"\nТест-кейс: {case['testCaseName']} - {case['description']}")
+            print(f"Результат тест-кейса: {case['result'] if case['result'] != 'Undefined' else 'Не определен'}")
+            print(f"Длительность тест-кейса, мс: {case['timings']['durationMs']}")
+            for step in case['steps']:
+                print(f"    Шаг: {step['stepName']} - {step['description']}")
+                print(f"    Ожидаемый результат: {step['expectedResult']}")
+                print(f"    Фактический результат: {step['actualResult']}")
+                print(f"    Результат шага: {step['result'] if step['result'] != 'Undefined' else 'Не определен'}")
+                print(f"    Длительность шага, мс: {step['durationMs']}")
+            if case['transactions']:
                 print("Список транзакций:")
-            for tx in case.transactions:
-                print(f"    Транзакция: {tx['description']}")
+            for tx in case['transactions']:
+                print(f"    Транзакция: {tx['transactionDescription']}")
                 print(f"    URL: {tx['url']}")
                 print(f"    tx_status: {tx['tx_status']}")
+                print(f"    gas_used: {tx['gasUsed']}")
+                print(f"    block_number: {tx['blockNumber']}")
+                print(f"    send_ms: {tx.get('sendMs')}, inclusion_ms: {tx.get('inclusionMs')}, "
+                      f"block_delay: {tx.get('blockDelay')}")
+            self._print_timings(case['timings']['summary'], "    ")
         print("\nИтоговая статистика:")
         for key, value in self.result.items():
             print(f"{key.replace('_', ' ').capitalize()}: {value}")
+        print("\nДлительности операций тест-рана:")
+        self._print_timings(summarize_timings(cases), "")
+
+    @staticmethod
+    def _print_timings(summary, indent):
+        for name, stats in summary.items():
+            if stats:
+                print(f"{indent}{name}: " + ", ".join(f"{key}={value}" for key, value in stats.items()))
 
-    def save_json(self):
+    def save_json(self, path="test_report.json"):
         """
         Сохраняет отчет о тестировании в формате JSON, используя английские ключи.
+
+        Args:
+            path (str): Путь к файлу отчета.
         """
+        self.resolve_transactions()
         report_data = {
             "testRunDescription": self.description,
             "dateTime": self.date_time.strftime('%Y-%m-%d %H:%M:%S'),
-            "testCases": []
+            "testCases": self.collect_cases()
         }
 
-        for case in self.test_cases:
-            case_data = {
-                "testCaseName": case.name,
-                "description": case.description,
-                "steps": [],
-                "transactions": [],
-                "result": case.result.name if case.result else "Undefined"
-            }
-
-            for step in case.steps:
-                step_data = {
-                    "stepName": step.name,
-                    "description": step.description,
-                    "expectedResult": step.expected_result,
-                    "actualResult": step.actual_result,
-                    "result": step.result.name if step.result else "Undefined"
-                }
-                case_data["steps"].append(step_data)
-
-            for tx in case.transactions:
-                tx_data = {
-                    "transactionDescription": tx['description'],
-                    "url": tx['url'],
-                    "tx_status": tx['tx_status']
-                }
-                case_data["transactions"].append(tx_data)
-
-            report_data["testCases"].append(case_data)
-
         report_data["summary"] = self.result
+        report_data["timings"] = summarize_timings(report_data["testCases"])
 
-        with open("test_report.json", "w", encoding="utf-8") as json_file:
+        with open(path, "w", encoding="utf-8") as json_file:
             json.dump(report_data, json_file, ensure_ascii=False, indent=4)
 
         return report_data
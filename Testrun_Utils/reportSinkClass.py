@@ -0,0 +1,249 @@
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+import sys
+import threading
+import time
+
+from Web3_Utils.metricsClass import percentiles
+
+
+def summarize(cases: list) -> dict:
+    """
+    Считает итоговую статистику тест-рана по сериализованным тест-кейсам.
+
+    Args:
+        cases (list): Тест-кейсы в формате отчета (словари с ключом 'result').
+
+    Returns:
+        dict: Статистика в формате TestRun.result.
+    """
+    keys = {
+        'SUCCESS': 'success',
+        'PARTIAL_FAILURE': 'partial_failures',
+        'TOTAL_FAILURE': 'total_failures',
+        'NOT_REPRODUCIBLE': 'not_reproducible'
+    }
+    summary = {key: 0 for key in keys.values()}
+    for case in cases:
+        if case['result'] in keys:
+            summary[keys[case['result']]] += 1
+    return summary
+
+
+def summarize_timings(cases: list) -> dict:
+    """
+    Считает перцентили длительностей операций по всем сериализованным тест-кейсам тест-рана.
+
+    Args:
+        cases (list): Тест-кейсы в формате отчета.
+
+    Returns:
+        dict: Сводки по имени операции (см. metricsClass.percentiles); 'case' — длительности тест-кейсов,
+              'step' — длительности шагов.
+    """
+    samples = {'case': [], 'step': []}
+    for case in cases:
+        timings = case.get('timings')
+        if not timings:
+            continue
+        samples['case'].append(timings['durationMs'])
+        samples['step'].extend(step['durationMs'] for step in case['steps'] if step.get('durationMs') is not None)
+        for name, values in timings['samples'].items():
+            samples.setdefault(name, []).extend(values)
+    return {name: percentiles(values) for name, values in samples.items()}
+
+
+class ReportSink(ABC):
+    """
+    Базовый класс потокового приемника отчета тест-рана.
+
+    Каждый завершенный тест-кейс записывается сразу после завершения, поэтому при падении процесса
+    уже завершенные кейсы не теряются, а память тест-рана не растет с количеством кейсов.
+    Сброс на диск выполняется после каждых flush_every записей или, если прошло flush_interval секунд
+    с предыдущего сброса. Запись потокобезопасна.
+
+    Аргументы:
+        path (str): Путь к файлу потока.
+        flush_every (int): Количество записей, после которого выполняется сброс.
+        flush_interval (float): Максимальный интервал между сбросами в секундах.
+    """
+
+    def __init__(self, path, flush_every=1, flush_interval=5.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def write_header(self, header: dict):
+        with self._lock:
+            self._write('run', header)
+            self._flush()
+
+    def write_case(self, case_data: dict):
+        with self._lock:
+            self._write('case', case_data)
+            self._pending += 1
+            if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        self._do_flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    @abstractmethod
+    def _write(self, record_type, data):
+        ...
+
+    @abstractmethod
+    def _do_flush(self):
+        ...
+
+    @abstractmethod
+    def close(self):
+        ...
+
+    @classmethod
+    @abstractmethod
+    def load(cls, path) -> tuple[dict, list]:
+        """
+        Читает поток отчета.
+
+        Returns:
+            tuple[dict, list]: Заголовок тест-рана и список тест-кейсов в порядке записи.
+        """
+
+
+class JsonlReportSink(ReportSink):
+    """
+    Приемник отчета в формате JSON Lines: первая строка — заголовок тест-рана, далее по строке на тест-кейс.
+    """
+
+    def __init__(self, path, flush_every=1, flush_interval=5.0):
+        super().__init__(path, flush_every, flush_interval)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _write(self, record_type, data):
+        self._file.write(json.dumps({'type': record_type, **data}, ensure_ascii=False, default=str) + '\n')
+
+    def _do_flush(self):
+        self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+                self._file.close()
+
+    @classmethod
+    def load(cls, path):
+        header = {}
+        cases = []
+        with open(path, 'r', encoding='utf-8') as stream:
+            for line in stream:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Последняя строка могла быть записана не полностью при аварийном завершении
+                    break
+                record_type = record.pop('type')
+                if record_type == 'run':
+                    header = record
+                    cases = []
+                elif record_type == 'case':
+                    cases.append(record)
+        return header, cases
+
+
+class SqliteReportSink(ReportSink):
+    """
+    Приемник отчета в базу SQLite: таблица runs с заголовками тест-ранов и таблица cases с тест-кейсами.
+    """
+
+    def __init__(self, path, flush_every=1, flush_interval=5.0):
+        super().__init__(path, flush_every, flush_interval)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, data TEXT)')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS cases '
+                                 '(id INTEGER PRIMARY KEY, run_id INTEGER, name TEXT, result TEXT, data TEXT)')
+        self._run_id = None
+
+    def _write(self, record_type, data):
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        if record_type == 'run':
+            self._run_id = self._connection.execute('INSERT INTO runs (data) VALUES (?)', (payload,)).lastrowid
+        else:
+            self._connection.execute('INSERT INTO cases (run_id, name, result, data) VALUES (?, ?, ?, ?)',
+                                     (self._run_id, data.get('testCaseName'), data.get('result'), payload))
+
+    def _do_flush(self):
+        self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._connection.close()
+
+    @classmethod
+    def load(cls, path):
+        connection = sqlite3.connect(path)
+        try:
+            row = connection.execute('SELECT id, data FROM runs ORDER BY id DESC LIMIT 1').fetchone()
+            if row is None:
+                return {}, []
+            cases = [json.loads(data) for (data,) in
+                     connection.execute('SELECT data FROM cases WHERE run_id = ? ORDER BY id', (row[0],))]
+            return json.loads(row[1]), cases
+        finally:
+            connection.close()
+
+
+def open_report_sink(path, **kwargs) -> ReportSink:
+    """
+    Создает приемник отчета по расширению файла: .sqlite/.db — SQLite, иначе JSON Lines.
+    """
+    if path.endswith(('.sqlite', '.db')):
+        return SqliteReportSink(path, **kwargs)
+    return JsonlReportSink(path, **kwargs)
+
+
+def rebuild_report(stream_path, json_path=None) -> dict:
+    """
+    Восстанавливает отчет в прежнем формате test_report.json и итоговую статистику из потока отчета.
+
+    Args:
+        stream_path (str): Путь к потоку отчета (.jsonl или .sqlite/.db).
+        json_path (str, optional): Если указан, отчет сохраняется в этот файл.
+
+    Returns:
+        dict: Отчет в формате TestRun.save_json.
+    """
+    sink_class = SqliteReportSink if stream_path.endswith(('.sqlite', '.db')) else JsonlReportSink
+    header, cases = sink_class.load(stream_path)
+    report_data = {
+        "testRunDescription": header.get("testRunDescription"),
+        "dateTime": header.get("dateTime"),
+        "testCases": cases,
+        "summary": summarize(cases),
+        "timings": summarize_timings(cases)
+    }
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as json_file:
+            json.dump(report_data, json_file, ensure_ascii=False, indent=4)
+
+    return report_data
+
+
+if __name__ == '__main__':
+    # python -m Testrun_Utils.reportSinkClass <поток отчета> [test_report.json]
+    rebuild_report(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else 'test_report.json')
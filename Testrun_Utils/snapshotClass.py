@@ -0,0 +1,104 @@
+class Snapshot:
+    """
+    Значения набора методов чтения контракта, зафиксированные на одном блоке.
+
+    Атрибуты:
+        block_number (int | str): Блок, на котором получены значения.
+        values (dict): Значения по именам представлений из ViewSet.
+    """
+
+    def __init__(self, block_number, values):
+        self.block_number = block_number
+        self.values = values
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def diff(self, after) -> dict:
+        """
+        Сравнивает снимок с более поздним снимком того же набора представлений.
+
+        Args:
+            after (Snapshot): Более поздний снимок.
+
+        Returns:
+            dict: Для каждого изменившегося значения словарь {'before', 'after'} и, для чисел, 'delta'.
+        """
+        changes = {}
+        for name, before_value in self.values.items():
+            after_value = after.values[name]
+            if before_value == after_value:
+                continue
+            change = {'before': before_value, 'after': after_value}
+            if isinstance(before_value, int) and isinstance(after_value, int):
+                change['delta'] = after_value - before_value
+            changes[name] = change
+        return changes
+
+
+class ViewSet:
+    """
+    Набор методов чтения контракта, от которых зависит шаг теста.
+
+    Все представления набора читаются одним пакетным запросом (Web3Utils.batch_call), зафиксированным
+    на конкретном блоке, поэтому значения согласованы между собой и требуют одного обращения к узлу.
+
+    Аргументы:
+        web3_utils (Web3Utils): Объект Web3Utils с контрактом.
+        views (dict): Представления вида {'имя': ('method_name', arg1, arg2, ...)}.
+    """
+
+    def __init__(self, web3_utils, views: dict):
+        self.web3_utils = web3_utils
+        self.views = views
+
+    def _calls(self, block_identifier):
+        return [(view[0], view[1:], block_identifier) for view in self.views.values()]
+
+    def _snapshot(self, block_identifier, results):
+        return Snapshot(block_identifier, dict(zip(self.views, results)))
+
+    def take(self, block_identifier='latest') -> Snapshot:
+        """
+        Читает все представления набора на указанном блоке.
+
+        Args:
+            block_identifier (int | str): Номер блока или 'latest'.
+
+        Returns:
+            Snapshot: Снимок значений.
+        """
+        return self._snapshot(block_identifier, self.web3_utils.batch_call(self._calls(block_identifier)))
+
+    def take_many(self, block_identifiers: list) -> list:
+        """
+        Читает все представления набора на нескольких блоках одним пакетным запросом.
+
+        Args:
+            block_identifiers (list): Номера блоков или 'latest'.
+
+        Returns:
+            list: Снимки в порядке блоков.
+        """
+        calls = [call for block_identifier in block_identifiers for call in self._calls(block_identifier)]
+        results = self.web3_utils.batch_call(calls)
+        count = len(self.views)
+        return [self._snapshot(block_identifier, results[index * count:(index + 1) * count])
+                for index, block_identifier in enumerate(block_identifiers)]
+
+    def around(self, receipt, last_receipt=None) -> tuple[Snapshot, Snapshot]:
+        """
+        Возвращает снимки до и после транзакции одним пакетным запросом.
+
+        Снимок «до» фиксируется на блоке, предшествующем блоку включения транзакции, снимок «после» —
+        на блоке включения транзакции (или последней из транзакций, если указан last_receipt).
+
+        Args:
+            receipt: Квитанция транзакции (или первой из последовательности транзакций).
+            last_receipt (optional): Квитанция последней транзакции последовательности.
+
+        Returns:
+            tuple[Snapshot, Snapshot]: Снимки до и после.
+        """
+        before, after = self.take_many([receipt['blockNumber'] - 1, (last_receipt or receipt)['blockNumber']])
+        return before, after
@@ -1,5 +1,17 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+
+from hexbytes import HexBytes
+
 from Testrun_Utils import TestRun
+from Testrun_Utils.reportSinkClass import open_report_sink
+from Testrun_Utils.loadScenarioClass import LoadScenario
+from Testrun_Utils.snapshotClass import ViewSet
 from Web3_Utils import UserWallet
+from Web3_Utils.devChainClass import DevChain
+from Web3_Utils.fundingPlannerClass import FundingPlanner
+from Web3_Utils.holderSnapshotClass import TRANSFER_TOPIC
+from Web3_Utils.preflightClass import TransactionReverted, gas_cache
 
 class TestrunScenario:
     test_methods_config = [
@@ -12,49 +24,89 @@ class TestrunScenario:
         {"name": "Burn From", "description": "Testing burnFrom function", "key": "test_burn_from", "run": False}
     ]
 
+    # Кейсы, которые в параллельном режиме выполняются на основных кошельках одной последовательной очередью,
+    # например mint, если токен разрешает минт только владельцу контракта. Задаются ключом 'main_wallet_cases'
+    # конфигурации; остальные кейсы получают собственные производные кошельки
+    main_wallet_cases = frozenset()
+
+    # Количество транзакций, на которое пополняется нативной валютой каждый производный кошелек, если бюджет
+    # газа кейса не задан ключом 'case_gas_budget' конфигурации
+    parallel_gas_budget_txs = 3
+
+    # Баланс нативной валюты кошельков сценария на цепочке разработки, wei
+    dev_chain_balance = 100 * 10 ** 18
+
     def __init__(self, web3_utils, data):
         self.web3_obj = web3_utils
         self.owner = UserWallet.generate_user_from_private_key(data["wallets"]["owner_private_key"], "owner")
         self.user1 = UserWallet.generate_user_from_private_key(data["wallets"]["user1_private_key"], "user1")
         self.user2 = UserWallet.generate_user_from_private_key(data["wallets"]["user2_private_key"], "user2")
-        self.testrun_report = TestRun('Тестирование смартконтракта')
+        # Если указан путь 'report_stream', завершенные тест-кейсы сразу записываются в поток отчета
+        # (.jsonl или .sqlite/.db) и не накапливаются в памяти
+        sink = open_report_sink(data['report_stream']) if data.get('report_stream') else None
+        self.testrun_report = TestRun('Тестирование смартконтракта', sink=sink)
         self.run_cases = data['cases']
         self.id = data['id']
+        self.parallel = data.get('parallel', False)
+        self.main_wallet_cases = frozenset(data.get('main_wallet_cases', self.main_wallet_cases))
+        self.data = data
+
+    def supply_change_by_others(self, first_receipt, last_receipt, own_receipts) -> int:
+        """
+        Возвращает изменение totalSupply в блоках от first_receipt до last_receipt, внесенное чужими транзакциями:
+        минтом и сжиганием (события Transfer с нулевого адреса и на нулевой адрес). Кейсы, параллельно
+        меняющие totalSupply, могут попасть в те же блоки, поэтому их вклад учитывается в ожидаемом значении.
+        """
+        own = {HexBytes(receipt['transactionHash']) for receipt in own_receipts}
+        zero = bytes(20)
+        change = 0
+        for log in self.web3_obj.get_logs(first_receipt['blockNumber'], last_receipt['blockNumber'], [TRANSFER_TOPIC]):
+            if HexBytes(log['transactionHash']) in own or len(log['topics']) < 3:
+                continue
+            value = int.from_bytes(HexBytes(log['data'])[:32], 'big')
+            if HexBytes(log['topics'][1])[-20:] == zero:
+                change += value
+            if HexBytes(log['topics'][2])[-20:] == zero:
+                change -= value
+        return change
 
     def test_mint(self):
         testcase = self.testrun_report.add_test_case('Mint', 'Тестирование функции mint токена')
 
         amount = 1 * 10 ** self.web3_obj.read_method('decimals')
-        before_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        before_balance_user1 = self.web3_obj.read_method('balanceOf', self.user1.public_key)
-        before_totalSupply = self.web3_obj.read_method('totalSupply')
+        views = ViewSet(self.web3_obj, {
+            'balance_owner': ('balanceOf', self.owner.public_key),
+            'balance_user1': ('balanceOf', self.user1.public_key),
+            'totalSupply': ('totalSupply',),
+        })
 
         tx_hash_owner = self.web3_obj.send_transaction('mint', self.owner.public_key, amount, user_wallet=self.owner)
         testcase.add_transaction(tx_hash=tx_hash_owner, description="Минтинг овнером себе", web3_utils=self.web3_obj)
-        self.web3_obj.wait_transaction_receipt(tx_hash_owner)
-
-        after_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        step = testcase.add_step(name='Проверка увеличения баланса владельца',
-                                 description='Минтинг токенов владельцем себе')
-        expected_balance_owner = before_balance_owner + amount
-        step.set_results(expected_balance_owner, after_balance_owner)
+        receipt_owner = self.web3_obj.wait_transaction_receipt(tx_hash_owner)
 
         tx_hash_user1 = self.web3_obj.send_transaction('mint', self.user1.public_key, amount, user_wallet=self.owner)
         testcase.add_transaction(tx_hash=tx_hash_user1, description="Минтинг овнером пользователю User1",
                                  web3_utils=self.web3_obj)
-        self.web3_obj.wait_transaction_receipt(tx_hash_user1)
+        receipt_user1 = self.web3_obj.wait_transaction_receipt(tx_hash_user1)
+
+        # Снимки до первой и после второй транзакции одним пакетным запросом
+        before, after = views.around(receipt_owner, receipt_user1)
+
+        step = testcase.add_step(name='Проверка увеличения баланса владельца',
+                                 description='Минтинг токенов владельцем себе')
+        expected_balance_owner = before['balance_owner'] + amount
+        step.set_results(expected_balance_owner, after['balance_owner'])
 
-        after_balance_user1 = self.web3_obj.read_method('balanceOf', self.user1.public_key)
         step = testcase.add_step(name='Проверка увеличения баланса пользователя User1',
                                  description='Минтинг токенов владельцем пользователю User1')
-        expected_balance_user1 = before_balance_user1 + amount
-        step.set_results(expected_balance_user1, after_balance_user1)
+        expected_balance_user1 = before['balance_user1'] + amount
+        step.set_results(expected_balance_user1, after['balance_user1'])
 
-        after_totalSupply = self.web3_obj.read_method('totalSupply')
         step = testcase.add_step(name='Проверка увеличения общего предложения токенов',
                                  description='Проверка общего предложения токенов после минтинга')
-        expected_totalSupply = before_totalSupply + amount * 2
-        step.set_results(expected_totalSupply, after_totalSupply)
+        expected_totalSupply = before['totalSupply'] + amount * 2 + \
+            self.supply_change_by_others(receipt_owner, receipt_user1, [receipt_owner, receipt_user1])
+        step.set_results(expected_totalSupply, after['totalSupply'])
 
         testcase.set_result()
 
@@ -62,26 +114,26 @@ class TestrunScenario:
         testcase = self.testrun_report.add_test_case('MintSingleArg', 'Тестирование функции mint с одним аргументом amount')
 
         amount = 1 * 10 ** self.web3_obj.read_method('decimals')
-
-        before_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        before_totalSupply = self.web3_obj.read_method('totalSupply')
+        views = ViewSet(self.web3_obj, {
+            'balance_owner': ('balanceOf', self.owner.public_key),
+            'totalSupply': ('totalSupply',),
+        })
 
         # В этом случае предполагаем, что метод mint модифицирован для поддержки одного аргумента (amount)
         tx_hash = self.web3_obj.send_transaction('mint', amount, user_wallet=self.owner)
         testcase.add_transaction(tx_hash=tx_hash, description="Минтинг токенов владельцем", web3_utils=self.web3_obj)
-        self.web3_obj.wait_transaction_receipt(tx_hash)
+        receipt = self.web3_obj.wait_transaction_receipt(tx_hash)
 
-        after_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        after_totalSupply = self.web3_obj.read_method('totalSupply')
+        before, after = views.around(receipt)
 
         step = testcase.add_step(name='Проверка увеличения баланса владельца', description='Минтинг токенов владельцем')
-        expected_balance_owner = before_balance_owner + amount
-        step.set_results(expected_balance_owner, after_balance_owner)
+        expected_balance_owner = before['balance_owner'] + amount
+        step.set_results(expected_balance_owner, after['balance_owner'])
 
         step = testcase.add_step(name='Проверка увеличения общего предложения токенов',
                                  description='Проверка общего предложения токенов после минтинга')
-        expected_totalSupply = before_totalSupply + amount
-        step.set_results(expected_totalSupply, after_totalSupply)
+        expected_totalSupply = before['totalSupply'] + amount + self.supply_change_by_others(receipt, receipt, [receipt])
+        step.set_results(expected_totalSupply, after['totalSupply'])
 
         testcase.set_result()
 
@@ -91,27 +143,28 @@ class TestrunScenario:
         # Устанавливаем количество токенов для передачи
         amount = 1 * 10 ** self.web3_obj.read_method('decimals')
 
-        # Запоминаем начальные балансы отправителя и получателя
-        before_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        before_balance_user1 = self.web3_obj.read_method('balanceOf', self.user1.public_key)
+        # Балансы отправителя и получателя, проверяемые до и после передачи
+        views = ViewSet(self.web3_obj, {
+            'balance_owner': ('balanceOf', self.owner.public_key),
+            'balance_user1': ('balanceOf', self.user1.public_key),
+        })
 
         # Выполняем передачу токенов от owner к user1
         tx_hash = self.web3_obj.send_transaction('transfer', self.user1.public_key, amount, user_wallet=self.owner)
         testcase.add_transaction(tx_hash=tx_hash, description="Передача токенов от Owner к User1", web3_utils=self.web3_obj)
-        self.web3_obj.wait_transaction_receipt(tx_hash)
+        receipt = self.web3_obj.wait_transaction_receipt(tx_hash)
 
-        # Проверяем изменение балансов после передачи
-        after_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        after_balance_user1 = self.web3_obj.read_method('balanceOf', self.user1.public_key)
+        # Получаем балансы на блоке перед транзакцией и на блоке транзакции
+        before, after = views.around(receipt)
 
         # Добавляем шаги в тест-кейс для проверки результата передачи
         step = testcase.add_step(name='Проверка уменьшения баланса отправителя', description='Баланс Owner должен уменьшиться на amount')
-        expected_balance_owner = before_balance_owner - amount
-        step.set_results(expected_balance_owner, after_balance_owner)
+        expected_balance_owner = before['balance_owner'] - amount
+        step.set_results(expected_balance_owner, after['balance_owner'])
 
         step = testcase.add_step(name='Проверка увеличения баланса получателя', description='Баланс User1 должен увеличиться на amount')
-        expected_balance_user1 = before_balance_user1 + amount
-        step.set_results(expected_balance_user1, after_balance_user1)
+        expected_balance_user1 = before['balance_user1'] + amount
+        step.set_results(expected_balance_user1, after['balance_user1'])
 
         # Устанавливаем итоговый результат тест-кейса на основе результатов шагов
         testcase.set_result()
@@ -119,32 +172,36 @@ class TestrunScenario:
     def test_approve(self):
         testcase = self.testrun_report.add_test_case('Approve', 'Тестирование функции approve контракта токенов')
 
-        # Определяем количество токенов для теста
-        amount = 1 * 10 ** self.web3_obj.read_method('decimals')
+        views = ViewSet(self.web3_obj, {
+            'decimals': ('decimals',),
+            'allowance': ('allowance', self.owner.public_key, self.user1.public_key),
+        })
 
-        # Получаем текущее разрешение для user1 от owner
-        current_allowance = self.web3_obj.read_method('allowance', self.owner.public_key, self.user1.public_key)
+        # Количество токенов для теста и текущее разрешение для user1 от owner одним пакетным запросом
+        before = views.take()
+        amount = 1 * 10 ** before['decimals']
 
         # Устанавливаем новое разрешение: текущее разрешение + 1 токен
-        new_allowance = current_allowance + amount
+        new_allowance = before['allowance'] + amount
         tx_hash_approve = self.web3_obj.send_transaction('approve', self.user1.public_key, new_allowance, user_wallet=self.owner)
         testcase.add_transaction(tx_hash=tx_hash_approve, description="Установка нового разрешения для User1", web3_utils=self.web3_obj)
-        self.web3_obj.wait_transaction_receipt(tx_hash_approve)
-
-        # Проверяем, что разрешение успешно установлено
-        updated_allowance = self.web3_obj.read_method('allowance', self.owner.public_key, self.user1.public_key)
-        step = testcase.add_step(name='Проверка установки нового разрешения', description='Разрешение должно быть увеличено')
-        step.set_results(new_allowance, updated_allowance)
+        receipt_approve = self.web3_obj.wait_transaction_receipt(tx_hash_approve)
 
         # Обнуляем разрешение
         tx_hash_revoke = self.web3_obj.send_transaction('approve', self.user1.public_key, 0, user_wallet=self.owner)
         testcase.add_transaction(tx_hash=tx_hash_revoke, description="Обнуление разрешения для User1", web3_utils=self.web3_obj)
-        self.web3_obj.wait_transaction_receipt(tx_hash_revoke)
+        receipt_revoke = self.web3_obj.wait_transaction_receipt(tx_hash_revoke)
+
+        # Разрешение после каждой из транзакций одним пакетным запросом
+        updated, final = views.take_many([receipt_approve['blockNumber'], receipt_revoke['blockNumber']])
+
+        # Проверяем, что разрешение успешно установлено
+        step = testcase.add_step(name='Проверка установки нового разрешения', description='Разрешение должно быть увеличено')
+        step.set_results(new_allowance, updated['allowance'])
 
         # Проверяем, что разрешение успешно обнулено
-        final_allowance = self.web3_obj.read_method('allowance', self.owner.public_key, self.user1.public_key)
         step = testcase.add_step(name='Проверка обнуления разрешения', description='Разрешение должно быть обнулено')
-        step.set_results(0, final_allowance)
+        step.set_results(0, final['allowance'])
 
         # Устанавливаем итоговый результат тест-кейса на основе результатов шагов
         testcase.set_result()
@@ -154,37 +211,32 @@ class TestrunScenario:
 
         # Устанавливаем количество токенов для сжигания
         amount = 1 * 10 ** self.web3_obj.read_method('decimals')
-
-        # Получаем начальный баланс owner
-        before_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
+        views = ViewSet(self.web3_obj, {
+            'balance_owner': ('balanceOf', self.owner.public_key),
+            'totalSupply': ('totalSupply',),
+        })
 
         # Если начальный баланс меньше 1 токена, выполняем минтинг на 1 токен
-        if before_balance_owner < amount:
+        if views.take()['balance_owner'] < amount:
             tx_hash_mint = self.web3_obj.send_transaction('mint', self.owner.public_key, amount, user_wallet=self.owner)
             testcase.add_transaction(tx_hash=tx_hash_mint, description="Увеличение баланса Owner", web3_utils=self.web3_obj)
             self.web3_obj.wait_transaction_receipt(tx_hash_mint)
-            before_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-
-
-        # Запрашиваем обновленный баланс owner и общее предложение токенов
-        before_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        before_totalSupply = self.web3_obj.read_method('totalSupply')
 
         # Выполняем сжигание токенов
         tx_hash_burn = self.web3_obj.send_transaction('burn', amount, user_wallet=self.owner)
         testcase.add_transaction(tx_hash=tx_hash_burn, description="Сжигание токенов Owner", web3_utils=self.web3_obj)
-        self.web3_obj.wait_transaction_receipt(tx_hash_burn)
+        receipt_burn = self.web3_obj.wait_transaction_receipt(tx_hash_burn)
 
-        # Получаем конечный баланс owner и общее предложение токенов после сжигания
-        after_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        after_totalSupply = self.web3_obj.read_method('totalSupply')
+        # Баланс owner и общее предложение токенов до и после сжигания
+        before, after = views.around(receipt_burn)
 
         # Добавляем шаги в тест-кейс для проверки результата сжигания
         step = testcase.add_step(name='Проверка уменьшения баланса owner', description='Баланс Owner должен уменьшиться на amount')
-        step.set_results(before_balance_owner - amount, after_balance_owner)
+        step.set_results(before['balance_owner'] - amount, after['balance_owner'])
 
         step = testcase.add_step(name='Проверка уменьшения общего предложения токенов', description='Общее предложение токенов должно уменьшиться на amount')
-        step.set_results(before_totalSupply - amount, after_totalSupply)
+        others = self.supply_change_by_others(receipt_burn, receipt_burn, [receipt_burn])
+        step.set_results(before['totalSupply'] - amount + others, after['totalSupply'])
 
         # Устанавливаем итоговый результат тест-кейса
         testcase.set_result()
@@ -194,47 +246,45 @@ class TestrunScenario:
 
         # Устанавливаем количество токенов для передачи
         amount = 1 * 10 ** self.web3_obj.read_method('decimals')
+        views = ViewSet(self.web3_obj, {
+            'balance_owner': ('balanceOf', self.owner.public_key),
+            'balance_user1': ('balanceOf', self.user1.public_key),
+            'balance_user2': ('balanceOf', self.user2.public_key),
+            'allowance': ('allowance', self.owner.public_key, self.user1.public_key),
+        })
+        current = views.take()
 
         # Проверка и обновление allowance, если это необходимо
-        before_allowance = self.web3_obj.read_method('allowance', self.owner.public_key, self.user1.public_key)
-        if before_allowance < amount:
+        if current['allowance'] < amount:
             tx_hash_approve = self.web3_obj.send_transaction('approve', self.user1.public_key, amount, user_wallet=self.owner)
             testcase.add_transaction(tx_hash=tx_hash_approve, description="Установка разрешения для User1 на передачу токенов", web3_utils=self.web3_obj)
             self.web3_obj.wait_transaction_receipt(tx_hash_approve)
-            before_allowance = self.web3_obj.read_method('allowance', self.owner.public_key, self.user1.public_key)
 
         # Проверка и обновление баланса owner, если это необходимо
-        before_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        before_balance_user1 = self.web3_obj.read_method('balanceOf', self.user1.public_key)
-        before_balance_user2 = self.web3_obj.read_method('balanceOf', self.user2.public_key)
-        if before_balance_owner < amount:
+        if current['balance_owner'] < amount:
             tx_hash_mint = self.web3_obj.send_transaction('mint', self.owner.public_key, amount, user_wallet=self.owner)
             testcase.add_transaction(tx_hash=tx_hash_mint, description="Увеличение баланса Owner для теста", web3_utils=self.web3_obj)
             self.web3_obj.wait_transaction_receipt(tx_hash_mint)
-            before_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
 
         # Выполнение transferFrom от owner к user2 через user1
         tx_hash_transfer_from = self.web3_obj.send_transaction('transferFrom', self.owner.public_key, self.user2.public_key, amount, user_wallet=self.user1)
         testcase.add_transaction(tx_hash=tx_hash_transfer_from, description="Передача токенов от Owner к User2 через User1", web3_utils=self.web3_obj)
-        self.web3_obj.wait_transaction_receipt(tx_hash_transfer_from)
+        receipt = self.web3_obj.wait_transaction_receipt(tx_hash_transfer_from)
 
         # Проверка изменений балансов после перевода
-        after_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        after_balance_user1 = self.web3_obj.read_method('balanceOf', self.user1.public_key)
-        after_balance_user2 = self.web3_obj.read_method('balanceOf', self.user2.public_key)
-        after_allowance = self.web3_obj.read_method('allowance', self.owner.public_key, self.user1.public_key)
+        before, after = views.around(receipt)
 
         step = testcase.add_step(name='Проверка уменьшения баланса owner', description='Баланс Owner должен уменьшиться на amount')
-        step.set_results(before_balance_owner - amount, after_balance_owner)
+        step.set_results(before['balance_owner'] - amount, after['balance_owner'])
 
         step = testcase.add_step(name='Проверка увеличения баланса User2', description='Баланс User2 должен увеличиться на amount')
-        step.set_results(before_balance_user2 + amount, after_balance_user2)
+        step.set_results(before['balance_user2'] + amount, after['balance_user2'])
 
         step = testcase.add_step(name='Проверка что баланс User1 не изменился', description='Баланс User1 должен остаться на том же уровне')
-        step.set_results(before_balance_user1, after_balance_user1)
+        step.set_results(before['balance_user1'], after['balance_user1'])
 
         step = testcase.add_step(name='Проверка уменьшения аллованса User1', description='Аллованс User1 должен уменьшиться на amount')
-        step.set_results(before_allowance - amount, after_allowance)
+        step.set_results(before['allowance'] - amount, after['allowance'])
 
         # Устанавливаем итоговый результат тест-кейса
         testcase.set_result()
@@ -243,62 +293,226 @@ class TestrunScenario:
         testcase = self.testrun_report.add_test_case('BurnFrom', 'Тестирование функции burnFrom контракта токенов')
 
         amount = 1 * 10 ** self.web3_obj.read_method('decimals')
+        views = ViewSet(self.web3_obj, {
+            'balance_owner': ('balanceOf', self.owner.public_key),
+            'totalSupply': ('totalSupply',),
+            'allowance': ('allowance', self.owner.public_key, self.user1.public_key),
+        })
+        current = views.take()
 
         # Проверка и обновление allowance, если это необходимо
-        before_allowance = self.web3_obj.read_method('allowance', self.owner.public_key, self.user1.public_key)
-        if before_allowance < amount:
+        if current['allowance'] < amount:
             tx_hash_approve = self.web3_obj.send_transaction('approve', self.user1.public_key, amount, user_wallet=self.owner)
             testcase.add_transaction(tx_hash=tx_hash_approve, description="Установка разрешения для User1 на сжигание", web3_utils=self.web3_obj)
             self.web3_obj.wait_transaction_receipt(tx_hash_approve)
-            before_allowance = self.web3_obj.read_method('allowance', self.owner.public_key, self.user1.public_key)
-
 
         # Проверка и обновление баланса owner, если это необходимо
-        before_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        if before_balance_owner < amount:
+        if current['balance_owner'] < amount:
             tx_hash_mint = self.web3_obj.send_transaction('mint', self.owner.public_key, amount, user_wallet=self.owner)
             testcase.add_transaction(tx_hash=tx_hash_mint, description="Минтинг токенов владельцу для теста сжигания", web3_utils=self.web3_obj)
             self.web3_obj.wait_transaction_receipt(tx_hash_mint)
-            before_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-
-        before_totalSupply = self.web3_obj.read_method('totalSupply')
 
         # Сжигание токенов с баланса owner через user1
         tx_hash_burn_from = self.web3_obj.send_transaction('burnFrom', self.owner.public_key, amount, user_wallet=self.user1)
         testcase.add_transaction(tx_hash=tx_hash_burn_from, description="Сжигание токенов с баланса Owner через User1", web3_utils=self.web3_obj)
-        self.web3_obj.wait_transaction_receipt(tx_hash_burn_from)
+        receipt = self.web3_obj.wait_transaction_receipt(tx_hash_burn_from)
 
-        # Проверка изменения баланса owner и общего предложения токенов
-        after_balance_owner = self.web3_obj.read_method('balanceOf', self.owner.public_key)
-        after_totalSupply = self.web3_obj.read_method('totalSupply')
-        after_allowance = self.web3_obj.read_method('allowance', self.owner.public_key, self.user1.public_key)
+        # Проверка изменения баланса owner, общего предложения токенов и аллованса
+        before, after = views.around(receipt)
 
         step = testcase.add_step(name='Проверка уменьшения баланса owner', description='Баланс Owner должен уменьшиться на amount')
-        step.set_results(before_balance_owner - amount, after_balance_owner)
+        step.set_results(before['balance_owner'] - amount, after['balance_owner'])
 
         step = testcase.add_step(name='Проверка уменьшения общего предложения токенов', description='Общее предложение токенов должно уменьшиться на amount')
-        step.set_results(before_totalSupply - amount, after_totalSupply)
+        others = self.supply_change_by_others(receipt, receipt, [receipt])
+        step.set_results(before['totalSupply'] - amount + others, after['totalSupply'])
 
         step = testcase.add_step(name='Проверка уменьшения аллованса User1', description='Аллованс User1 должен уменьшиться на amount')
-        step.set_results(before_allowance - amount, after_allowance)
+        step.set_results(before['allowance'] - amount, after['allowance'])
         # Установка итогового результата тест-кейса
         testcase.set_result()
 
-    def run_tests(self):
+    def derive_case_wallets(self, key):
         """
-        Запускает тестовые методы на основе конфигурации test_methods_config.
+        Возвращает набор производных кошельков owner, user1, user2 для тест-кейса.
+
+        Кошельки детерминированно получаются из ключа владельца, id тест-рана и ключа тест-кейса,
+        поэтому повторные запуски используют уже пополненные кошельки.
+        """
+        private_key = self.owner.private_key
+        return tuple(UserWallet.generate_derived_wallet(private_key, f'{self.id}:{key}:{role}', role)
+                     for role in ('owner', 'user1', 'user2'))
+
+    def estimate_case_gas(self) -> int:
         """
+        Оценивает газ методов, которые отправляют тест-кейсы, с основных кошельков и возвращает наибольший
+        лимит газа с запасом среди оценок контракта в общем кэше (preflightClass.gas_cache).
+
+        Оценки выполняются с нулевыми суммами, поэтому не зависят от балансов и аллованса: форма аргументов
+        (GasEstimateCache.argument_shape) совпадает с вызовами тест-кейсов, а запись в новые ячейки хранилища
+        покрывает дополнительный газ кэша. Производные кошельки затем берут лимит газа из кэша, не запрашивая
+        оценку, которую часть узлов не выполняет для отправителя с небольшим балансом.
+        """
+        owner, user1, user2 = self.owner.public_key, self.user1.public_key, self.user2.public_key
+        estimates = [('mint', (user1, 0), owner), ('transfer', (user1, 0), owner),
+                     ('approve', (user1, 0), owner), ('transferFrom', (owner, user2, 0), user1)]
+        for method_name, args, sender in estimates:
+            if method_name not in self.web3_obj.abi_schema.write_methods:
+                continue
+            try:
+                self.web3_obj.simulate_transaction(method_name, *args, wallet_address=sender, call=False)
+            except TransactionReverted as e:
+                print(f"Не удалось оценить газ для {method_name}: {e.reason}")
+
+        gas_limit = gas_cache.max_limit(self.web3_obj.chain_id, self.web3_obj.contract_obj.address)
+        return self.web3_obj.default_gas if gas_limit is None else gas_limit
+
+    def fund_case_wallets(self, wallets_by_case):
+        """
+        Пополняет производные кошельки нативной валютой на газ и токенами с основного кошелька owner
+        (см. FundingPlanner). Уже пополненные кошельки пропускаются.
+
+        Бюджет газа каждого кошелька берется из ключа 'case_gas_budget' конфигурации, а если он не задан,
+        равен parallel_gas_budget_txs транзакциям с наибольшим лимитом газа среди оценок методов контракта
+        в общем кэше (preflightClass.gas_cache, см. estimate_case_gas).
+        """
+        amount = 1 * 10 ** self.web3_obj.read_method('decimals')
+        gas_budget = self.data.get('case_gas_budget')
+        if gas_budget is None:
+            gas_budget = self.parallel_gas_budget_txs * self.estimate_case_gas()
+        native_amount = gas_budget * self.web3_obj.web3.eth.gasPrice
+
+        targets = []
+        for owner, user1, user2 in wallets_by_case.values():
+            targets.append((owner.public_key, native_amount, amount))
+            targets.append((user1.public_key, native_amount, 0))
+            targets.append((user2.public_key, native_amount, 0))
+        FundingPlanner(self.web3_obj, [self.owner], token_method='mint').fund(targets)
+
+    def run_case(self, test_method):
+        """
+        Запускает один тест-кейс по его описанию из конфигурации.
+        """
+        print(f"Running: {test_method['name']}")
+        try:
+            test_method_func = getattr(self, test_method['key'])
+            test_method_func()
+        except AttributeError as e:
+            print(f"Error: Method {test_method['key']} not found in TestunScenario class ({e}).")
+
+    def run_lane(self, test_methods, wallets=None):
+        """
+        Последовательно выполняет тест-кейсы на копии сценария с собственным отчетом и, при необходимости,
+        собственным набором кошельков. Возвращает список пар (ключ кейса, добавленные им тест-кейсы отчета).
+        Если у отчета сценария есть поток отчета, завершенные кейсы сразу записываются в него, а не возвращаются.
+        """
+        lane = copy.copy(self)
+        lane.testrun_report = self.testrun_report.fork()
+        if wallets is not None:
+            lane.owner, lane.user1, lane.user2 = wallets
+
+        results = []
+        for test_method in test_methods:
+            start = len(lane.testrun_report.test_cases)
+            lane.run_case(test_method)
+            results.append((test_method['key'], lane.testrun_report.test_cases[start:]))
+        return results
+
+    def run_tests_parallel(self, max_workers=None):
+        """
+        Запускает выбранные тест-кейсы параллельно в пуле потоков.
+
+        Каждый тест-кейс получает собственный набор производных кошельков, заранее пополненных нативной
+        валютой и токенами, и выполняется в отдельном потоке. Проверки totalSupply учитывают минт и сжигание
+        параллельных кейсов в тех же блоках (см. supply_change_by_others). Кейсы из main_wallet_cases
+        выполняются одной последовательной очередью на основных кошельках, параллельно с остальными.
+        Результаты собираются в общий отчет в порядке конфигурации.
+        """
+        selected = []
         for test_method in self.run_cases:
             if test_method['run']:
-                print(f"Running: {test_method['name']}")
-                try:
-                    test_method_func = getattr(self, test_method['key'])
-                    test_method_func()
-                except AttributeError as e:
-                    print(f"Error: Method {test_method['key']} not found in TestunScenario class.")
+                selected.append(test_method)
             else:
                 print(f"Skipping: {test_method['name']}")
 
+        shared_lane = [test_method for test_method in selected if test_method['key'] in self.main_wallet_cases]
+        isolated = [test_method for test_method in selected if test_method['key'] not in self.main_wallet_cases]
+
+        wallets_by_case = {test_method['key']: self.derive_case_wallets(test_method['key']) for test_method in isolated}
+        if wallets_by_case:
+            self.fund_case_wallets(wallets_by_case)
+
+        lanes = [([test_method], wallets_by_case[test_method['key']]) for test_method in isolated]
+        if shared_lane:
+            lanes.append((shared_lane, None))
+
+        cases_by_key = {}
+        with ThreadPoolExecutor(max_workers=max_workers or max(len(lanes), 1)) as executor:
+            futures = [executor.submit(self.run_lane, test_methods, wallets) for test_methods, wallets in lanes]
+            for future in futures:
+                cases_by_key.update(future.result())
+
+        for test_method in selected:
+            self.testrun_report.test_cases.extend(cases_by_key.get(test_method['key'], []))
+
+    def run_tests_isolated(self):
+        """
+        Последовательно запускает тест-кейсы на цепочке разработки (см. DevChain), откатывая состояние
+        цепочки к снимку перед каждым кейсом. Кейсы не видят изменений друг друга, а контракт не нужно
+        деплоить заново. Кошельки сценария пополняются нативной валютой с аккаунта узла до снимка.
+        Транзакции кейса разрешаются до отката, пока их квитанции еще существуют.
+        """
+        dev_chain = DevChain(self.web3_obj)
+        dev_chain.import_keys([self.owner.private_key, self.user1.private_key, self.user2.private_key])
+        dev_chain.fund([self.owner.public_key, self.user1.public_key, self.user2.public_key], self.dev_chain_balance)
+        snapshot_id = dev_chain.snapshot()
+
+        for test_method in self.run_cases:
+            if not test_method['run']:
+                print(f"Skipping: {test_method['name']}")
+                continue
+            self.run_case(test_method)
+            self.testrun_report.resolve_transactions()
+            dev_chain.revert(snapshot_id)
+            snapshot_id = dev_chain.snapshot()
+
+    def run_load(self, load=None, path="load_report.json") -> dict:
+        """
+        Запускает нагрузочный режим (см. LoadScenario) на контракте сценария и сохраняет отчет.
+
+        Args:
+            load (dict, optional): Параметры нагрузки. По умолчанию берутся из ключа 'load' конфигурации сценария.
+            path (str): Путь к файлу отчета.
+        """
+        data = dict(self.data, load=load) if load is not None else self.data
+        scenario = LoadScenario(self.web3_obj, data)
+        report = scenario.run()
+        scenario.view_results(report)
+        return scenario.save_json(report, path)
+
+    def run_tests(self, parallel=None, max_workers=None):
+        """
+        Запускает тестовые методы на основе конфигурации test_methods_config.
+
+        Args:
+            parallel (bool, optional): Запускать тест-кейсы параллельно (см. run_tests_parallel).
+                                       По умолчанию берется из ключа 'parallel' конфигурации сценария.
+            max_workers (int, optional): Максимальное количество потоков в параллельном режиме.
+        """
+        if parallel is None:
+            parallel = self.parallel
+
+        if parallel:
+            self.run_tests_parallel(max_workers)
+        elif self.web3_obj.dev_chain:
+            self.run_tests_isolated()
+        else:
+            for test_method in self.run_cases:
+                if test_method['run']:
+                    self.run_case(test_method)
+                else:
+                    print(f"Skipping: {test_method['name']}")
+
         self.testrun_report.calculate_results()
         self.testrun_report.view_results()
         return self.testrun_report.save_json()
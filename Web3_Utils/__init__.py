@@ -1,3 +1,9 @@
 from .classWeb3Utils import Web3Utils
 from .userClass import UserWallet
 from .func import read, write
+from .fundingPlannerClass import FundingPlanner
+from .deployPlannerClass import DeployPlanner
+from .clientRegistryClass import ClientRegistry, client_registry
+from .holderSnapshotClass import HolderSnapshot, HolderSnapshotFile
+from .backfillClass import EventBackfill
+from .eventStreamClass import ConfirmedEventStream
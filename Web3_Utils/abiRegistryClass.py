@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import threading
+
+from eth_utils import function_abi_to_4byte_selector
+from web3._utils.abi import get_abi_input_types
+
+
+class AbiSchema:
+    """
+    Разобранное ABI контракта с заранее подготовленными схемами входных и выходных параметров методов.
+
+    Схемы строятся один раз при создании объекта, поэтому повторные обращения к ним не требуют
+    ни чтения файла, ни повторного обхода ABI. Возвращаемые списки и словари общие для всех
+    пользователей схемы и не должны изменяться.
+
+    Атрибуты:
+        abi (list): Исходное ABI контракта.
+        key (str): Хеш содержимого ABI (sha256 канонического JSON), по которому ABI интернируется в реестре.
+        events (list): Имена событий контракта.
+        functions (dict): Описания функций ABI по имени (список перегрузок для каждого имени).
+        read_methods (list): Методы чтения (view) в формате Web3Utils.list_methods.
+        write_methods (list): Методы записи (nonpayable, payable) в формате Web3Utils.list_methods.
+        errors (dict): Пользовательские ошибки (custom errors) по селектору '0x...': пары (описание ABI, типы входов).
+
+    Аргументы:
+        abi (list | str): ABI контракта в виде списка или JSON-строки.
+    """
+
+    def __init__(self, abi):
+        if type(abi) is str:
+            abi = json.loads(abi)
+        self.abi = abi
+        self.key = self.content_key(abi)
+        self.events = [event['name'] for event in abi if event.get('type') == 'event']
+        self.functions = {}
+        self.read_methods = []
+        self.write_methods = []
+        self.errors = {}
+        self._outputs = {}
+
+        for method in abi:
+            if method.get('type') == 'error':
+                selector = '0x' + function_abi_to_4byte_selector(method).hex()
+                self.errors[selector] = (method, get_abi_input_types(method))
+                continue
+            if method.get('type') != 'function':
+                continue
+            self.functions.setdefault(method['name'], []).append(method)
+
+            if method['name'] not in self._outputs and method.get('outputs'):
+                self._outputs[method['name']] = self._build_outputs(method['outputs'])
+
+            if method.get('stateMutability') == 'view':
+                self.read_methods.append({
+                    'name': method['name'],
+                    'inputs': [self._build_param(param) for param in method['inputs']],
+                    'outputs': [self._build_param(param) for param in method['outputs']]
+                })
+            elif method.get('stateMutability') in ('nonpayable', 'payable'):
+                self.write_methods.append({
+                    'name': method['name'],
+                    'inputs': method['inputs'],
+                    'payable': method['stateMutability'] == 'payable',
+                })
+
+    @staticmethod
+    def content_key(abi) -> str:
+        """
+        Вычисляет хеш содержимого ABI, не зависящий от порядка ключей и форматирования.
+
+        Args:
+            abi (list): ABI контракта.
+
+        Returns:
+            str: Хеш sha256 в шестнадцатеричном виде.
+        """
+        canonical = json.dumps(abi, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _build_param(param):
+        schema = {
+            'name': param['name'],
+            'type': param['type']
+        }
+        if param['type'].startswith('tuple'):
+            schema['components'] = [AbiSchema._build_param(component) for component in param['components']]
+        return schema
+
+    @staticmethod
+    def _build_outputs(outputs):
+        result = []
+        for index, output in enumerate(outputs):
+            if output['type'].startswith('tuple'):
+                components = [{'name': component['name'], 'type': component['type']}
+                              for component in output['components']]
+                result.append((output.get('name', f"param{index}"), components))
+            else:
+                result.append((output.get('name', f"param{index}"), output['type']))
+        return result
+
+    def get_outputs(self, method_name: str) -> list:
+        """
+        Возвращает описания выходных параметров метода в формате func.get_abi_outputs.
+
+        Args:
+            method_name (str): Название метода контракта.
+
+        Returns:
+            list: Список кортежей (имя, тип) или (имя, список компонентов кортежа).
+                  Пустой список, если метод не найден или не имеет выходных параметров.
+        """
+        return self._outputs.get(method_name, [])
+
+    def get_function(self, method_name: str, args_count: int | None = None) -> dict | None:
+        """
+        Возвращает описание функции из ABI по имени и, при перегрузке, по количеству аргументов.
+
+        Args:
+            method_name (str): Название метода контракта.
+            args_count (int, optional): Количество аргументов вызова для выбора перегрузки.
+
+        Returns:
+            dict | None: Описание функции из ABI или None, если функция не найдена.
+        """
+        overloads = self.functions.get(method_name)
+        if not overloads:
+            return None
+        if args_count is None:
+            return overloads[0]
+        for method in overloads:
+            if len(method['inputs']) == args_count:
+                return method
+        return None
+
+
+class AbiRegistry:
+    """
+    Общий для процесса реестр разобранных ABI.
+
+    Каждый файл ABI читается и разбирается один раз, а ABI, загруженное по URL (например, из API эксплорера),
+    запрашивается один раз на URL, дальше все обращения обслуживаются из памяти.
+    ABI интернируются по хешу содержимого: одинаковые ABI, полученные из разных файлов, по HTTP или
+    переданные напрямую, разделяют один объект AbiSchema. Реестр потокобезопасен.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_path = {}
+        self._by_url = {}
+        self._by_key = {}
+
+    def intern(self, abi) -> AbiSchema:
+        """
+        Возвращает общий объект AbiSchema для ABI с таким же содержимым, создавая его при первом обращении.
+
+        Args:
+            abi (list | str): ABI контракта в виде списка или JSON-строки.
+
+        Returns:
+            AbiSchema: Схема ABI.
+        """
+        if type(abi) is str:
+            abi = json.loads(abi)
+        key = AbiSchema.content_key(abi)
+        schema = self._by_key.get(key)
+        if schema is not None:
+            return schema
+
+        schema = AbiSchema(abi)
+        with self._lock:
+            return self._by_key.setdefault(key, schema)
+
+    def from_file(self, abi_path: str) -> AbiSchema:
+        """
+        Возвращает схему ABI из файла, читая файл только при первом обращении.
+
+        Args:
+            abi_path (str): Путь к файлу ABI.
+
+        Returns:
+            AbiSchema: Схема ABI.
+        """
+        key = os.path.abspath(abi_path)
+        schema = self._by_path.get(key)
+        if schema is not None:
+            return schema
+
+        with open(abi_path, 'r') as abi_file:
+            schema = self.intern(json.load(abi_file))
+        with self._lock:
+            return self._by_path.setdefault(key, schema)
+
+    def from_url(self, url: str, fetch) -> AbiSchema:
+        """
+        Возвращает схему ABI, загруженного по URL, выполняя загрузку только при первом обращении.
+
+        Args:
+            url (str): URL, по которому доступно ABI.
+            fetch: Функция загрузки, принимающая URL и возвращающая ABI (список или JSON-строку).
+
+        Returns:
+            AbiSchema: Схема ABI.
+        """
+        schema = self._by_url.get(url)
+        if schema is not None:
+            return schema
+
+        schema = self.intern(fetch(url))
+        with self._lock:
+            return self._by_url.setdefault(url, schema)
+
+    def invalidate(self, abi_path: str | None = None):
+        """
+        Удаляет из реестра схему файла (например, после его изменения) или очищает реестр целиком.
+
+        Args:
+            abi_path (str, optional): Путь к файлу ABI. Если не указан, реестр очищается полностью.
+        """
+        with self._lock:
+            if abi_path is None:
+                self._by_path.clear()
+                self._by_url.clear()
+                self._by_key.clear()
+            else:
+                self._by_path.pop(os.path.abspath(abi_path), None)
+
+
+abi_registry = AbiRegistry()
@@ -0,0 +1,226 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from web3._utils.events import event_abi_to_log_topic
+
+from .abiRegistryClass import abi_registry
+from .clientRegistryClass import client_registry
+from .config import ContractConfig
+from .eventDecoderClass import EventBatch
+
+
+# Конфигурации эндпоинтов в процессе пула по (provider, chain_id). ContractConfig регистрируется
+# в ContractConfig.all_configs, поэтому создается один раз на эндпоинт, а не на каждый шард
+_shard_configs = {}
+
+
+def _shard_config(provider: str, chain_id: int) -> ContractConfig:
+    config = _shard_configs.get((provider, chain_id))
+    if config is None:
+        config = _shard_configs[(provider, chain_id)] = ContractConfig(provider=provider, chain_id=chain_id)
+    return config
+
+
+def _plain(value):
+    """
+    Приводит расшифрованное событие (AttributeDict, HexBytes, кортежи) к типам, сериализуемым в JSON.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    if hasattr(value, 'keys'):
+        return {key: _plain(value[key]) for key in value.keys()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _backfill_shard(task: dict) -> dict:
+    """
+    Выполняется в процессе пула: получает и расшифровывает события шарда и записывает их в файл части.
+    Файл части сначала пишется во временный файл и переименовывается, поэтому существующая часть всегда полная.
+    """
+    started = time.monotonic()
+    providers = task['providers']
+    for attempt, provider in enumerate(providers):
+        try:
+            client = client_registry.get(_shard_config(provider, task['chain_id']), task['address'], abi=task['abi'])
+            logs = client.get_logs(task['from_block'], task['to_block'], [task['topics']], task['logs_step'])
+            break
+        except Exception as e:
+            # Шард повторяется на следующем эндпоинте
+            if attempt == len(providers) - 1:
+                raise
+            print(f"Ошибка шарда {task['from_block']}-{task['to_block']} на {provider}: {e}")
+
+    records = []
+    for event_name in task['event_names']:
+        decoded = client.decode_event_logs(logs, event_name)
+        records.extend(decoded.to_records() if isinstance(decoded, EventBatch) else _plain(decoded))
+    records.sort(key=lambda record: (record['blockNumber'], record['logIndex']))
+
+    temporary_path = task['part_path'] + '.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as part:
+        for record in records:
+            part.write(json.dumps(_plain(record), ensure_ascii=False) + '\n')
+    os.replace(temporary_path, task['part_path'])
+    return {'index': task['index'], 'events': len(records), 'provider': provider,
+            'seconds': round(time.monotonic() - started, 3)}
+
+
+class EventBackfill:
+    """
+    Многопроцессная выгрузка истории событий контракта за большой диапазон блоков.
+
+    Диапазон делится на шарды по shard_size блоков, которые обрабатываются в пуле из max_workers процессов.
+    Каждый процесс получает логи своего шарда (Web3Utils.get_logs) через собственное подключение из пула
+    процесса и расшифровывает их (Web3Utils.decode_event_logs). Если указано несколько эндпоинтов, шарды
+    распределяются между ними по кругу, а неудачный шард повторяется на следующем эндпоинте.
+
+    Готовые шарды записываются в выходной файл JSON Lines (строка на событие) строго в порядке блоков, даже если
+    завершаются не по порядку. Прогресс сохраняется в манифест рядом с выходным файлом (<path>.manifest.json)
+    после каждого слитого шарда, поэтому прерванная выгрузка продолжается с первого неслитого шарда, а уже
+    полученные, но не слитые шарды (файлы частей в <path>.parts) не запрашиваются повторно.
+
+    Атрибуты:
+        contract_config (ContractConfig): Конфигурация сети.
+        address (str): Адрес контракта.
+        abi (list): ABI контракта.
+        event_names (list): Названия выгружаемых событий.
+        providers (list): URL эндпоинтов, между которыми распределяются шарды.
+        shard_size (int): Количество блоков в шарде.
+        max_workers (int): Количество процессов.
+    """
+    # Начальный размер диапазона блоков одного запроса eth_getLogs внутри шарда
+    logs_step = 2000
+
+    def __init__(self, contract_config, contract_address: str, abi, event_names=None, providers=None,
+                 shard_size=10000, max_workers=None):
+        self.contract_config = contract_config
+        self.address = contract_address
+        schema = abi_registry.intern(abi)
+        self.abi = schema.abi
+        self.event_names = event_names or schema.events
+        self.providers = list(providers or [contract_config.provider])
+        self.shard_size = shard_size
+        self.max_workers = max_workers or os.cpu_count()
+        self._events = {event['name']: event for event in self.abi if event.get('type') == 'event'}
+        unknown = [name for name in self.event_names if name not in self._events]
+        if unknown:
+            raise ValueError(f"События {', '.join(unknown)} не найдены в ABI контракта.")
+
+    def _topics(self) -> list:
+        return ['0x' + bytes(event_abi_to_log_topic(self._events[name])).hex() for name in self.event_names]
+
+    def _load_manifest(self, path: str, from_block: int, to_block) -> dict:
+        manifest_path = path + '.manifest.json'
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+            expected = {'address': self.address.lower(), 'events': self.event_names, 'from_block': from_block,
+                        'shard_size': self.shard_size}
+            if any(manifest[key] != value for key, value in expected.items()) or \
+                    to_block is not None and manifest['to_block'] != to_block:
+                raise ValueError(f"Манифест {manifest_path} создан для другой выгрузки.")
+            return manifest
+
+        if to_block is None:
+            to_block = client_registry.get(self.contract_config).web3.eth.blockNumber
+        return {'address': self.address.lower(), 'events': self.event_names, 'from_block': from_block,
+                'to_block': to_block, 'shard_size': self.shard_size, 'merged_shards': 0, 'events_written': 0,
+                'output_size': 0}
+
+    @staticmethod
+    def _save_manifest(path: str, manifest: dict):
+        temporary_path = path + '.manifest.json.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file, indent=4)
+        os.replace(temporary_path, path + '.manifest.json')
+
+    def run(self, path: str, from_block=0, to_block=None) -> dict:
+        """
+        Выполняет или продолжает выгрузку событий в файл.
+
+        Args:
+            path (str): Путь к выходному файлу JSON Lines.
+            from_block (int): Начальный блок (например, блок деплоя контракта).
+            to_block (int, optional): Конечный блок. По умолчанию последний блок на момент первого запуска
+                                      (сохраняется в манифесте и используется при продолжении).
+
+        Returns:
+            dict: {'path', 'from_block', 'to_block', 'shards': всего шардов, 'fetched': получено в этом запуске,
+                   'events': записано событий всего, 'seconds': длительность}.
+
+        Raises:
+            ValueError: Если манифест относится к выгрузке с другими параметрами.
+        """
+        started = time.monotonic()
+        manifest = self._load_manifest(path, from_block, to_block)
+        to_block = manifest['to_block']
+        shards = [(start, min(start + self.shard_size - 1, to_block))
+                  for start in range(from_block, to_block + 1, self.shard_size)]
+        parts_dir = path + '.parts'
+        os.makedirs(parts_dir, exist_ok=True)
+        if manifest['merged_shards'] == 0:
+            # Новая выгрузка перезаписывает выходной файл
+            open(path, 'w').close()
+            self._save_manifest(path, manifest)
+        else:
+            # Отбрасывается шард, записанный в файл до сбоя, но не отмеченный в манифесте
+            os.truncate(path, manifest['output_size'])
+
+        chain_id = self.contract_config.chain_id or client_registry.get(self.contract_config).chain_id
+        topics = self._topics()
+        tasks = []
+        for index in range(manifest['merged_shards'], len(shards)):
+            part_path = os.path.join(parts_dir, f'{index:08d}.jsonl')
+            if os.path.exists(part_path):
+                continue
+            start, end = shards[index]
+            # Эндпоинт шарда выбирается по кругу, остальные используются для повторов
+            offset = index % len(self.providers)
+            tasks.append({'index': index, 'from_block': start, 'to_block': end, 'part_path': part_path,
+                          'providers': self.providers[offset:] + self.providers[:offset], 'chain_id': chain_id,
+                          'address': self.address, 'abi': self.abi, 'event_names': self.event_names,
+                          'topics': topics, 'logs_step': self.logs_step})
+
+        with open(path, 'a', encoding='utf-8') as output:
+            self._merge_ready(path, output, parts_dir, manifest, len(shards))
+            if tasks:
+                context = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks)), mp_context=context) as pool:
+                    futures = [pool.submit(_backfill_shard, task) for task in tasks]
+                    for future in as_completed(futures):
+                        future.result()
+                        self._merge_ready(path, output, parts_dir, manifest, len(shards))
+
+        if manifest['merged_shards'] == len(shards):
+            os.rmdir(parts_dir)
+        return {
+            'path': path,
+            'from_block': from_block,
+            'to_block': to_block,
+            'shards': len(shards),
+            'fetched': len(tasks),
+            'events': manifest['events_written'],
+            'seconds': round(time.monotonic() - started, 3),
+        }
+
+    def _merge_ready(self, path: str, output, parts_dir: str, manifest: dict, shards_count: int):
+        # Сливает в выходной файл все готовые шарды, идущие подряд после последнего слитого
+        while manifest['merged_shards'] < shards_count:
+            part_path = os.path.join(parts_dir, f"{manifest['merged_shards']:08d}.jsonl")
+            if not os.path.exists(part_path):
+                return
+            with open(part_path, 'r', encoding='utf-8') as part:
+                lines = part.readlines()
+            output.writelines(lines)
+            output.flush()
+            os.fsync(output.fileno())
+            manifest['merged_shards'] += 1
+            manifest['events_written'] += len(lines)
+            manifest['output_size'] = output.tell()
+            self._save_manifest(path, manifest)
+            os.remove(part_path)
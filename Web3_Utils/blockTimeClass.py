@@ -0,0 +1,127 @@
+import threading
+import time
+
+
+class BlockTimeEstimator:
+    """
+    Оценка интервала между блоками сети и планировщик опросов, привязанный к ожидаемому появлению блока.
+
+    Интервал определяется по временным меткам последних заголовков (sample) и уточняется по мере наблюдения
+    новых блоков (observe). Опросы (квитанций, новых блоков) планируются на момент чуть позже ожидаемого
+    появления следующего блока, а если блок задерживается, интервал между опросами растет до половины
+    интервала блока. Так сокращается и количество лишних запросов, и задержка обнаружения подтверждения.
+
+    Если интервал задан при создании (ContractConfig(block_time=...)), он считается точным и по заголовкам
+    не уточняется; sample в этом случае обновляет только последний известный блок.
+
+    Объект хранится в ContractConfig и общий для всех Web3Utils одной сети. Потокобезопасен.
+
+    Атрибуты:
+        block_time (float | None): Оценка интервала между блоками в секундах.
+        fixed (bool): Интервал задан в конфигурации и не оценивается.
+        last_block (int | None): Номер последнего известного блока.
+        last_timestamp (float | None): Время (unix) появления последнего известного блока.
+    """
+    # Используется, пока интервал еще не определен
+    default_block_time = 2.0
+    # Сколько заголовков запрашивается для оценки интервала
+    sample_size = 16
+    # Через сколько секунд оценка по заголовкам считается устаревшей
+    refresh_interval = 300.0
+    # Минимальная задержка между опросами в секундах
+    min_delay = 0.05
+
+    def __init__(self, block_time=None):
+        self.block_time = block_time
+        self.fixed = block_time is not None
+        self.last_block = None
+        self.last_timestamp = None
+        self._sampled_at = None
+        self._lock = threading.Lock()
+
+    def sample(self, web3_utils):
+        """
+        Оценивает интервал между блоками по временным меткам последних sample_size заголовков,
+        запрошенных одним пакетным запросом. Если интервал задан в конфигурации, запрашивается только
+        последний заголовок.
+        """
+        head = web3_utils.web3.eth.blockNumber
+        first = head if self.fixed else max(head - self.sample_size + 1, 0)
+        headers = web3_utils.rpc_batch([('eth_getBlockByNumber', [hex(number), False])
+                                        for number in range(first, head + 1)], raise_errors=False)
+        timestamps = [web3_utils.to_int(header['timestamp']) for header in headers if header]
+        with self._lock:
+            if not self.fixed and len(timestamps) > 1 and timestamps[-1] > timestamps[0]:
+                # Средний интервал по всему окну: устойчив к целочисленным меткам в сетях с блоками чаще секунды
+                self.block_time = max((timestamps[-1] - timestamps[0]) / (len(timestamps) - 1), 0.1)
+            if timestamps and (self.last_block is None or head >= self.last_block):
+                self.last_block = head
+                self.last_timestamp = timestamps[-1]
+            self._sampled_at = time.monotonic()
+
+    def ensure(self, web3_utils):
+        """
+        Выполняет sample, если оценки еще нет или она устарела.
+        """
+        if self._sampled_at is None or time.monotonic() - self._sampled_at > self.refresh_interval:
+            try:
+                self.sample(web3_utils)
+            except Exception as e:
+                print(f"Не удалось оценить интервал блоков: {e}")
+                self._sampled_at = time.monotonic()
+
+    def observe(self, block_number, timestamp=None):
+        """
+        Учитывает наблюдаемый номер последнего блока.
+
+        Args:
+            block_number (int): Номер последнего блока.
+            timestamp (float, optional): Временная метка блока. Если не указана, оценивается по расписанию блоков
+                                         или, если оценка расходится с текущим временем, принимается равной текущему.
+        """
+        if block_number is None:
+            return
+        now = time.time()
+        with self._lock:
+            if self.last_block is not None and block_number <= self.last_block:
+                return
+            if timestamp is None:
+                block_time = self.block_time or self.default_block_time
+                predicted = None
+                if self.last_block is not None:
+                    predicted = self.last_timestamp + (block_number - self.last_block) * block_time
+                timestamp = predicted if predicted is not None and now - block_time <= predicted <= now else now
+            self.last_block = block_number
+            self.last_timestamp = timestamp
+
+    def reset_head(self, block_number=None):
+        """
+        Сбрасывает последний известный блок, например после отката цепочки разработки к снимку,
+        когда номер последнего блока уменьшается. Если указан block_number, он принимается последним блоком.
+        """
+        with self._lock:
+            self.last_block = None
+            self.last_timestamp = None
+        self.observe(block_number)
+
+    def poll_delay(self) -> float:
+        """
+        Возвращает задержку до следующего опроса в секундах.
+
+        До ожидаемого появления следующего блока опрашивать бесполезно, поэтому задержка длится до этого момента
+        плюс небольшой запас на распространение блока. Если блок опаздывает, задержка растет вместе с опозданием,
+        но не превышает половины интервала блока.
+        """
+        block_time = self.block_time or self.default_block_time
+        if self.last_timestamp is None:
+            return max(block_time / 4, self.min_delay)
+
+        margin = min(max(block_time * 0.05, self.min_delay), 0.5)
+        expected = self.last_timestamp + block_time + margin
+        now = time.time()
+        if now < expected:
+            return min(expected - now, block_time)
+        return min(max((now - expected) / 2, self.min_delay), block_time / 2)
+
+    def sleep(self):
+        time.sleep(self.poll_delay())
@@ -0,0 +1,77 @@
+import threading
+import time
+
+
+class BlockWatcher:
+    """
+    Отслеживает появление новых блоков опросом номера последнего блока.
+
+    Каждый новый блок выдается ровно один раз и по порядку, даже если между опросами появилось
+    несколько блоков, поэтому потребители (например, команда watch интерфейса) могут фиксировать чтения
+    на каждом блоке. Если у Web3Utils указан WebSocket-провайдер, опрос выполняется сразу по уведомлению
+    newHeads, а интервал опроса используется только как резервный.
+
+    Атрибуты:
+        web3_utils (Web3Utils): Объект Web3Utils для подключения к сети.
+        poll_interval (float | None): Фиксированный интервал опроса в секундах. Если None, опросы планируются
+                                      по ожидаемому появлению блоков (Web3Utils.block_time_estimator).
+        last_block (int | None): Последний выданный блок.
+    """
+
+    def __init__(self, web3_utils, poll_interval=None, start_block=None):
+        self.web3_utils = web3_utils
+        self.poll_interval = poll_interval
+        self.last_block = None if start_block is None else start_block - 1
+        self._head = threading.Event()
+        self._subscription = None
+
+    def poll(self) -> list:
+        """
+        Возвращает номера блоков, появившихся с предыдущего вызова. При первом вызове без start_block
+        возвращает только последний блок.
+        """
+        head = self.web3_utils.web3.eth.blockNumber
+        self.web3_utils.block_time_estimator.observe(head)
+        if self.last_block is None:
+            self.last_block = head - 1
+        new_blocks = list(range(self.last_block + 1, head + 1))
+        if new_blocks:
+            self.last_block = head
+        return new_blocks
+
+    def next_delay(self) -> float:
+        if self.poll_interval is not None:
+            return self.poll_interval
+        return self.web3_utils.block_time_estimator.poll_delay()
+
+    def blocks(self, max_blocks=None):
+        """
+        Генератор номеров новых блоков. Если новых блоков нет, ожидает до следующего опроса (см. next_delay).
+
+        Args:
+            max_blocks (int, optional): Количество блоков, после которого генератор завершается.
+        """
+        if self.poll_interval is None:
+            self.web3_utils.block_time_estimator.ensure(self.web3_utils)
+        if self.web3_utils.ws_provider and self._subscription is None:
+            self._subscription = self.web3_utils.subscribe_new_heads(lambda head: self._head.set())
+
+        count = 0
+        try:
+            while max_blocks is None or count < max_blocks:
+                self._head.clear()
+                new_blocks = self.poll()
+                for block_number in new_blocks:
+                    yield block_number
+                    count += 1
+                    if max_blocks is not None and count >= max_blocks:
+                        return
+                if not new_blocks:
+                    if self._subscription is not None:
+                        self._head.wait(self.next_delay())
+                    else:
+                        time.sleep(self.next_delay())
+        finally:
+            if self._subscription is not None:
+                self.web3_utils.unsubscribe(self._subscription)
+                self._subscription = None
@@ -0,0 +1,121 @@
+from eth_utils import keccak, to_bytes
+from hexbytes import HexBytes
+
+from .metricsClass import timed
+
+
+def bloom_bits(value: bytes) -> tuple:
+    """
+    Возвращает три бита 2048-битного фильтра Блума (logsBloom), которые устанавливает значение: позиции
+    (индекс байта, маска) по младшим 11 битам первых трех пар байтов keccak-хеша значения.
+    """
+    digest = keccak(value)
+    bits = []
+    for index in (0, 2, 4):
+        bit = ((digest[index] << 8) | digest[index + 1]) & 2047
+        bits.append((255 - bit // 8, 1 << (bit % 8)))
+    return tuple(bits)
+
+
+def bloom_contains(bloom: bytes, bits: tuple) -> bool:
+    """
+    Проверяет, что в фильтре установлены все биты значения. False означает, что значения в блоке точно нет,
+    True — что оно может быть (фильтр Блума допускает ложные срабатывания).
+    """
+    return all(bloom[byte] & mask for byte, mask in bits)
+
+
+class BloomScanner:
+    """
+    Поиск логов контракта без eth_getLogs по фильтру Блума заголовков блоков.
+
+    Заголовки диапазона запрашиваются пакетами (без транзакций), и logsBloom каждого блока локально проверяется
+    на адрес контракта и хотя бы один из topic0 фильтра. Квитанции запрашиваются только для блоков, которые
+    могут содержать подходящие логи: одним eth_getBlockReceipts на блок, а если узел его не поддерживает —
+    пакетом eth_getTransactionReceipt по транзакциям блока. Используется Web3Utils.get_logs для сетей,
+    где eth_getLogs ограничен или отключен (ContractConfig(logs_api=False)).
+
+    Атрибуты:
+        web3_utils (Web3Utils): Объект Web3Utils с контрактом.
+        batch_size (int): Количество заголовков в одном пакетном запросе.
+        stats (dict): Счетчики последнего сканирования: blocks, candidates (блоки, прошедшие фильтр),
+                      receipts (запрошенные квитанции), false_positives (кандидаты без подходящих логов).
+    """
+
+    def __init__(self, web3_utils, batch_size=100):
+        self.web3_utils = web3_utils
+        self.batch_size = batch_size
+        self.stats = {}
+        self._block_receipts = None
+
+    def _topic_filter(self, topics) -> list | None:
+        # Поддерживается фильтр только по topic0: строка или список альтернатив
+        if not topics or topics[0] is None:
+            return None
+        topic0 = topics[0] if isinstance(topics[0], list) else [topics[0]]
+        return [HexBytes(topic) for topic in topic0]
+
+    def _matches(self, log, address: str, topic0) -> bool:
+        if log['address'].lower() != address:
+            return False
+        return topic0 is None or bool(log['topics']) and HexBytes(log['topics'][0]) in topic0
+
+    @staticmethod
+    def _hex(value) -> str:
+        return value if isinstance(value, str) else HexBytes(value).hex()
+
+    def _receipts(self, header) -> list:
+        if self._block_receipts is not False:
+            try:
+                receipts = self.web3_utils.rpc_batch([('eth_getBlockReceipts', [self._hex(header['hash'])])])[0]
+                self._block_receipts = True
+                return receipts
+            except ValueError:
+                if self._block_receipts:
+                    raise
+                # Узел не поддерживает eth_getBlockReceipts: дальше квитанции запрашиваются по транзакциям
+                self._block_receipts = False
+        return self.web3_utils.rpc_batch([('eth_getTransactionReceipt', [self._hex(tx_hash)])
+                                          for tx_hash in header['transactions']])
+
+    def get_logs(self, from_block: int, to_block: int, topics: list = None) -> list:
+        """
+        Возвращает логи контракта за диапазон блоков в формате eth_getLogs.
+
+        Args:
+            from_block (int): Начальный блок (включительно).
+            to_block (int): Конечный блок (включительно).
+            topics (list, optional): Фильтр topics в формате eth_getLogs; учитывается только topic0.
+
+        Returns:
+            list: Логи в порядке блоков и logIndex.
+        """
+        address = self.web3_utils.contract_obj.address.lower()
+        topic0 = self._topic_filter(topics)
+        address_bits = bloom_bits(to_bytes(hexstr=address))
+        topic_bits = None if topic0 is None else [bloom_bits(topic) for topic in topic0]
+        self.stats = {'blocks': 0, 'candidates': 0, 'receipts': 0, 'false_positives': 0}
+
+        logs = []
+        for start in range(from_block, to_block + 1, self.batch_size):
+            numbers = range(start, min(start + self.batch_size - 1, to_block) + 1)
+            with timed('get_headers'):
+                headers = self.web3_utils.rpc_batch([('eth_getBlockByNumber', [hex(number), False])
+                                                     for number in numbers])
+            self.stats['blocks'] += len(headers)
+            for header in headers:
+                bloom = bytes(HexBytes(header['logsBloom']))
+                if not bloom_contains(bloom, address_bits):
+                    continue
+                if topic_bits is not None and not any(bloom_contains(bloom, bits) for bits in topic_bits):
+                    continue
+                self.stats['candidates'] += 1
+                with timed('get_receipts'):
+                    receipts = self._receipts(header)
+                self.stats['receipts'] += len(receipts)
+                block_logs = [log for receipt in receipts for log in receipt['logs']
+                              if self._matches(log, address, topic0)]
+                if not block_logs:
+                    self.stats['false_positives'] += 1
+                logs.extend(block_logs)
+        return logs
@@ -1,9 +1,27 @@
 import requests
 import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from hexbytes import HexBytes
 from web3 import Web3
-from web3.contract import Contract
-from web3.middleware import geth_poa_middleware
-from web3.exceptions import MismatchedABI, TransactionNotFound
+from web3.datastructures import AttributeDict
+from web3.exceptions import MismatchedABI, TimeExhausted, TransactionNotFound
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.events import event_abi_to_log_topic
+from web3._utils.method_formatters import block_formatter, log_entry_formatter, receipt_formatter
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3._utils.request import make_post_request
+from web3.middleware.geth_poa import geth_poa_cleanup
+
+from .abiRegistryClass import abi_registry
+from .blockTimeClass import BlockTimeEstimator
+from .bloomScannerClass import BloomScanner
+from .contractPoolClass import ContractHandle, connection_pool
+from .eventDecoderClass import get_event_decoder, supports_batch_decoding
+from .metricsClass import current_recorder, timed
+from .preflightClass import TransactionReverted, decode_revert_reason, gas_cache, revert_data_from_error
+from .seriesClass import series_cache, to_series_array
 
 
 class Web3Utils:
@@ -17,10 +35,16 @@ class Web3Utils:
         provider (str): URL провайдера для подключения к блокчейну.
         url_abi (str): Базовый URL для доступа к ABI контракта.
         chain_id (int): Идентификатор цепочки для выполнения транзакций.
-        web3 (Web3): Экземпляр Web3 для взаимодействия с блокчейном.
-        contract_obj (Contract, optional): Объект контракта для взаимодействия, может быть None.
+        web3 (Web3): Экземпляр Web3 для взаимодействия с блокчейном, общий для всех объектов с тем же провайдером.
+        contract_obj (ContractHandle, optional): Легковесный объект контракта для взаимодействия, может быть None.
         url_tx_explorer (str, optional): URL-адрес проводника транзакций, может быть None.
         path_abi (str, optional): Путь к локальному файлу с ABI контракта, может быть None.
+        abi_schema (AbiSchema, optional): Разобранное ABI с готовыми схемами методов, может быть None.
+        ws_provider (str, optional): URL WebSocket-провайдера из конфигурации. Если указан, квитанции ожидаются
+                                     по уведомлениям о новых блоках, а события доступны через subscribe_events.
+        block_time_estimator (BlockTimeEstimator): Оценка интервала блоков сети, общая для конфигурации сети.
+        dev_chain (bool): Подключение к цепочке разработки со снимками состояния (см. devChainClass.DevChain).
+        logs_api (bool): Узел поддерживает eth_getLogs. Если False, get_logs ищет логи по фильтру Блума заголовков.
 
     Аргументы:
         contract_config: Конфигурация подключения к блокчейну и контракту.
@@ -29,51 +53,68 @@ class Web3Utils:
         path_abi (str, optional): Путь к локальному файлу с ABI контракта.
     """
 
+    # Лимит газа для транзакций, газ которых не удалось оценить
+    default_gas = 1000000
+    # Количество успешных запросов eth_getLogs подряд, после которого уменьшенный диапазон get_logs удваивается
+    logs_step_growth = 4
+
     def __init__(self, contract_config, contract_address=None, abi=None, path_abi=None, proxy_address=None):
         self.provider = contract_config.provider
+        self.ws_provider = getattr(contract_config, 'ws_provider', None)
+        self.block_time_estimator = getattr(contract_config, 'block_time_estimator', None) or BlockTimeEstimator()
         self.url_abi = contract_config.url_abi
         self.abi = abi
+        self.abi_schema = None
         self.path_abi = path_abi
         self.proxy_address = proxy_address
-        self.chain_id = contract_config.chain_id
-        self.web3 = Web3(Web3.HTTPProvider(self.provider))
-        self.web3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        self.dev_chain = getattr(contract_config, 'dev_chain', False)
+        self.logs_api = getattr(contract_config, 'logs_api', True)
+        self._bloom_scanner = None
+        self.web3 = connection_pool.get_web3(self.provider)
+        self.chain_id = contract_config.chain_id or self.web3.eth.chainId
         self.contract_obj = None if contract_address is None else self.new_contract(contract_address)
         self.url_tx_explorer = contract_config.url_tx_explorer
 
-    def new_contract(self, contract_address: str) -> Contract:
+    def new_contract(self, contract_address: str) -> ContractHandle:
         """
         Создает и возвращает объект контракта по указанному адресу, используя ABI.
         Если ABI не было предоставлено в конструкторе, оно получается через HTTP-запрос
         к указанному URL-адресу ABI или из локального файла, если был предоставлен путь к файлу.
+        Загруженное по URL ABI кэшируется в abi_registry, поэтому повторные объекты не запрашивают его снова.
+
+        ABI интернируется в abi_registry по содержимому, а фабрика контракта разделяется всеми объектами
+        с тем же провайдером и ABI, поэтому возвращаемый объект хранит только ссылку на фабрику и адрес.
 
         Args:
             contract_address (str): Адрес контракта в сети.
 
         Returns:
-            Contract: Объект контракта для взаимодействия с ним.
+            ContractHandle: Объект контракта для взаимодействия с ним.
         """
         if self.path_abi:
-            with open(self.path_abi, 'r') as abi_file:
-                abi = json.load(abi_file)
+            self.abi_schema = abi_registry.from_file(self.path_abi)
         elif self.url_abi:
             if self.proxy_address:
                 url = self.url_abi + self.proxy_address
             else:
                 url = self.url_abi + contract_address
-            headers = {'User-Agent': 'Mozilla/5.0'}
-            while True:
-                response = requests.get(url, headers=headers).text
-                abi = json.loads(response)['result']
-                if abi != 'Max rate limit reached, please use API Key for higher rate limit':
-                    break
-
+            self.abi_schema = abi_registry.from_url(url, self.fetch_abi)
         else:
-            abi = self.abi
-        if type(abi) is str:
-            abi = json.loads(abi)
-        self.abi = abi
-        return self.web3.eth.contract(address=contract_address, abi=abi)
+            self.abi_schema = abi_registry.intern(self.abi)
+        self.abi = self.abi_schema.abi
+        return connection_pool.get_contract(self.provider, self.abi_schema, contract_address)
+
+    @staticmethod
+    def fetch_abi(url: str) -> list | str:
+        """
+        Загружает ABI из API эксплорера, повторяя запрос, пока API ограничивает частоту запросов.
+        """
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        while True:
+            response = requests.get(url, headers=headers).text
+            abi = json.loads(response)['result']
+            if abi != 'Max rate limit reached, please use API Key for higher rate limit':
+                return abi
 
     def read_method(self, method_name: str, *args) -> str | int | bool:
         """
@@ -87,23 +128,270 @@ class Web3Utils:
             Union[str, int, bool]: Результат выполнения метода контракта.
         """
         method = self.contract_obj.functions[method_name](*args)
-        return method.call()
+        with timed('read'):
+            return method.call()
+
+    def rpc_batch(self, calls: list, raise_errors=True, batch_size=100) -> list:
+        """
+        Выполняет несколько JSON-RPC запросов пакетом (JSON-RPC batch) и возвращает их результаты в исходном порядке.
+
+        Для HTTP-провайдера запросы отправляются одним POST-запросом на каждые batch_size вызовов и результаты
+        возвращаются как есть (числа и байты в hex). Для остальных провайдеров запросы выполняются по очереди
+        через web3, и результаты уже приведены middleware web3 к питоновским типам, поэтому вызывающий код
+        должен принимать оба вида (см. to_int).
+
+        Args:
+            calls (list): Список пар (метод, параметры), например ('eth_getBalance', [address, 'latest']).
+            raise_errors (bool): Если True, ошибка любого запроса вызывает ValueError, иначе вместо результата возвращается None.
+            batch_size (int): Максимальное количество запросов в одном пакете.
+
+        Returns:
+            list: Результаты запросов в исходном порядке.
+
+        Raises:
+            ValueError: Если узел вернул ошибку и raise_errors=True.
+        """
+        results = []
+        for item in self._rpc_batch_items(calls, batch_size):
+            if 'error' in item:
+                if raise_errors:
+                    raise ValueError(item['error'])
+                results.append(None)
+            else:
+                results.append(item.get('result'))
+        return results
+
+    def _rpc_batch_items(self, calls: list, batch_size=100) -> list:
+        """
+        Выполняет запросы как rpc_batch, но возвращает ответы целиком: словари с ключом 'result' или 'error'.
+        Нужен, когда важны данные ошибки (например, данные отката для расшифровки причины).
+        """
+        if not isinstance(self.web3.provider, Web3.HTTPProvider):
+            items = []
+            for method, params in calls:
+                try:
+                    items.append({'result': self.web3.manager.request_blocking(method, params)})
+                except ValueError as e:
+                    error = e.args[0] if e.args and isinstance(e.args[0], dict) else {'message': str(e)}
+                    items.append({'error': error})
+            return items
+
+        items = []
+        provider = self.web3.provider
+        for start in range(0, len(calls), batch_size):
+            chunk = calls[start:start + batch_size]
+            payload = [{'jsonrpc': '2.0', 'id': index, 'method': method, 'params': params}
+                       for index, (method, params) in enumerate(chunk)]
+            raw = make_post_request(provider.endpoint_uri, json.dumps(payload).encode('utf-8'),
+                                    **provider.get_request_kwargs())
+            response = json.loads(raw)
+            if isinstance(response, dict):
+                # Узел не поддерживает пакетные запросы и вернул одну ошибку на весь пакет
+                raise ValueError(response.get('error', response))
+
+            by_id = {item['id']: item for item in response}
+            items.extend(by_id.get(index, {'error': 'missing response'}) for index in range(len(chunk)))
+        return items
+
+    @staticmethod
+    def to_int(value) -> int | None:
+        """
+        Приводит числовое поле результата rpc_batch (hex-строку или число) к int.
+        """
+        if value is None or isinstance(value, int):
+            return value
+        return int(value, 16)
+
+    @staticmethod
+    def format_block_identifier(block_identifier) -> str:
+        """
+        Приводит номер блока к формату JSON-RPC: целые числа переводятся в hex, строки ('latest', 'pending', хеш)
+        возвращаются без изменений.
+        """
+        if isinstance(block_identifier, int):
+            return hex(block_identifier)
+        return block_identifier
+
+    def batch_call(self, calls: list, block_identifier='latest') -> list:
+        """
+        Выполняет несколько методов чтения контракта одним пакетным запросом eth_call, зафиксированным на блоке.
+
+        Args:
+            calls (list): Список вызовов вида (method_name, args) или (method_name, args, block_identifier),
+                          где args — список или кортеж аргументов метода.
+            block_identifier (int | str): Блок, на котором выполняются вызовы без собственного блока.
+
+        Returns:
+            list: Декодированные результаты в порядке вызовов (в том же виде, что возвращает read_method).
+
+        Raises:
+            ValueError: Если вызов завершился ошибкой (например, revert) или метод не найден в ABI.
+        """
+        requests_batch = []
+        output_types = []
+        for call in calls:
+            method_name, args = call[0], list(call[1])
+            block = call[2] if len(call) > 2 else block_identifier
+            fn_abi = self.abi_schema.get_function(method_name, len(args))
+            if fn_abi is None:
+                raise ValueError(f"Метод {method_name} с {len(args)} аргументами не найден в ABI контракта")
+            output_types.append(get_abi_output_types(fn_abi))
+            data = self.contract_obj.encodeABI(fn_name=method_name, args=args)
+            requests_batch.append(('eth_call', [{'to': self.contract_obj.address, 'data': data},
+                                                self.format_block_identifier(block)]))
+
+        with timed('read_batch'):
+            raw_results = self.rpc_batch(requests_batch)
+
+        results = []
+        for types, raw in zip(output_types, raw_results):
+            decoded = self.web3.codec.decode_abi(types, HexBytes(raw))
+            normalized = map_abi_data(BASE_RETURN_NORMALIZERS, types, decoded)
+            results.append(normalized[0] if len(normalized) == 1 else list(normalized))
+        return results
+
+    # Глубина, начиная с которой блоки считаются финализированными, если узел не поддерживает тег 'finalized'
+    finality_depth = 64
+
+    def get_finalized_block(self) -> int:
+        """
+        Возвращает номер последнего финализированного блока: по тегу 'finalized', а если узел его
+        не поддерживает, — последний блок минус finality_depth.
+        """
+        finalized, head = self.rpc_batch([('eth_getBlockByNumber', ['finalized', False]), ('eth_blockNumber', [])],
+                                         raise_errors=False)
+        if finalized:
+            return self.to_int(finalized['number'])
+        return self.to_int(head) - self.finality_depth
+
+    def read_series(self, method_name: str, args=(), blocks=None, batch_size=100, max_workers=4):
+        """
+        Читает метод контракта на каждом из указанных блоков, например totalSupply на каждом N-м блоке диапазона.
+
+        Вызовы eth_call фиксируются на блоках и выполняются пакетами (batch_call) в пуле из max_workers потоков.
+        Значения на финализированных блоках кэшируются без ограничения срока (seriesClass.series_cache),
+        поэтому повторное чтение того же ряда запрашивает у узла только новые блоки. Для старых блоков нужен
+        архивный узел.
+
+        Args:
+            method_name (str): Название метода чтения.
+            args (list | tuple): Аргументы метода.
+            blocks (Iterable[int]): Номера блоков, например range(start, stop, step).
+            batch_size (int): Количество вызовов в одном пакетном запросе.
+            max_workers (int): Максимальное количество одновременных пакетных запросов.
+
+        Returns:
+            numpy.ndarray | list: Структурированный массив с полями 'block' и 'value' в порядке блоков
+                                  (см. seriesClass.to_series_array). Большие целые хранятся как объекты Python.
+                                  Если NumPy не установлен — список пар (блок, значение).
+
+        Raises:
+            ValueError: Если вызов завершился ошибкой (например, на блоке до деплоя контракта).
+        """
+        blocks = [int(block) for block in blocks]
+        key = series_cache.key(self.chain_id, self.contract_obj.address, method_name, args)
+        values = series_cache.get_many(key, blocks)
+        missing = sorted({block for block in blocks if block not in values})
+
+        if missing:
+            finalized = self.get_finalized_block()
+            chunks = [missing[start:start + batch_size] for start in range(0, len(missing), batch_size)]
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                results = executor.map(lambda chunk: self.batch_call([(method_name, args, block) for block in chunk]),
+                                       chunks)
+                fetched = {}
+                for chunk, chunk_values in zip(chunks, results):
+                    fetched.update(zip(chunk, chunk_values))
+            series_cache.put_many(key, {block: value for block, value in fetched.items() if block <= finalized})
+            values.update(fetched)
+
+        return to_series_array(blocks, [values[block] for block in blocks])
+
+    def simulate_transaction(self, method_name: str, *args, wallet_address: str, value=0, call=True,
+                             estimate=True) -> int | None:
+        """
+        Проверяет вызов метода контракта перед отправкой: eth_call и eth_estimateGas выполняются одним пакетным
+        запросом на последнем блоке. Оценка газа сохраняется в общем кэше (preflightClass.gas_cache).
+
+        Args:
+            method_name (str): Название метода контракта.
+            *args: Аргументы метода.
+            wallet_address (str): Адрес отправителя.
+            value (int): Количество нативной валюты в транзакции.
+            call (bool): Выполнять ли eth_call.
+            estimate (bool): Выполнять ли eth_estimateGas.
+
+        Returns:
+            int | None: Лимит газа с запасом (см. GasEstimateCache) или None, если оценка не запрашивалась.
+
+        Raises:
+            TransactionReverted: Если вызов откатывается; причина расшифровывается по данным отката.
+        """
+        transaction = {
+            'from': wallet_address,
+            'to': self.contract_obj.address,
+            'value': hex(value),
+            'data': self.contract_obj.encodeABI(fn_name=method_name, args=list(args)),
+        }
+        calls = []
+        if call:
+            calls.append(('eth_call', [transaction, 'latest']))
+        if estimate:
+            calls.append(('eth_estimateGas', [transaction]))
+        with timed('preflight'):
+            items = self._rpc_batch_items(calls)
+
+        for item in items:
+            if 'error' in item:
+                message, data = revert_data_from_error(item['error'])
+                reason = decode_revert_reason(data, self.abi_schema.errors, self.web3.codec) if data else None
+                raise TransactionReverted(reason or message, data)
+        if not estimate:
+            return None
+        key = gas_cache.key(self.chain_id, self.contract_obj.address, method_name, args)
+        return gas_cache.put(key, self.to_int(items[-1]['result']))
+
+    def _broadcast(self, raw_transaction, recorder) -> tuple[str, int | None]:
+        """
+        Отправляет подписанную транзакцию и возвращает ее хеш и номер последнего блока перед отправкой.
+
+        Номер блока нужен только для задержки включения в блоках (TimingRecorder.track_blocks), поэтому
+        запрашивается лишь при активном сборщике и в одном пакете с eth_sendRawTransaction, без отдельного
+        обращения к узлу.
+        """
+        if recorder is None or not recorder.track_blocks:
+            return HexBytes(self.web3.eth.sendRawTransaction(raw_transaction)).hex(), None
+        head, sent = self._rpc_batch_items([('eth_blockNumber', []),
+                                            ('eth_sendRawTransaction', ['0x' + bytes(raw_transaction).hex()])])
+        if 'error' in sent:
+            raise ValueError(sent['error'])
+        head_block = None if 'error' in head else self.to_int(head['result'])
+        self.block_time_estimator.observe(head_block)
+        return HexBytes(sent['result']).hex(), head_block
 
     def send_transaction(self, method_name: str,
-                         *args, user_wallet=None, wallet_address=None, private_key=None, value=0, gas=1000000, gasPriceMultiplier=1) -> str | bool:
+                         *args, user_wallet=None, wallet_address=None, private_key=None, value=0, gas=None, gasPriceMultiplier=1,
+                         nonce=None, gas_price=None, preflight=False) -> str | bool:
         """
         Отправляет транзакцию для вызова метода контракта, используя кошелек и приватный ключ. Параметры кошелька и ключа
         могут быть предоставлены либо через объект user_wallet класса UserWallet, либо через прямое указание
         wallet_address и private_key.
 
         Args:
-            gas (int): Количество газа для транзакции
+            gas (int, optional): Количество газа для транзакции. Если не указано, используется оценка газа из кэша
+                                 (preflightClass.gas_cache), а при ее отсутствии — eth_estimateGas с запасом.
             value (int): Количество нативной валюты в транзакции
             method_name (str): Название метода контракта для вызова.
             *args: Аргументы метода.
             user_wallet (UserWallet, optional): Объект кошелька пользователя.
             wallet_address (str, optional): Адрес кошелька отправителя.
             private_key (str, optional): Приватный ключ кошелька отправителя.
+            nonce (int, optional): Nonce транзакции. Если не указан, запрашивается у сети. Позволяет отправлять
+                                   несколько транзакций подряд без ожидания подтверждения предыдущих.
+            gas_price (int, optional): Цена газа в wei. Если не указана, запрашивается у сети и умножается
+                                       на gasPriceMultiplier.
+            preflight (bool): Если True, перед подписью выполняется eth_call (см. simulate_transaction), и транзакция,
+                              которая откатится, не отправляется.
 
         Returns:
             Union[str, bool]: Хэш транзакции в случае успеха или False в случае ошибки.
@@ -121,25 +409,53 @@ class Web3Utils:
             print("Не удалось подключиться к сети Ethereum.")
             return False
 
-        method = self.contract_obj.functions[method_name](*args)
+        started = time.monotonic()
+
+        if gas is None:
+            gas = gas_cache.get(gas_cache.key(self.chain_id, self.contract_obj.address, method_name, args))
+        if preflight or gas is None:
+            try:
+                estimated = self.simulate_transaction(method_name, *args, wallet_address=wallet_address, value=value,
+                                                      call=preflight, estimate=gas is None)
+            except TransactionReverted as e:
+                if preflight:
+                    print(f"Транзакция {method_name} откатится: {e.reason}")
+                    return False
+                # Оценка могла не учесть еще не подтвержденные транзакции отправителя
+                print(f"Не удалось оценить газ для {method_name} ({e.reason}), используется {self.default_gas}")
+                estimated = self.default_gas
+            gas = gas or estimated
+
+        if gas_price is None:
+            with timed('gas_price'):
+                gas_price = int(self.web3.eth.gasPrice * gasPriceMultiplier)
+        if nonce is None:
+            with timed('nonce'):
+                nonce = self.web3.eth.getTransactionCount(wallet_address)
 
         transaction = {
             'to': self.contract_obj.address,
             'value': value,
             'gas': gas,
-            'gasPrice': int(self.web3.eth.gasPrice * gasPriceMultiplier),
-            'nonce': self.web3.eth.getTransactionCount(wallet_address),
+            'gasPrice': gas_price,
+            'nonce': nonce,
             'chainId': self.chain_id
         }
 
-        transaction['data'] = method.buildTransaction({'from': wallet_address, 'gas': 285000})['data']
+        transaction['data'] = self.contract_obj.encodeABI(fn_name=method_name, args=list(args))
 
-        signed_transaction = self.web3.eth.account.sign_transaction(transaction, private_key)
+        with timed('sign'):
+            signed_transaction = self.web3.eth.account.sign_transaction(transaction, private_key)
+
+        recorder = current_recorder()
 
         try:
-            tx_hash = self.web3.eth.sendRawTransaction(signed_transaction.rawTransaction)
-            print(f"Транзакция успешно отправлена. Хэш транзакции: {tx_hash.hex()}")
-            return tx_hash.hex()
+            with timed('broadcast'):
+                tx_hash, head_block = self._broadcast(signed_transaction.rawTransaction, recorder)
+            if recorder is not None:
+                recorder.submitted(tx_hash, started, head_block)
+            print(f"Транзакция успешно отправлена. Хэш транзакции: {tx_hash}")
+            return tx_hash
         except Exception as e:
             print(f"Ошибка при отправке транзакции: {e}")
             return False
@@ -245,7 +561,8 @@ class Web3Utils:
             print(f"Ошибка при деплое контракта: {e}")
             return False
 
-    def send_native_currency(self, to_address: str, value: int, user_wallet=None, private_key=None) -> str | bool:
+    def send_native_currency(self, to_address: str, value: int, user_wallet=None, private_key=None,
+                             nonce=None, gas_price=None) -> str | bool:
         """
         Отправляет транзакцию, переводя нативную валюту на указанный адрес. Параметры кошелька и ключа
         могут быть предоставлены либо через объект user_wallet класса UserWallet, либо через прямое указание
@@ -256,6 +573,8 @@ class Web3Utils:
             value (int): Количество нативной валюты в wei для отправки.
             user_wallet (UserWallet, optional): Объект кошелька пользователя для отправки.
             private_key (str, optional): Приватный ключ кошелька отправителя.
+            nonce (int, optional): Nonce транзакции. Если не указан, запрашивается у сети.
+            gas_price (int, optional): Цена газа в wei. Если не указана, запрашивается у сети.
 
         Returns:
             Union[str, bool]: Хэш транзакции в случае успеха или False в случае ошибки.
@@ -273,36 +592,80 @@ class Web3Utils:
             print("Не удалось подключиться к сети Ethereum.")
             return False
 
+        started = time.monotonic()
+        if gas_price is None:
+            with timed('gas_price'):
+                gas_price = self.web3.eth.gasPrice
+        if nonce is None:
+            with timed('nonce'):
+                nonce = self.web3.eth.getTransactionCount(wallet_address)
+
         transaction = {
             'to': to_address,
             'value': value,
             'gas': 21000,
-            'gasPrice': self.web3.eth.gasPrice,
-            'nonce': self.web3.eth.getTransactionCount(wallet_address),
+            'gasPrice': gas_price,
+            'nonce': nonce,
             'chainId': self.chain_id,
         }
 
-        signed_transaction = self.web3.eth.account.sign_transaction(transaction, private_key)
+        with timed('sign'):
+            signed_transaction = self.web3.eth.account.sign_transaction(transaction, private_key)
+
+        recorder = current_recorder()
 
         try:
-            tx_hash = self.web3.eth.sendRawTransaction(signed_transaction.rawTransaction)
-            print(f"Транзакция успешно отправлена. Хэш транзакции: {tx_hash.hex()}")
-            return tx_hash.hex()
+            with timed('broadcast'):
+                tx_hash, head_block = self._broadcast(signed_transaction.rawTransaction, recorder)
+            if recorder is not None:
+                recorder.submitted(tx_hash, started, head_block)
+            print(f"Транзакция успешно отправлена. Хэш транзакции: {tx_hash}")
+            return tx_hash
         except Exception as e:
             print(f"Ошибка при отправке транзакции: {e}")
             return False
 
-    def wait_transaction_receipt(self, tx_hash):
+    def wait_transaction_receipt(self, tx_hash, timeout=120):
         """
         Ожидает подтверждения транзакции.
 
+        Если в конфигурации указан WebSocket-провайдер, квитанция проверяется при каждом уведомлении
+        о новом блоке (см. subscriptionClass.ReceiptWaiter). Иначе квитанция опрашивается вместе с номером
+        последнего блока, а опросы планируются по ожидаемому появлению блоков (см. BlockTimeEstimator).
+
         Параметры:
             tx_hash (str): Хеш транзакции для ожидания.
+            timeout (float): Максимальное время ожидания в секундах.
 
         Возвращает:
             TransactionReceipt: Получает квитанцию транзакции после ее подтверждения.
+
+        Исключения:
+            TimeExhausted: Если транзакция не подтвердилась за timeout.
         """
-        return self.web3.eth.waitForTransactionReceipt(tx_hash)
+        with timed('receipt_wait'):
+            if self.ws_provider:
+                receipt = connection_pool.get_receipt_waiter(self).wait(tx_hash, timeout)
+            else:
+                receipt = self._poll_transaction_receipt(HexBytes(tx_hash).hex(), timeout)
+        recorder = current_recorder()
+        if recorder is not None:
+            recorder.included(HexBytes(tx_hash).hex(), receipt['blockNumber'])
+        return receipt
+
+    def _poll_transaction_receipt(self, tx_hash, timeout):
+        estimator = self.block_time_estimator
+        estimator.ensure(self)
+        deadline = time.monotonic() + timeout
+        while True:
+            receipt, head = self.rpc_batch([('eth_getTransactionReceipt', [tx_hash]), ('eth_blockNumber', [])],
+                                           raise_errors=False)
+            estimator.observe(self.to_int(head))
+            if receipt:
+                return AttributeDict.recursive(receipt_formatter(receipt))
+            if time.monotonic() > deadline:
+                raise TimeExhausted(f"Transaction {tx_hash} is not in the chain after {timeout} seconds")
+            estimator.sleep()
 
     def list_methods(self) -> dict:
         """
@@ -315,39 +678,14 @@ class Web3Utils:
         Returns:
             dict: Словарь с ключами 'read_methods' и 'write_methods', каждый из которых содержит список строк.
                   Каждая строка в списках представляет название метода контракта соответствующей категории.
+                  Схемы методов строятся один раз для ABI и возвращаются без копирования.
         """
-        read_methods = []
-        write_methods = []
-        for method in self.abi:
-            if method["type"] == "function":
-                if method['stateMutability'] == 'view':
-                    inputs_method = []
-                    outputs_method = []
-
-                    for inputs in method["inputs"]:
-                        inputs_method.append({
-                            "name": inputs["name"],
-                            "type": inputs["type"]
-                        })
-                    for outputs in method["outputs"]:
-                        outputs_method.append({
-                            "name": outputs["name"],
-                            "type": outputs["type"]
-                        })
-                    read_methods.append({
-                        'name': method['name'],
-                        'inputs': inputs_method,
-                        "outputs": outputs_method
-                    })
-                elif method['stateMutability'] == 'nonpayable' or method['stateMutability'] == 'payable':
-                    write_methods.append({
-                        'name': method['name'],
-                        'inputs': method['inputs'],
-                        "payable": False if method['stateMutability'] == 'nonpayable' else True,
-                    })
+        if self.abi_schema is None or self.abi_schema.abi is not self.abi:
+            self.abi_schema = abi_registry.intern(self.abi)
+            self.abi = self.abi_schema.abi
         list_methods = {
-            'read_methods': read_methods,
-            'write_methods': write_methods
+            'read_methods': self.abi_schema.read_methods,
+            'write_methods': self.abi_schema.write_methods
         }
         return list_methods
 
@@ -358,11 +696,68 @@ class Web3Utils:
         Returns:
             List[str]: Список имен событий контракта.
         """
-        events = self.contract_obj.events
+        return sorted(self.abi_schema.events)
 
-        all_events = [name for name in dir(events) if not name.startswith('_') and not name == 'abi']
+    def subscribe_new_heads(self, callback) -> int:
+        """
+        Подписывается на уведомления о новых блоках через WebSocket-провайдер.
 
-        return all_events
+        Args:
+            callback: Функция, вызываемая с заголовком каждого нового блока (словарь в формате JSON-RPC).
+
+        Returns:
+            int: Ключ подписки для unsubscribe.
+
+        Raises:
+            ValueError: Если в конфигурации не указан WebSocket-провайдер.
+        """
+        if not self.ws_provider:
+            raise ValueError("В конфигурации сети не указан ws_provider.")
+        return connection_pool.get_subscription_client(self.ws_provider).subscribe(['newHeads'], callback)
+
+    def subscribe_events(self, callback, event_names=None) -> int:
+        """
+        Подписывается на события контракта через WebSocket-провайдер. Каждый лог расшифровывается так же,
+        как в decode_transaction_logs, и передается в callback сразу после появления блока.
+
+        Args:
+            callback: Функция, вызываемая с каждым расшифрованным событием.
+            event_names (List[str], optional): Список названий событий. Если None, используются все события контракта.
+
+        Returns:
+            int: Ключ подписки для unsubscribe.
+
+        Raises:
+            ValueError: Если в конфигурации не указан WebSocket-провайдер.
+        """
+        if not self.ws_provider:
+            raise ValueError("В конфигурации сети не указан ws_provider.")
+        if event_names is None:
+            event_names = self.list_events()
+
+        events = {}
+        for event_name in event_names:
+            event = getattr(self.contract_obj.events, event_name)()
+            events[event_abi_to_log_topic(event.abi)] = event
+        topics = ['0x' + topic.hex() for topic in events]
+
+        def on_log(raw_log):
+            log = log_entry_formatter(raw_log)
+            event = events.get(bytes(log['topics'][0])) if log['topics'] else None
+            if event is not None:
+                try:
+                    callback(event.processLog(log))
+                except MismatchedABI:
+                    pass
+
+        params = ['logs', {'address': self.contract_obj.address, 'topics': [topics]}]
+        return connection_pool.get_subscription_client(self.ws_provider).subscribe(params, on_log)
+
+    def unsubscribe(self, key):
+        """
+        Отменяет подписку, оформленную через subscribe_new_heads или subscribe_events.
+        """
+        connection_pool.get_subscription_client(self.ws_provider).unsubscribe(key)
 
     def decode_transaction_logs(self, tx_hash: str, event_names=None) -> list:
         """
@@ -408,6 +803,95 @@ class Web3Utils:
 
         return decoded_logs
 
+    def get_logs(self, from_block: int, to_block: int, topics: list = None, step=5000) -> list:
+        """
+        Получает логи контракта за диапазон блоков запросами eth_getLogs по step блоков. Если узел отклоняет
+        запрос (ограничение диапазона блоков или количества логов в ответе), диапазон запроса уменьшается вдвое,
+        а после нескольких успешных запросов подряд снова удваивается, но не больше начального step.
+        Если узел не поддерживает eth_getLogs (logs_api=False в конфигурации или ответ «метод не найден»),
+        логи ищутся по фильтру Блума заголовков блоков (bloomScannerClass.BloomScanner), при этом учитывается
+        только topic0 фильтра.
+
+        Args:
+            from_block (int): Начальный блок (включительно).
+            to_block (int): Конечный блок (включительно).
+            topics (list, optional): Фильтр topics в формате eth_getLogs, например [[topic0, ...]].
+            step (int): Начальный размер диапазона блоков одного запроса.
+
+        Returns:
+            list: Логи в формате eth_getLogs (как их вернул rpc_batch) в порядке блоков.
+
+        Raises:
+            ValueError: Если узел отклоняет запрос даже для одного блока.
+        """
+        logs = []
+        start = from_block
+        max_step = step
+        successes = 0
+        while start <= to_block:
+            if not self.logs_api:
+                if self._bloom_scanner is None:
+                    self._bloom_scanner = BloomScanner(self)
+                return logs + self._bloom_scanner.get_logs(start, to_block, topics)
+            end = min(start + step - 1, to_block)
+            log_filter = {'address': self.contract_obj.address, 'fromBlock': hex(start), 'toBlock': hex(end)}
+            if topics is not None:
+                log_filter['topics'] = topics
+            try:
+                with timed('get_logs'):
+                    logs.extend(self.rpc_batch([('eth_getLogs', [log_filter])])[0])
+            except ValueError as e:
+                error = e.args[0] if e.args else None
+                if isinstance(error, dict) and error.get('code') == -32601:
+                    # Метод eth_getLogs отключен на узле
+                    self.logs_api = False
+                    continue
+                if step == 1:
+                    raise
+                step = max(step // 2, 1)
+                successes = 0
+                continue
+            start = end + 1
+            # Плотный участок логов мог закончиться: диапазон постепенно возвращается к начальному.
+            # Рост только после серии успешных запросов, чтобы на плотном участке не чередовать отказы
+            successes += 1
+            if step < max_step and successes >= self.logs_step_growth:
+                step = min(step * 2, max_step)
+                successes = 0
+        return logs
+
+    def decode_event_logs(self, logs: list, event_name: str):
+        """
+        Расшифровывает большое количество логов одного события, например результат eth_getLogs за диапазон блоков.
+
+        Если все аргументы события статических типов (address, bool, uintN, intN, bytesN) и установлен NumPy,
+        логи расшифровываются векторно в пакет колонок (eventDecoderClass.EventBatch) без создания объекта
+        на каждое событие. Иначе каждый лог расшифровывается через processLog, как в decode_transaction_logs.
+        Логи других событий пропускаются.
+
+        Args:
+            logs (list): Логи в формате eth_getLogs (в том числе результат rpc_batch) или receipt['logs'].
+            event_name (str): Название события.
+
+        Returns:
+            EventBatch | list: Пакет колонок или, для событий с динамическими типами, список расшифрованных событий.
+        """
+        event = getattr(self.contract_obj.events, event_name)()
+        if supports_batch_decoding(event.abi):
+            with timed('decode_logs'):
+                return get_event_decoder(event.abi).decode(logs)
+
+        decoded_logs = []
+        for log in logs:
+            # Логи из ответа HTTP-провайдера (rpc_batch) не приведены к типам web3
+            if isinstance(log['transactionHash'], str):
+                log = log_entry_formatter(log)
+            try:
+                decoded_logs.append(event.processLog(log))
+            except MismatchedABI:
+                continue
+        return decoded_logs
+
     def get_block_info(self, block_number: int, full_transactions: bool=False) -> dict | None:
         """
         Получает и возвращает информацию о блоке по его номеру.
@@ -425,6 +909,71 @@ class Web3Utils:
             print("Произошла ошибка:", e)
             return None
 
+    def iter_blocks(self, start: int, end: int = None, full_transactions=False, to_addresses=None, batch_size=10,
+                    window=8):
+        """
+        Генератор блоков диапазона с упреждающей загрузкой.
+
+        Блоки запрашиваются пакетами по batch_size (rpc_batch) в пуле потоков, при этом загружается не более
+        window пакетов вперед, поэтому память ограничена, а сканирование идет со скоростью, которую допускает
+        провайдер, а не с задержкой одного запроса на блок. Блоки выдаются строго по порядку номеров
+        в том же виде, что возвращает get_block_info.
+
+        Args:
+            start (int): Первый блок.
+            end (int, optional): Последний блок (включительно). По умолчанию последний блок на момент вызова.
+            full_transactions (bool): Загружать транзакции целиком, а не только хеши.
+            to_addresses (Iterable[str], optional): Адреса контрактов. Если указаны, транзакции загружаются
+                                                    целиком, и в блоке остаются только транзакции с полем to
+                                                    из этого набора (прямые вызовы контрактов).
+            batch_size (int): Количество блоков в одном пакетном запросе.
+            window (int): Максимальное количество пакетов, загружаемых одновременно.
+
+        Yields:
+            AttributeDict: Блок. Генератор завершается раньше end, если узел еще не отдает очередной блок.
+        """
+        if end is None:
+            end = self.web3.eth.blockNumber
+        targets = None
+        if to_addresses is not None:
+            targets = {address.lower() for address in to_addresses}
+            full_transactions = True
+
+        def fetch(numbers):
+            with timed('get_blocks'):
+                return self.rpc_batch([('eth_getBlockByNumber', [hex(number), full_transactions])
+                                       for number in numbers])
+
+        chunks = (range(chunk_start, min(chunk_start + batch_size - 1, end) + 1)
+                  for chunk_start in range(start, end + 1, batch_size))
+        executor = ThreadPoolExecutor(max_workers=window)
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(fetch, chunk))
+                if len(pending) >= window:
+                    break
+            while pending:
+                blocks = pending.popleft().result()
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    pending.append(executor.submit(fetch, next_chunk))
+                for block in blocks:
+                    if block is None:
+                        return
+                    if isinstance(block['number'], str):
+                        # Ответ HTTP-провайдера приводится к типам так же, как middleware web3 в get_block_info:
+                        # сначала geth_poa_middleware (connection_pool подключает его ко всем HTTP-провайдерам;
+                        # в POA-сетях extraData длиннее 32 байт), затем стандартные форматтеры блока
+                        block = AttributeDict.recursive(block_formatter(geth_poa_cleanup(block)))
+                    if targets is not None:
+                        transactions = [tx for tx in block['transactions']
+                                        if tx['to'] is not None and tx['to'].lower() in targets]
+                        block = AttributeDict({**block, 'transactions': transactions})
+                    yield block
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def get_transaction_info(self, tx_hash: str) -> dict | None:
         """
         Получает и возвращает информацию о транзакции по ее хешу. В случае отсутствия транзакции,
@@ -484,6 +1033,47 @@ class Web3Utils:
             print(f"Произошла ошибка при получении информации о статусе транзакции: {e}")
             return None
 
+    def get_transaction_receipts(self, tx_hashes: list) -> list:
+        """
+        Получает квитанции нескольких транзакций одним пакетным запросом, не ожидая их подтверждения.
+
+        Args:
+            tx_hashes (list): Список хешей транзакций.
+
+        Returns:
+            list: Квитанции в порядке хешей. Для еще не подтвержденных транзакций или при ошибке — None.
+                  Числовые поля могут быть как hex-строками, так и числами (см. Web3Utils.to_int).
+        """
+        return self.rpc_batch([('eth_getTransactionReceipt', [tx_hash]) for tx_hash in tx_hashes],
+                              raise_errors=False)
+
+    def wait_transaction_receipts(self, tx_hashes: list, timeout=300) -> list:
+        """
+        Ожидает подтверждения нескольких транзакций, запрашивая квитанции еще не подтвержденных
+        транзакций одним пакетным запросом. Опросы планируются по ожидаемому появлению блоков
+        (block_time_estimator).
+
+        Returns:
+            list: Квитанции в порядке хешей в формате get_transaction_receipts.
+                  Для не подтвержденных за timeout транзакций — None.
+        """
+        receipts = [None] * len(tx_hashes)
+        estimator = self.block_time_estimator
+        estimator.ensure(self)
+        deadline = time.monotonic() + timeout
+        while True:
+            pending = [index for index, receipt in enumerate(receipts) if receipt is None]
+            if not pending:
+                break
+            for index, receipt in zip(pending, self.get_transaction_receipts([tx_hashes[index] for index in pending])):
+                receipts[index] = receipt
+                if receipt is not None:
+                    estimator.observe(self.to_int(receipt['blockNumber']))
+            if time.monotonic() > deadline or all(receipts[index] is not None for index in pending):
+                break
+            estimator.sleep()
+        return receipts
+
     def get_contract_address(self, tx_hash: str) -> str:
         """
         Извлекает адрес задеплоенного контракта из хеша транзакции.
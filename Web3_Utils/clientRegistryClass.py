@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+
+from .abiRegistryClass import abi_registry
+from .classWeb3Utils import Web3Utils
+
+
+class ClientRegistry:
+    """
+    Общий для процесса реестр объектов Web3Utils по ключу (сеть, эндпоинт, адрес контракта, источник ABI).
+
+    Объект создается при первом обращении и дальше возвращается всем вызывающим, поэтому ABI контракта
+    загружается один раз, а подключение к провайдеру и фабрика контракта берутся из общих пулов
+    (connection_pool, abi_registry). Реестр хранит не более max_idle объектов: при превышении удаляются
+    давно не запрашивавшиеся. Объекты, на которые остались ссылки у вызывающих, продолжают работать.
+
+    Конфигурации одной сети с разными провайдерами получают разные объекты, как и запросы одного контракта
+    с разным ABI (abi, path_abi или proxy_address): ABI входит в ключ по содержимому, а без явного ABI
+    ключом служит адрес прокси, по которому ABI загружается. Запрос без ABI и прокси возвращает любой
+    уже созданный объект контракта.
+
+    Возвращаемые объекты общие, поэтому вызывающие не должны менять их состояние (например, вызывать
+    new_contract): для другого контракта нужно запросить другой объект. Реестр потокобезопасен.
+
+    Атрибуты:
+        max_idle (int): Максимальное количество хранимых объектов.
+    """
+
+    def __init__(self, max_idle=256):
+        self.max_idle = max_idle
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(contract_config, contract_address=None, abi=None, path_abi=None, proxy_address=None) -> tuple:
+        if abi is not None:
+            abi_source = abi_registry.intern(abi).key
+        elif path_abi:
+            abi_source = abi_registry.from_file(path_abi).key
+        else:
+            abi_source = proxy_address.lower() if proxy_address else None
+        return (contract_config.chain_id, contract_config.provider,
+                contract_address.lower() if contract_address else None, abi_source)
+
+    def get(self, contract_config, contract_address=None, abi=None, path_abi=None, proxy_address=None) -> Web3Utils:
+        """
+        Возвращает общий объект Web3Utils для сети и контракта, создавая его при первом обращении.
+
+        Args:
+            contract_config (ContractConfig): Конфигурация сети.
+            contract_address (str, optional): Адрес контракта. Если не указан, возвращается объект сети без контракта.
+            abi (list, optional): ABI контракта.
+            path_abi (str, optional): Путь к файлу ABI.
+            proxy_address (str, optional): Адрес прокси для загрузки ABI по URL конфигурации.
+
+        Returns:
+            Web3Utils: Объект Web3Utils.
+        """
+        key = self.key(contract_config, contract_address, abi, path_abi, proxy_address)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None and key[3] is None:
+                # ABI не указан: подходит объект контракта, созданный с любым ABI
+                key = next((cached for cached in self._clients if cached[:3] == key[:3]), key)
+                client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+
+        # Создание может загружать ABI по сети, поэтому выполняется без блокировки
+        client = Web3Utils(contract_config, contract_address=contract_address, abi=abi, path_abi=path_abi,
+                           proxy_address=proxy_address)
+        with self._lock:
+            client = self._clients.setdefault(key, client)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.max_idle:
+                self._clients.popitem(last=False)
+        return client
+
+    def discard(self, contract_config=None, contract_address=None):
+        """
+        Удаляет объекты контракта (с любым ABI) из реестра или, если конфигурация не указана, очищает реестр целиком.
+        """
+        with self._lock:
+            if contract_config is None:
+                self._clients.clear()
+            else:
+                prefix = self.key(contract_config, contract_address)[:3]
+                for key in [key for key in self._clients if key[:3] == prefix]:
+                    del self._clients[key]
+
+    def __len__(self):
+        return len(self._clients)
+
+
+client_registry = ClientRegistry()
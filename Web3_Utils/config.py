@@ -1,5 +1,7 @@
 import requests
 
+from .blockTimeClass import BlockTimeEstimator
+
 
 class ContractConfig:
     """
@@ -12,25 +14,45 @@ class ContractConfig:
         chain_id (int): Идентификатор цепочки блокчейна (chain ID) для сети Ethereum.
         url_tx_explorer (str, optional): URL-адрес проводника транзакций (explorer), используемого для отслеживания транзакций.
                                          Может быть None, если отслеживание транзакций не требуется.
+        ws_provider (str, optional): URL-адрес WebSocket-провайдера (ws:// или wss://). Если указан, ожидание квитанций
+                                     и отслеживание блоков работают по подпискам newHeads, доступны подписки на события.
+        block_time_estimator (BlockTimeEstimator): Оценка интервала между блоками сети, по которой планируются опросы.
+                                                   Уточняется по последним заголовкам при первом использовании.
+        dev_chain (bool): Сеть является цепочкой разработки с мгновенным майнингом и снимками состояния
+                          (см. devChainClass.DevChain). TestrunScenario откатывает состояние между тест-кейсами.
+        logs_api (bool): Узел поддерживает eth_getLogs. Если False, логи ищутся по фильтру Блума заголовков
+                         блоков с загрузкой квитанций только подходящих блоков (см. bloomScannerClass.BloomScanner).
     """
     all_configs = []
 
-    def __init__(self, provider, chain_id, url_abi=None, url_tx_explorer=None, name=None):
+    def __init__(self, provider, chain_id=None, url_abi=None, url_tx_explorer=None, name=None, ws_provider=None,
+                 block_time=None, dev_chain=False, logs_api=True):
         """
         Инициализирует объект класса ContractConfig с данными для подключения и взаимодействия с блокчейн-сетью.
 
         Args:
-            provider (str): URL-адрес провайдера для подключения к сети Ethereum.
-            chain_id (int): Идентификатор цепочки блокчейна (chain ID) для сети Ethereum.
+            provider (str): URL-адрес провайдера для подключения к сети Ethereum. 'eth-tester://' — встроенная
+                            в процесс цепочка eth-tester (требует eth-tester[py-evm]).
+            chain_id (int, optional): Идентификатор цепочки блокчейна (chain ID) для сети Ethereum. Если не указан,
+                                      запрашивается у провайдера при создании Web3Utils.
             url_abi (str, optional): URL-адрес для получения ABI контракта. Может быть None, если ABI загружается иначе.
             url_tx_explorer (str, optional): URL-адрес проводника транзакций (explorer), используемого для отслеживания транзакций.
             name (str, optional): Имя конфигурации сети.
+            ws_provider (str, optional): URL-адрес WebSocket-провайдера.
+            block_time (float, optional): Известный интервал между блоками в секундах. Если указан, интервал
+                                          не оценивается по заголовкам блоков.
+            dev_chain (bool): Сеть является цепочкой разработки со снимками состояния (evm_snapshot/evm_revert).
+            logs_api (bool): Узел поддерживает eth_getLogs без существенных ограничений.
         """
         self.provider = provider
         self.url_abi = url_abi
         self.chain_id = chain_id
         self.url_tx_explorer = url_tx_explorer
         self.name = name
+        self.ws_provider = ws_provider
+        self.block_time_estimator = BlockTimeEstimator(block_time)
+        self.dev_chain = dev_chain
+        self.logs_api = logs_api
 
         self.all_configs.append(self)
 
@@ -139,12 +161,31 @@ haven1_devnet = ContractConfig(
     name='Haven1 Devnet',
     provider='https://rpc.staging.haven1.org',
     chain_id=8110,
-    url_tx_explorer='https://explorer.staging.haven1.org/tx/'
+    url_tx_explorer='https://explorer.staging.haven1.org/tx/',
+    logs_api=False
 )
 
 haustnetwork_devnet = ContractConfig(
     name='haustnetwork-devnet',
     provider='https://haustnetwork-devnet-rpc.eu-north-2.gateway.fm',
     chain_id=2079172751,
-    url_tx_explorer='https://haustnetwork-devnet-blockscout.eu-north-2.gateway.fm:443/'
-)
\ No newline at end of file
+    url_tx_explorer='https://haustnetwork-devnet-blockscout.eu-north-2.gateway.fm:443/',
+    logs_api=False
+)
+
+# Локальный узел разработки (anvil, hardhat node) для запуска тестов и нагрузки без внешней сети
+local_devnode_config = ContractConfig(
+    name='Local Dev Node',
+    provider='http://127.0.0.1:8545',
+    ws_provider='ws://127.0.0.1:8545',
+    chain_id=31337,
+    dev_chain=True
+)
+
+# Встроенная в процесс цепочка eth-tester: мгновенный майнинг без внешнего узла
+in_process_config = ContractConfig(
+    name='In-Process EVM',
+    provider='eth-tester://',
+    block_time=1.0,
+    dev_chain=True
+)
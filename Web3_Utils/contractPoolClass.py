@@ -0,0 +1,280 @@
+import threading
+from web3 import Web3
+from web3.middleware import geth_poa_middleware
+from web3._utils.ens import is_ens_name, validate_name_has_address
+from web3._utils.validation import validate_address
+
+from .devChainClass import IN_PROCESS_SCHEME, create_in_process_web3
+
+
+class BoundFunction:
+    """
+    Функция контракта из общей фабрики, привязанная к адресу конкретного контракта.
+
+    При вызове с аргументами возвращает обычный ContractFunction с подставленным адресом,
+    поэтому call, buildTransaction, estimateGas и transact работают как у полноценного объекта контракта.
+    """
+    __slots__ = ('_function', '_address')
+
+    def __init__(self, function, address):
+        self._function = function
+        self._address = address
+
+    def __call__(self, *args, **kwargs):
+        bound = self._function(*args, **kwargs)
+        bound.address = self._address
+        return bound
+
+    def __getattr__(self, name):
+        return getattr(self(), name)
+
+
+class BoundFunctions:
+    """
+    Представление функций общей фабрики контракта для конкретного адреса (аналог Contract.functions).
+    """
+    __slots__ = ('_functions', '_address')
+
+    def __init__(self, functions, address):
+        self._functions = functions
+        self._address = address
+
+    def __getitem__(self, function_name):
+        return BoundFunction(self._functions[function_name], self._address)
+
+    def __getattr__(self, function_name):
+        return BoundFunction(getattr(self._functions, function_name), self._address)
+
+    def __iter__(self):
+        return iter(self._functions)
+
+    def __contains__(self, function_name):
+        return hasattr(self._functions, function_name)
+
+
+class BoundEvent:
+    """
+    Событие контракта из общей фабрики, привязанное к адресу конкретного контракта.
+    """
+    __slots__ = ('_event', '_address')
+
+    def __init__(self, event, address):
+        self._event = event
+        self._address = address
+
+    def __call__(self):
+        event = self._event()
+        event.address = self._address
+        return event
+
+    def __getattr__(self, name):
+        return getattr(self(), name)
+
+
+class BoundEvents:
+    """
+    Представление событий общей фабрики контракта для конкретного адреса (аналог Contract.events).
+    """
+    __slots__ = ('_events', '_address')
+
+    def __init__(self, events, address):
+        self._events = events
+        self._address = address
+
+    def __getitem__(self, event_name):
+        return BoundEvent(self._events[event_name], self._address)
+
+    def __getattr__(self, event_name):
+        return BoundEvent(getattr(self._events, event_name), self._address)
+
+    def __iter__(self):
+        return iter(self._events)
+
+
+class ContractHandle:
+    """
+    Легковесный объект контракта: ссылка на общую фабрику контракта и адрес.
+
+    Фабрика (класс контракта web3 с разобранным ABI) создается один раз на пару (провайдер, ABI)
+    и разделяется всеми адресами с таким же ABI, поэтому тысячи токенов с одинаковым ABI
+    не хранят собственных копий ABI и функций контракта.
+
+    Как и web3.eth.contract, дескриптор принимает ENS-имя вместо адреса. Имя разрешается в адрес один раз
+    при создании: адрес контракта используется и в пакетных JSON-RPC запросах (Web3Utils.rpc_batch),
+    которые не проходят через middleware web3, разрешающий ENS-имена.
+
+    Атрибуты:
+        factory: Общая фабрика контракта (результат web3.eth.contract(abi=...)).
+        address (str): Адрес контракта в формате checksum.
+
+    Raises:
+        NameNotFound: Если ENS-имя не указывает на адрес.
+    """
+    __slots__ = ('factory', 'address', '__weakref__')
+
+    def __init__(self, factory, address):
+        if is_ens_name(address):
+            address = validate_name_has_address(factory.web3.ens, address)
+        else:
+            validate_address(address)
+        self.factory = factory
+        self.address = address
+
+    @property
+    def abi(self):
+        return self.factory.abi
+
+    @property
+    def web3(self):
+        return self.factory.web3
+
+    @property
+    def functions(self):
+        return BoundFunctions(self.factory.functions, self.address)
+
+    @property
+    def events(self):
+        return BoundEvents(self.factory.events, self.address)
+
+    def encodeABI(self, fn_name, args=None, kwargs=None, data=None):
+        return self.factory.encodeABI(fn_name, args=args, kwargs=kwargs, data=data)
+
+    def as_contract(self):
+        """
+        Создает полноценный объект контракта web3 для редко используемых возможностей, которых нет у дескриптора.
+
+        Returns:
+            Contract: Объект контракта web3 по адресу дескриптора.
+        """
+        return self.factory(address=self.address)
+
+    def __getattr__(self, name):
+        return getattr(self.as_contract(), name)
+
+    def __repr__(self):
+        return f'ContractHandle({self.address})'
+
+
+class ConnectionPool:
+    """
+    Общий для процесса пул подключений Web3 и фабрик контрактов.
+
+    Для каждого провайдера создается один экземпляр Web3, а для каждой пары (провайдер, ABI)
+    одна фабрика контракта. ABI идентифицируется по хешу содержимого (AbiSchema.key).
+    Пул потокобезопасен.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._web3 = {}
+        self._factories = {}
+        self._subscriptions = {}
+        self._receipt_waiters = {}
+
+    def get_web3(self, provider: str) -> Web3:
+        """
+        Возвращает общий экземпляр Web3 для провайдера, создавая его при первом обращении.
+
+        Args:
+            provider (str): URL провайдера. Для провайдера вида 'eth-tester://<имя>' создается встроенная
+                            в процесс цепочка (см. devChainClass), своя для каждого имени.
+
+        Returns:
+            Web3: Экземпляр Web3 (для HTTP-провайдеров с подключенным geth_poa_middleware).
+        """
+        web3 = self._web3.get(provider)
+        if web3 is not None:
+            return web3
+
+        with self._lock:
+            web3 = self._web3.get(provider)
+            if web3 is None:
+                if provider.startswith(IN_PROCESS_SCHEME):
+                    web3 = create_in_process_web3()
+                else:
+                    web3 = Web3(Web3.HTTPProvider(provider))
+                    web3.middleware_onion.inject(geth_poa_middleware, layer=0)
+                self._web3[provider] = web3
+        return web3
+
+    def get_factory(self, provider: str, abi_schema):
+        """
+        Возвращает общую фабрику контракта для провайдера и ABI.
+
+        Args:
+            provider (str): URL провайдера.
+            abi_schema (AbiSchema): Схема ABI из abi_registry.
+
+        Returns:
+            type: Фабрика контракта web3.
+        """
+        key = (provider, abi_schema.key)
+        factory = self._factories.get(key)
+        if factory is not None:
+            return factory
+
+        web3 = self.get_web3(provider)
+        with self._lock:
+            factory = self._factories.get(key)
+            if factory is None:
+                factory = web3.eth.contract(abi=abi_schema.abi)
+                self._factories[key] = factory
+        return factory
+
+    def get_contract(self, provider: str, abi_schema, contract_address: str) -> ContractHandle:
+        """
+        Возвращает легковесный объект контракта для адреса на основе общей фабрики.
+
+        Args:
+            provider (str): URL провайдера.
+            abi_schema (AbiSchema): Схема ABI из abi_registry.
+            contract_address (str): Адрес контракта.
+
+        Returns:
+            ContractHandle: Дескриптор контракта.
+        """
+        return ContractHandle(self.get_factory(provider, abi_schema), contract_address)
+
+    def get_subscription_client(self, ws_provider: str):
+        """
+        Возвращает общее постоянное WebSocket-подключение для провайдера, создавая его при первом обращении.
+
+        Args:
+            ws_provider (str): URL WebSocket-провайдера.
+
+        Returns:
+            SubscriptionClient: Клиент подписок.
+        """
+        from .subscriptionClass import SubscriptionClient
+
+        with self._lock:
+            client = self._subscriptions.get(ws_provider)
+            if client is None:
+                client = SubscriptionClient(ws_provider)
+                self._subscriptions[ws_provider] = client
+        return client
+
+    def get_receipt_waiter(self, web3_utils):
+        """
+        Возвращает общий объект ожидания квитанций для пары (HTTP-провайдер, WebSocket-провайдер) объекта Web3Utils.
+
+        Returns:
+            ReceiptWaiter: Объект ожидания квитанций по уведомлениям newHeads.
+        """
+        from .subscriptionClass import ReceiptWaiter
+
+        key = (web3_utils.provider, web3_utils.ws_provider)
+        waiter = self._receipt_waiters.get(key)
+        if waiter is not None:
+            return waiter
+
+        client = self.get_subscription_client(web3_utils.ws_provider)
+        with self._lock:
+            waiter = self._receipt_waiters.get(key)
+            if waiter is None:
+                waiter = ReceiptWaiter(web3_utils, client)
+                self._receipt_waiters[key] = waiter
+        return waiter
+
+
+connection_pool = ConnectionPool()
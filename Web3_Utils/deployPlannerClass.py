@@ -0,0 +1,290 @@
+import rlp
+from eth_utils import keccak, to_bytes, to_checksum_address
+from hexbytes import HexBytes
+from web3._utils.abi import get_constructor_abi
+from web3._utils.contracts import encode_abi
+
+from .abiRegistryClass import abi_registry
+from .contractPoolClass import connection_pool
+from .metricsClass import timed
+from .preflightClass import gas_cache
+
+# Фабрика детерминированного деплоя (Arachnid deterministic-deployment-proxy), развернута в большинстве сетей
+# по одному адресу. Принимает calldata вида salt (32 байта) + init code и деплоит контракт через CREATE2.
+CREATE2_FACTORY = '0x4e59b44847b379578588920cA78FbF26c0B4956C'
+
+
+def create_address(sender: str, nonce: int) -> str:
+    """
+    Вычисляет адрес контракта, создаваемого транзакцией деплоя (CREATE) с адреса sender и nonce.
+    """
+    return to_checksum_address(keccak(rlp.encode([to_bytes(hexstr=sender), nonce]))[12:])
+
+
+def create2_address(deployer: str, salt: bytes, init_code: bytes) -> str:
+    """
+    Вычисляет адрес контракта, создаваемого через CREATE2 контрактом deployer с солью salt.
+    """
+    return to_checksum_address(keccak(b'\xff' + to_bytes(hexstr=deployer) + salt + keccak(init_code))[12:])
+
+
+def normalize_salt(salt) -> bytes:
+    """
+    Приводит соль CREATE2 к 32 байтам: int и bytes дополняются нулями слева, hex-строка '0x...' разбирается,
+    произвольная строка (например, имя варианта контракта) заменяется ее keccak-хешем.
+    """
+    if isinstance(salt, int):
+        return salt.to_bytes(32, 'big')
+    if isinstance(salt, str):
+        salt = to_bytes(hexstr=salt) if salt.startswith('0x') else keccak(text=salt)
+    if len(salt) > 32:
+        raise ValueError("Соль CREATE2 не может быть длиннее 32 байт.")
+    return bytes(salt).rjust(32, b'\0')
+
+
+class DeployPlanner:
+    """
+    Пакетный деплой контрактов с заранее вычисленными адресами и конвейерной отправкой.
+
+    Адрес каждого контракта известен сразу при добавлении в план (add_contract): для обычного деплоя он
+    вычисляется по адресу деплоера и nonce, для деплоя через CREATE2 — по фабрике, соли и init code. Поэтому
+    адреса можно передавать в аргументы конструкторов следующих контрактов и в настроечные вызовы (add_call)
+    до отправки транзакций. deploy отправляет все транзакции подряд с последовательными nonce без ожидания
+    подтверждения и собирает квитанции пакетными запросами (Web3Utils.wait_transaction_receipts).
+
+    Контракты CREATE2, уже существующие по вычисленному адресу, не деплоятся повторно, что позволяет
+    переиспользовать варианты контрактов между запусками тестов. При деплое через CREATE2 msg.sender
+    в конструкторе — фабрика, а не кошелек деплоера (это важно для контрактов с владельцем).
+
+    Атрибуты:
+        web3_utils (Web3Utils): Объект Web3Utils для подключения к сети.
+        deployer (UserWallet): Кошелек, с которого отправляются транзакции.
+        factory (str): Адрес фабрики CREATE2.
+        addresses (dict): Вычисленные адреса контрактов по меткам.
+    """
+    # Лимит газа деплоя, если оценить газ не удалось (как в Web3Utils.deploy_contract)
+    deploy_gas = 4000000
+    # Лимит газа пустой транзакции, занимающей пропущенный nonce
+    filler_gas = 21000
+
+    def __init__(self, web3_utils, deployer, factory=CREATE2_FACTORY):
+        self.web3_utils = web3_utils
+        self.deployer = deployer
+        self.factory = factory
+        self.addresses = {}
+        self._abis = {}
+        self._transactions = []
+        self._nonce = None
+        # Nonce, транзакции с которыми не удалось отправить и которые еще не заняты пустыми транзакциями
+        self._gaps = []
+        self._factory_checked = False
+
+    def _next_nonce(self) -> int:
+        if self._nonce is None:
+            self._nonce = self.web3_utils.web3.eth.getTransactionCount(self.deployer.public_key, 'pending')
+        nonce = self._nonce
+        self._nonce += 1
+        return nonce
+
+    def add_contract(self, label: str, abi, bytecode: str, constructor_args: list = None, salt=None,
+                     gas: int = None) -> str:
+        """
+        Добавляет деплой контракта в план и возвращает его адрес.
+
+        Args:
+            label (str): Уникальная метка контракта в плане.
+            abi (list | str): ABI контракта.
+            bytecode (str): Байт-код контракта.
+            constructor_args (list, optional): Аргументы конструктора, в том числе адреса контрактов плана.
+            salt (int | bytes | str, optional): Соль для деплоя через CREATE2 (см. normalize_salt).
+                                                Если не указана, используется обычный деплой по nonce.
+            gas (int, optional): Лимит газа. По умолчанию оценивается при отправке.
+
+        Returns:
+            str: Адрес, по которому будет развернут контракт.
+
+        Raises:
+            ValueError: Если метка уже используется или фабрика CREATE2 не развернута в сети.
+        """
+        if label in self.addresses:
+            raise ValueError(f"Контракт с меткой {label} уже есть в плане.")
+        schema = abi_registry.intern(abi)
+        constructor_abi = get_constructor_abi(schema.abi)
+        if constructor_abi is not None:
+            init_code = encode_abi(self.web3_utils.web3, constructor_abi, constructor_args or [], data=bytecode)
+        else:
+            init_code = bytecode
+        init_code = HexBytes(init_code)
+
+        if salt is None:
+            nonce = self._next_nonce()
+            address = create_address(self.deployer.public_key, nonce)
+            self._transactions.append({'label': label, 'kind': 'create', 'to': None, 'data': init_code,
+                                       'nonce': nonce, 'gas': gas, 'address': address})
+        else:
+            self._check_factory()
+            salt = normalize_salt(salt)
+            address = create2_address(self.factory, salt, init_code)
+            # Контракт уже развернут предыдущим запуском: транзакция не нужна
+            if not self.web3_utils.web3.eth.getCode(address):
+                self._transactions.append({'label': label, 'kind': 'create2', 'to': self.factory,
+                                           'data': HexBytes(salt + init_code), 'nonce': self._next_nonce(),
+                                           'gas': gas, 'address': address})
+
+        self.addresses[label] = address
+        self._abis[label] = schema
+        return address
+
+    def _check_factory(self):
+        if self._factory_checked:
+            return
+        if not self.web3_utils.web3.eth.getCode(self.factory):
+            raise ValueError(f"Фабрика CREATE2 {self.factory} не развернута в сети.")
+        self._factory_checked = True
+
+    def add_call(self, label: str, method_name: str, *args, value=0, gas: int = None):
+        """
+        Добавляет в план вызов метода контракта плана (например, передачу ему адресов других контрактов).
+        Вызов отправляется после деплоя контракта в том же потоке nonce, поэтому выполнится после него.
+
+        Args:
+            label (str): Метка контракта в плане.
+            method_name (str): Название метода.
+            *args: Аргументы метода.
+            value (int): Количество нативной валюты в транзакции.
+            gas (int, optional): Лимит газа. По умолчанию оценивается при отправке.
+        """
+        if label not in self.addresses:
+            raise ValueError(f"Контракт с меткой {label} отсутствует в плане.")
+        data = self.contract(label).encodeABI(fn_name=method_name, args=list(args))
+        self._transactions.append({'label': f'{label}.{method_name}#{len(self._transactions)}', 'kind': 'call',
+                                   'to': self.addresses[label], 'data': HexBytes(data), 'value': value,
+                                   'nonce': self._next_nonce(), 'gas': gas, 'address': self.addresses[label]})
+
+    def contract(self, label: str):
+        """
+        Возвращает дескриптор контракта плана (ContractHandle) по метке. Доступен сразу после добавления
+        в план, в том числе до подтверждения деплоя.
+        """
+        return connection_pool.get_contract(self.web3_utils.provider, self._abis[label], self.addresses[label])
+
+    def _estimate_gas(self, transactions: list):
+        # Оценка транзакций, которые обращаются к еще не развернутым контрактам плана, неверна: вызов адреса
+        # без кода завершается успешно и дешево. Для них используется лимит газа по умолчанию.
+        undeployed = {tx['address'].lower() for tx in transactions if tx['kind'] != 'call'}
+        for tx in transactions:
+            if tx['gas'] is not None:
+                continue
+            if tx['kind'] == 'call' and tx['address'].lower() in undeployed:
+                tx['gas'] = self.web3_utils.default_gas
+            elif tx['kind'] != 'call' and any(address[2:] in tx['data'].hex()
+                                              for address in undeployed - {tx['address'].lower()}):
+                tx['gas'] = self.deploy_gas
+
+        pending = [tx for tx in transactions if tx['gas'] is None]
+        calls = []
+        for tx in pending:
+            request = {'from': self.deployer.public_key, 'data': tx['data'].hex(), 'value': hex(tx.get('value', 0))}
+            if tx['to'] is not None:
+                request['to'] = tx['to']
+            calls.append(('eth_estimateGas', [request]))
+        for tx, estimate in zip(pending, self.web3_utils.rpc_batch(calls, raise_errors=False)):
+            if estimate is not None:
+                tx['gas'] = int(self.web3_utils.to_int(estimate) * gas_cache.margin) + gas_cache.extra
+            else:
+                tx['gas'] = self.web3_utils.default_gas if tx['kind'] == 'call' else self.deploy_gas
+
+    def _fill_gaps(self, gas_price) -> list:
+        """
+        Занимает пропущенные nonce пустыми транзакциями (перевод 0 на адрес деплоера), чтобы уже отправленные
+        транзакции с большими nonce могли быть включены в блок. Nonce, которые занять не удалось, остаются
+        в self._gaps и повторно занимаются при следующем deploy.
+
+        Returns:
+            list: Хеши отправленных пустых транзакций.
+        """
+        if not self._gaps:
+            return []
+        web3 = self.web3_utils.web3
+        raw_transactions = []
+        for nonce in self._gaps:
+            transaction = {'to': self.deployer.public_key, 'value': 0, 'gas': self.filler_gas,
+                           'gasPrice': gas_price, 'nonce': nonce, 'chainId': self.web3_utils.chain_id}
+            signed = web3.eth.account.sign_transaction(transaction, self.deployer.private_key)
+            raw_transactions.append(('eth_sendRawTransaction', ['0x' + bytes(signed.rawTransaction).hex()]))
+
+        with timed('broadcast'):
+            tx_hashes = self.web3_utils.rpc_batch(raw_transactions, raise_errors=False)
+
+        gaps, filled = [], []
+        for nonce, tx_hash in zip(self._gaps, tx_hashes):
+            if tx_hash is None:
+                print(f"Не удалось занять пропущенный nonce {nonce}")
+                gaps.append(nonce)
+            else:
+                filled.append(HexBytes(tx_hash).hex())
+        self._gaps = gaps
+        return filled
+
+    def deploy(self, wait=True, timeout=300) -> dict:
+        """
+        Отправляет все транзакции плана с последовательными nonce и, при необходимости, ожидает их подтверждения.
+
+        Returns:
+            dict: {'addresses': адреса контрактов по меткам, 'tx_hashes': хеши транзакций по меткам,
+                   'failed': метки транзакций, которые не удалось отправить или которые откатились}.
+                   Если отправка транзакции не удалась, ее nonce занимается пустой транзакцией (см. _fill_gaps),
+                   и транзакции с большими nonce выполняются как обычно. Если занять nonce тоже не удалось,
+                   транзакции после него не будут включены в блок до заполнения пропуска, поэтому отмечаются
+                   неудачными без ожидания; пропуск повторно заполняется при следующем deploy.
+        """
+        transactions, self._transactions = self._transactions, []
+        result = {'addresses': dict(self.addresses), 'tx_hashes': {}, 'failed': []}
+        if not transactions:
+            return result
+
+        web3 = self.web3_utils.web3
+        self._estimate_gas(transactions)
+        gas_price = web3.eth.gasPrice
+        raw_transactions = []
+        for tx in transactions:
+            transaction = {'value': tx.get('value', 0), 'gas': tx['gas'], 'gasPrice': gas_price,
+                           'nonce': tx['nonce'], 'chainId': self.web3_utils.chain_id, 'data': tx['data']}
+            if tx['to'] is not None:
+                transaction['to'] = tx['to']
+            signed = web3.eth.account.sign_transaction(transaction, self.deployer.private_key)
+            raw_transactions.append(('eth_sendRawTransaction', ['0x' + bytes(signed.rawTransaction).hex()]))
+
+        with timed('broadcast'):
+            tx_hashes = self.web3_utils.rpc_batch(raw_transactions, raise_errors=False)
+
+        sent = []
+        for tx, tx_hash in zip(transactions, tx_hashes):
+            if tx_hash is None:
+                print(f"Ошибка при отправке транзакции {tx['label']}")
+                result['failed'].append(tx['label'])
+                self._gaps.append(tx['nonce'])
+                continue
+            tx_hash = HexBytes(tx_hash).hex()
+            result['tx_hashes'][tx['label']] = tx_hash
+            sent.append((tx, tx_hash))
+
+        # Локальный счетчик nonce сохраняется: транзакции после пропуска уже в пуле узла, поэтому пропуск
+        # заполняется, а не переиспользуется следующим планом
+        self._fill_gaps(gas_price)
+        if self._gaps:
+            # Транзакции после незаполненного пропуска не будут включены в блок
+            first_gap = min(self._gaps)
+            result['failed'].extend(tx['label'] for tx, _ in sent if tx['nonce'] > first_gap)
+            sent = [(tx, tx_hash) for tx, tx_hash in sent if tx['nonce'] < first_gap]
+        print(f"Отправлено транзакций деплоя: {len(sent)} из {len(transactions)}")
+
+        if wait and sent:
+            receipts = self.web3_utils.wait_transaction_receipts([tx_hash for _, tx_hash in sent], timeout)
+            for (tx, _), receipt in zip(sent, receipts):
+                if receipt is None or not self.web3_utils.to_int(receipt['status']):
+                    result['failed'].append(tx['label'])
+                elif tx['kind'] == 'create' and to_checksum_address(receipt['contractAddress']) != tx['address']:
+                    print(f"Адрес контракта {tx['label']} не совпал с вычисленным: {receipt['contractAddress']}")
+                    result['failed'].append(tx['label'])
+        return result
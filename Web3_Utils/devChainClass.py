@@ -0,0 +1,196 @@
+import ast
+import threading
+
+from web3 import EthereumTesterProvider, Web3
+
+# Схема провайдера встроенной цепочки: 'eth-tester://' или 'eth-tester://<имя>' для нескольких независимых цепочек
+IN_PROCESS_SCHEME = 'eth-tester://'
+
+
+class LockedEthereumTesterProvider(EthereumTesterProvider):
+    """
+    Провайдер встроенной в процесс цепочки eth-tester (py-evm) с мгновенным майнингом.
+
+    eth-tester не потокобезопасен, поэтому запросы выполняются под общей блокировкой, что позволяет
+    использовать провайдер из параллельных кейсов TestrunScenario и пула потоков LoadScenario.
+    Откат вызова (TransactionFailed) и ошибки проверки параметров возвращаются как ошибки JSON-RPC, как это
+    делают внешние узлы, чтобы пакетные запросы и расшифровка причин отката работали одинаково для всех провайдеров.
+    Требует необязательную зависимость eth-tester[py-evm].
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _revert_error(error) -> dict:
+        message, data = str(error), None
+        pending = list(error.args)
+        while pending:
+            arg = pending.pop(0)
+            if isinstance(arg, (bytes, bytearray)) and data is None:
+                data = '0x' + bytes(arg).hex()
+            elif isinstance(arg, Exception):
+                pending.extend(arg.args)
+        if message.startswith(("b'", 'b"')):
+            # Данные отката, отличного от Error(string) (Panic, пользовательские ошибки), приходят в сообщении
+            # строковым представлением байтов, например "b'NH{q...'"; eth-tester 0.4 передает только его
+            try:
+                raw = ast.literal_eval(message)
+            except (ValueError, SyntaxError):
+                raw = None
+            if isinstance(raw, bytes):
+                data = data or '0x' + raw.hex()
+                message = 'execution reverted'
+        if not message.startswith('execution reverted'):
+            message = f'execution reverted: {message}'
+        return {'code': 3, 'message': message, 'data': data}
+
+    def make_request(self, method, params):
+        from eth_tester.exceptions import TransactionFailed, ValidationError
+
+        with self._lock:
+            try:
+                response = super().make_request(method, params)
+            except TransactionFailed as e:
+                return {'error': self._revert_error(e)}
+            except ValidationError as e:
+                return {'error': {'code': -32602, 'message': str(e)}}
+        if method.startswith('eth_getBlockBy') and isinstance(response.get('result'), dict):
+            self._normalize_block(response['result'])
+        return response
+
+    @staticmethod
+    def _normalize_block(block: dict):
+        # eth-tester отдает фильтр Блума числом под именем logs_bloom, а узлы — 256 байтами в поле logsBloom
+        if 'logs_bloom' in block:
+            bloom = block.pop('logs_bloom')
+            block['logsBloom'] = bloom.to_bytes(256, 'big') if isinstance(bloom, int) else bloom
+        if 'receipts_root' in block:
+            block['receiptsRoot'] = block.pop('receipts_root')
+
+
+def create_in_process_web3() -> Web3:
+    """
+    Создает экземпляр Web3 с новой встроенной цепочкой eth-tester.
+
+    Raises:
+        ImportError: Если не установлен eth-tester[py-evm].
+    """
+    try:
+        provider = LockedEthereumTesterProvider()
+    except ImportError as e:
+        raise ImportError("Для встроенной цепочки установите eth-tester[py-evm]: "
+                          "pip install 'eth-tester[py-evm]'") from e
+    return Web3(provider)
+
+
+class DevChain:
+    """
+    Управление цепочкой разработки: снимки состояния и откат, майнинг и пополнение кошельков.
+
+    Работает со встроенной цепочкой (eth-tester://) и с локальными узлами разработки (anvil, hardhat node,
+    ganache), поддерживающими методы evm_snapshot, evm_revert и evm_mine. Для пополнения используется
+    первый разблокированный аккаунт узла (eth_accounts), у которого на таких узлах большой начальный баланс.
+
+    Снимок после отката к нему удаляется (так ведут себя anvil и hardhat), поэтому для повторного отката
+    к тому же состоянию после revert нужно снова вызвать snapshot.
+
+    Атрибуты:
+        web3_utils (Web3Utils): Объект Web3Utils, подключенный к цепочке разработки.
+    """
+
+    def __init__(self, web3_utils):
+        self.web3_utils = web3_utils
+
+    @property
+    def in_process(self) -> bool:
+        return isinstance(self.web3_utils.web3.provider, EthereumTesterProvider)
+
+    def _request(self, method, params):
+        return self.web3_utils.web3.manager.request_blocking(method, params)
+
+    def snapshot(self):
+        """
+        Сохраняет текущее состояние цепочки.
+
+        Returns:
+            Идентификатор снимка для revert.
+        """
+        return self._request('evm_snapshot', [])
+
+    def revert(self, snapshot_id) -> bool:
+        """
+        Возвращает цепочку к состоянию снимка. Все блоки и транзакции после снимка удаляются, а кэш
+        оценок газа и ожидание квитанций не затрагиваются. Последний известный блок оценки интервала блоков
+        заменяется текущим, так как номер последнего блока после отката уменьшается.
+
+        Returns:
+            bool: True, если откат выполнен.
+        """
+        result = self._request('evm_revert', [snapshot_id])
+        self.web3_utils.block_time_estimator.reset_head(self.web3_utils.web3.eth.blockNumber)
+        return result is None or bool(result)
+
+    def mine(self, blocks=1):
+        """
+        Добавляет пустые блоки.
+        """
+        if self.in_process:
+            self._request('evm_mine', [blocks])
+        else:
+            for _ in range(blocks):
+                self._request('evm_mine', [])
+
+    def accounts(self) -> list:
+        """
+        Возвращает адреса разблокированных аккаунтов узла с начальным балансом.
+        """
+        return self._request('eth_accounts', [])
+
+    def private_keys(self) -> list:
+        """
+        Возвращает приватные ключи начальных аккаунтов встроенной цепочки в формате '0x...'.
+        Для внешних узлов ключи недоступны через JSON-RPC, возвращается пустой список.
+        """
+        if not self.in_process:
+            return []
+        backend = self.web3_utils.web3.provider.ethereum_tester.backend
+        return [str(key) for key in getattr(backend, 'account_keys', [])]
+
+    def import_keys(self, private_keys):
+        """
+        Добавляет ключи кошельков во встроенную цепочку. eth-tester выполняет eth_call только от известных
+        ему аккаунтов, поэтому без этого предварительная проверка транзакций (send_transaction(preflight=True))
+        для внешних кошельков завершится ошибкой. Для внешних узлов ничего не делает.
+        """
+        if not self.in_process:
+            return
+        known = set(self.accounts())
+        for private_key in private_keys:
+            if self.web3_utils.web3.eth.account.from_key(private_key).address not in known:
+                self._request('personal_importRawKey', [private_key, ''])
+
+    def fund(self, addresses, value: int) -> list:
+        """
+        Пополняет адреса нативной валютой до value с первого разблокированного аккаунта узла.
+        Адреса с достаточным балансом пропускаются. Майнинг мгновенный, поэтому ожидание не требуется.
+
+        Args:
+            addresses (list): Адреса для пополнения.
+            value (int): Требуемый баланс в wei.
+
+        Returns:
+            list: Хеши отправленных транзакций.
+        """
+        web3 = self.web3_utils.web3
+        faucet = self.accounts()[0]
+        tx_hashes = []
+        for address in addresses:
+            balance = web3.eth.getBalance(address)
+            if balance >= value:
+                continue
+            tx_hash = web3.eth.sendTransaction({'from': faucet, 'to': address, 'value': value - balance,
+                                                'gas': 21000})
+            tx_hashes.append(tx_hash.hex())
+        return tx_hashes
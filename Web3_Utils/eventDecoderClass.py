@@ -0,0 +1,244 @@
+import re
+
+from eth_utils import to_checksum_address
+from web3._utils.events import event_abi_to_log_topic
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+STATIC_TYPE_PATTERN = re.compile(r'^(address|bool|u?int(\d*)|bytes(\d+))$')
+
+# Поля лога, которые переносятся в пакет вместе с аргументами события
+META_COLUMNS = ('blockNumber', 'transactionIndex', 'logIndex')
+
+
+def is_static_event(event_abi: dict) -> bool:
+    """
+    Проверяет, что все аргументы события имеют элементарные статические типы (address, bool, uintN, intN, bytesN),
+    то есть занимают ровно одно 32-байтное слово в topics или data, и событие не анонимное.
+    """
+    if event_abi.get('anonymous'):
+        return False
+    return all(STATIC_TYPE_PATTERN.match(param['type']) for param in event_abi['inputs'])
+
+
+def supports_batch_decoding(event_abi: dict) -> bool:
+    """
+    Проверяет, можно ли расшифровать событие векторно (EventBatchDecoder): установлен NumPy и событие статическое.
+    """
+    return np is not None and is_static_event(event_abi)
+
+
+def _type_bits(abi_type: str) -> int:
+    match = STATIC_TYPE_PATTERN.match(abi_type)
+    return int(match.group(2) or 256)
+
+
+def _join_bytes(values: list) -> bytes:
+    # Ответ HTTP-провайдера содержит hex-строки: они склеиваются и разбираются одним вызовом
+    if values and isinstance(values[0], str):
+        return bytes.fromhex(''.join(value[2:] for value in values))
+    return b''.join(bytes(value) for value in values)
+
+
+class EventBatch:
+    """
+    Пакет расшифрованных событий одного типа в виде колонок (struct-of-arrays).
+
+    Колонки — массивы NumPy одинаковой длины. Аргументы события хранятся в зависимости от типа:
+    address — 'S20' (20 байт; у отдельных элементов NumPy отбрасывает завершающие нулевые байты, используйте
+    addresses), bool — bool, uintN/intN до 64 бит — uint64/int64, более широкие целые — uint64 формы (N, 4)
+    со словами от старшего к младшему (см. to_int, to_float), bytesN — 'SN'. Дополнительно есть колонки
+    blockNumber, transactionIndex, logIndex (uint64), transactionHash ('S32') и address (адрес контракта, 'S20').
+
+    Атрибуты:
+        event_name (str): Название события.
+        columns (dict): Колонки по названиям.
+        types (dict): Типы ABI аргументов события по названиям.
+    """
+
+    def __init__(self, event_name: str, columns: dict, types: dict):
+        self.event_name = event_name
+        self.columns = columns
+        self.types = types
+
+    def __len__(self):
+        return len(self.columns['logIndex'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def addresses(self, name: str) -> list:
+        """
+        Возвращает колонку адресов в виде списка адресов с контрольной суммой.
+        """
+        return [to_checksum_address(value.ljust(20, b'\0')) for value in self.columns[name]]
+
+    def to_int(self, name: str) -> list:
+        """
+        Возвращает целочисленную колонку в виде списка int без потери точности.
+        """
+        column = self.columns[name]
+        if column.ndim == 1:
+            return column.tolist()
+        values = [int.from_bytes(row.astype('>u8').tobytes(), 'big') for row in column]
+        if self.types.get(name, 'uint256').startswith('int'):
+            # Знаковые значения расширены до 256 бит в дополнительном коде
+            values = [value - (1 << 256) if value >> 255 else value for value in values]
+        return values
+
+    def to_float(self, name: str):
+        """
+        Возвращает целочисленную колонку как float64 (с потерей точности), например для агрегатов по суммам.
+        Знаковые целые шире 64 бит интерпретируются в дополнительном коде.
+        """
+        column = self.columns[name]
+        if column.ndim == 1:
+            return column.astype(np.float64)
+        values = column.astype(np.float64) @ np.array([2.0 ** 192, 2.0 ** 128, 2.0 ** 64, 1.0])
+        if self.types.get(name, 'uint256').startswith('int'):
+            values = np.where(column[:, 0] >> np.uint64(63), values - 2.0 ** 256, values)
+        return values
+
+    def to_records(self) -> list:
+        """
+        Возвращает события в виде списка словарей {'event', 'args', 'blockNumber', 'logIndex', ...}
+        с питоновскими значениями. Нужен для совместимости с кодом, ожидающим результат processLog.
+        """
+        args = {}
+        for name, abi_type in self.types.items():
+            if abi_type == 'address':
+                args[name] = self.addresses(name)
+            elif abi_type == 'bool':
+                args[name] = self.columns[name].tolist()
+            elif abi_type.startswith('bytes'):
+                size = int(abi_type[5:])
+                args[name] = [value.ljust(size, b'\0') for value in self.columns[name]]
+            else:
+                args[name] = self.to_int(name)
+
+        contracts = self.addresses('address')
+        hashes = ['0x' + value.ljust(32, b'\0').hex() for value in self.columns['transactionHash']]
+        meta = {name: self.columns[name].tolist() for name in META_COLUMNS}
+        return [{
+            'event': self.event_name,
+            'args': {name: values[index] for name, values in args.items()},
+            'address': contracts[index],
+            'transactionHash': hashes[index],
+            **{name: meta[name][index] for name in META_COLUMNS},
+        } for index in range(len(self))]
+
+
+class EventBatchDecoder:
+    """
+    Пакетная расшифровка логов одного события со статическими типами аргументов с помощью NumPy.
+
+    Вместо разбора каждого лога через processLog topics и data всех логов склеиваются в общие буферы,
+    а аргументы вырезаются из 32-байтных слов сразу для всей колонки. Логи другого события, с другим
+    количеством topics или длиной data (например, Transfer ERC721 с индексированным tokenId при расшифровке
+    как Transfer ERC20), пропускаются.
+
+    Атрибуты:
+        event_abi (dict): Описание события из ABI.
+        topic (bytes): topic0 события.
+
+    Аргументы:
+        event_abi (dict): Описание события из ABI.
+
+    Raises:
+        ValueError: Если NumPy не установлен или у события есть аргументы динамических типов.
+    """
+
+    def __init__(self, event_abi: dict):
+        if np is None:
+            raise ValueError("Для пакетной расшифровки событий требуется NumPy.")
+        if not is_static_event(event_abi):
+            raise ValueError(f"Событие {event_abi['name']} содержит аргументы динамических типов.")
+        self.event_abi = event_abi
+        self.topic = bytes(event_abi_to_log_topic(event_abi))
+        self._topic_hex = '0x' + self.topic.hex()
+        self._indexed = [param for param in event_abi['inputs'] if param.get('indexed')]
+        self._data = [param for param in event_abi['inputs'] if not param.get('indexed')]
+
+    def _matches(self, log) -> bool:
+        topics = log['topics']
+        if len(topics) != len(self._indexed) + 1:
+            return False
+        topic0 = topics[0]
+        if isinstance(topic0, str):
+            if topic0.lower() != self._topic_hex:
+                return False
+        elif bytes(topic0) != self.topic:
+            return False
+        data = log['data']
+        size = (len(data) - 2) // 2 if isinstance(data, str) else len(data)
+        return size == 32 * len(self._data)
+
+    @staticmethod
+    def _column(words, abi_type: str):
+        count = len(words)
+        if abi_type == 'address':
+            return words[:, 12:].copy().view('S20').reshape(count)
+        if abi_type == 'bool':
+            return words[:, 31] != 0
+        if abi_type.startswith('bytes'):
+            size = int(abi_type[5:])
+            return words[:, :size].copy().view(f'S{size}').reshape(count)
+        if _type_bits(abi_type) <= 64:
+            dtype = '>i8' if abi_type.startswith('int') else '>u8'
+            return words[:, 24:].copy().view(dtype).reshape(count).astype(dtype[1:])
+        return words.copy().view('>u8').astype(np.uint64)
+
+    def decode(self, logs: list) -> EventBatch:
+        """
+        Расшифровывает логи события.
+
+        Args:
+            logs (list): Логи в формате eth_getLogs или receipt['logs'] (hex-строки или байты).
+
+        Returns:
+            EventBatch: Колонки аргументов события и полей логов.
+        """
+        logs = [log for log in logs if self._matches(log)]
+        count = len(logs)
+        columns = {}
+        types = {}
+
+        for position, param in enumerate(self._indexed, start=1):
+            buffer = _join_bytes([log['topics'][position] for log in logs])
+            words = np.frombuffer(buffer, dtype=np.uint8).reshape(count, 32)
+            columns[param['name']] = self._column(words, param['type'])
+            types[param['name']] = param['type']
+
+        if self._data:
+            buffer = _join_bytes([log['data'] for log in logs])
+            words = np.frombuffer(buffer, dtype=np.uint8).reshape(count, len(self._data), 32)
+            for position, param in enumerate(self._data):
+                columns[param['name']] = self._column(words[:, position], param['type'])
+                types[param['name']] = param['type']
+
+        for name in META_COLUMNS:
+            columns[name] = np.fromiter((int(log[name], 16) if isinstance(log[name], str) else log[name]
+                                         for log in logs), dtype=np.uint64, count=count)
+        columns['transactionHash'] = np.frombuffer(_join_bytes([log['transactionHash'] for log in logs]),
+                                                   dtype='S32')
+        columns['address'] = np.frombuffer(_join_bytes([log['address'] for log in logs]), dtype='S20')
+        return EventBatch(self.event_abi['name'], columns, types)
+
+
+# Декодеры по topic0 и схеме аргументов события, общие для процесса
+_decoders = {}
+
+
+def get_event_decoder(event_abi: dict) -> EventBatchDecoder:
+    """
+    Возвращает общий декодер для описания события, создавая его при первом обращении.
+    """
+    key = (event_abi['name'], tuple((param['name'], param['type'], bool(param.get('indexed')))
+                                    for param in event_abi['inputs']))
+    decoder = _decoders.get(key)
+    if decoder is None:
+        decoder = _decoders.setdefault(key, EventBatchDecoder(event_abi))
+    return decoder
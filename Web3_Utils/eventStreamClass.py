@@ -0,0 +1,191 @@
+import time
+from collections import deque
+
+from hexbytes import HexBytes
+from web3._utils.events import event_abi_to_log_topic
+
+from .eventDecoderClass import EventBatch
+
+
+class ReorgTooDeep(ValueError):
+    """
+    Реорганизация затронула блоки глубже, чем хранится в кольцевом буфере потока, и общий предок не найден.
+    """
+
+
+class ConfirmedEventStream:
+    """
+    Поток событий контракта в реальном времени с учетом реорганизаций цепочки.
+
+    Поток хранит в кольцевом буфере хеши последних history блоков и проверяет, что parentHash каждого
+    нового блока совпадает с хешем предыдущего. При несовпадении поток идет назад по буферу до общего предка
+    с текущей канонической цепочкой, отбрасывает блоки после него и заново читает новую ветку, без повторного
+    сканирования истории.
+
+    Режимы выдачи:
+        - по подтверждениям (provisional=False): событие выдается, только когда над его блоком есть не менее
+          confirmations блоков. События из отброшенных блоков до выдачи не доходят.
+        - предварительный (provisional=True): событие выдается сразу после появления блока, а если блок затем
+          отброшен реорганизацией, выдается запись об отзыве того же события.
+
+    Записи потока — словари {'type': 'event' | 'retraction', 'event': расшифрованное событие,
+    'blockNumber', 'blockHash', 'confirmed': выдано ли событие после confirmations подтверждений}.
+
+    Атрибуты:
+        web3_utils (Web3Utils): Объект Web3Utils с контрактом.
+        event_names (list): Названия отслеживаемых событий.
+        confirmations (int): Количество подтверждений.
+        provisional (bool): Предварительная выдача событий с отзывами.
+        history (int): Количество блоков в кольцевом буфере; реорганизации глубже не обрабатываются.
+        poll_interval (float | None): Фиксированный интервал опроса. Если None, используется оценка интервала блоков.
+        next_block (int | None): Следующий блок для чтения.
+    """
+    # Максимальное количество блоков, читаемых за один опрос (например, при отставании после старта)
+    max_blocks_per_poll = 100
+
+    def __init__(self, web3_utils, event_names=None, confirmations=12, provisional=False, start_block=None,
+                 history=None, poll_interval=None):
+        self.web3_utils = web3_utils
+        self.event_names = event_names or web3_utils.list_events()
+        self.confirmations = confirmations
+        self.provisional = provisional
+        self.history = max(history or 2 * confirmations, confirmations + 1, 64)
+        self.poll_interval = poll_interval
+        self.next_block = start_block
+        self._blocks = deque(maxlen=self.history)
+        self._topics = [['0x' + bytes(event_abi_to_log_topic(getattr(web3_utils.contract_obj.events, name)().abi))
+                         .hex() for name in self.event_names]]
+
+    @staticmethod
+    def _hash(value) -> str:
+        return HexBytes(value).hex().lower()
+
+    def _headers(self, numbers: list) -> list:
+        calls = [('eth_getBlockByNumber', [hex(number), False]) for number in numbers]
+        return self.web3_utils.rpc_batch(calls)
+
+    def _find_ancestor(self) -> int:
+        """
+        Отбрасывает из буфера блоки, которых больше нет в канонической цепочке, и возвращает номер общего предка.
+        """
+        canonical = self._headers([block['number'] for block in self._blocks])
+        for block, header in reversed(list(zip(self._blocks, canonical))):
+            if header is not None and self._hash(header['hash']) == block['hash']:
+                return block['number']
+        raise ReorgTooDeep(f"Реорганизация глубже {len(self._blocks)} блоков, общий предок не найден.")
+
+    def _decode(self, logs: list) -> list:
+        events = []
+        for event_name in self.event_names:
+            decoded = self.web3_utils.decode_event_logs(logs, event_name)
+            events.extend(decoded.to_records() if isinstance(decoded, EventBatch) else decoded)
+        events.sort(key=lambda event: (event['blockNumber'], event['logIndex']))
+        return events
+
+    def _record(self, record_type: str, block: dict, event, confirmed: bool) -> dict:
+        return {'type': record_type, 'event': event, 'blockNumber': block['number'], 'blockHash': block['hash'],
+                'confirmed': confirmed}
+
+    def _emit_confirmed(self, block: dict, records: list):
+        if not block['emitted']:
+            records.extend(self._record('event', block, event, True) for event in block['events'])
+            block['emitted'] = True
+
+    def _rewind(self, records: list):
+        # Отбрасывает блоки после общего предка; для уже выданных событий выдаются отзывы
+        ancestor = self._find_ancestor()
+        while self._blocks and self._blocks[-1]['number'] > ancestor:
+            block = self._blocks.pop()
+            if block['emitted']:
+                records.extend(self._record('retraction', block, event, not self.provisional)
+                               for event in reversed(block['events']))
+        self.next_block = ancestor + 1
+
+    def poll(self) -> list:
+        """
+        Читает новые блоки и возвращает записи потока, появившиеся с предыдущего вызова.
+
+        Raises:
+            ReorgTooDeep: Если реорганизация глубже буфера блоков.
+        """
+        records = []
+        head = self.web3_utils.to_int(self.web3_utils.rpc_batch([('eth_blockNumber', [])])[0])
+        self.web3_utils.block_time_estimator.observe(head)
+        if self.next_block is None:
+            self.next_block = head
+
+        # Последний прочитанный блок мог быть заменен, даже если новых блоков еще нет
+        if self._blocks:
+            tip = self._headers([self._blocks[-1]['number']])[0]
+            if tip is None or self._hash(tip['hash']) != self._blocks[-1]['hash']:
+                self._rewind(records)
+
+        while self.next_block <= head:
+            numbers = list(range(self.next_block, min(head, self.next_block + self.max_blocks_per_poll - 1) + 1))
+            accepted = []
+            reorg = False
+            for header in self._headers(numbers):
+                if header is None:
+                    # Узел еще не отдает блок (например, запрос попал на отстающий узел за балансировщиком)
+                    break
+                previous = accepted[-1] if accepted else (self._blocks[-1] if self._blocks else None)
+                if previous is not None and self._hash(header['parentHash']) != previous['hash']:
+                    reorg = True
+                    break
+                accepted.append({'number': self.web3_utils.to_int(header['number']),
+                                 'hash': self._hash(header['hash']), 'events': [], 'emitted': False})
+
+            if accepted:
+                logs = self.web3_utils.get_logs(accepted[0]['number'], accepted[-1]['number'], self._topics)
+                hashes = {block['hash'] for block in accepted}
+                if any(self._hash(log['blockHash']) not in hashes for log in logs):
+                    # Логи относятся к другой ветке: цепочка изменилась между запросами, блоки читаются заново
+                    break
+                by_number = {block['number']: block for block in accepted}
+                for event in self._decode(logs):
+                    by_number[event['blockNumber']]['events'].append(event)
+                for block in accepted:
+                    if len(self._blocks) == self.history and not self.provisional:
+                        # Вытесняемый из буфера блок старше confirmations блоков
+                        self._emit_confirmed(self._blocks[0], records)
+                    self._blocks.append(block)
+                    if self.provisional:
+                        records.extend(self._record('event', block, event, False) for event in block['events'])
+                        block['emitted'] = True
+                self.next_block = accepted[-1]['number'] + 1
+
+            if reorg:
+                self._rewind(records)
+            elif len(accepted) < len(numbers):
+                break
+
+        if not self.provisional:
+            for block in self._blocks:
+                if block['number'] <= head - self.confirmations:
+                    self._emit_confirmed(block, records)
+        return records
+
+    def next_delay(self) -> float:
+        if self.poll_interval is not None:
+            return self.poll_interval
+        return self.web3_utils.block_time_estimator.poll_delay()
+
+    def events(self, max_records=None):
+        """
+        Генератор записей потока. Если новых записей нет, ожидает до следующего опроса (см. next_delay).
+
+        Args:
+            max_records (int, optional): Количество записей, после которого генератор завершается.
+        """
+        if self.poll_interval is None:
+            self.web3_utils.block_time_estimator.ensure(self.web3_utils)
+        count = 0
+        while max_records is None or count < max_records:
+            records = self.poll()
+            for record in records:
+                yield record
+                count += 1
+                if max_records is not None and count >= max_records:
+                    return
+            if not records:
+                time.sleep(self.next_delay())
@@ -1,9 +1,12 @@
 import os
+import sys
 import logging
 import json
 from colorama import Fore, Style, init
 from functools import wraps
 
+from .abiRegistryClass import abi_registry
+
 init(autoreset=True)
 
 
@@ -16,68 +19,179 @@ class ColoredFormatter(logging.Formatter):
         Форматирует сообщение лога, добавляя цвет в зависимости от уровня лога и содержания сообщения.
     """
 
-    def format(self, record):
+    level_color = {
+        logging.DEBUG: Fore.BLUE,
+        logging.INFO: Fore.WHITE,
+        logging.WARNING: Fore.YELLOW,
+        logging.ERROR: Fore.RED,
+        logging.CRITICAL: Fore.MAGENTA,
+    }
+
+    def colorize_message(self, record):
         """
-        Форматирует запись лога, добавляя цвет в зависимости от уровня лога и содержания сообщения.
+        Возвращает раскрашенный текст сообщения записи, не изменяя саму запись.
 
         Параметры:
-        record (logging.LogRecord): Запись лога, которую нужно форматировать.
+        record (logging.LogRecord): Запись лога.
 
         Возвращаемое значение:
-        str: Отформатированное сообщение лога.
+        str: Сообщение с цветовой разметкой.
         """
-        level_color = {
-            logging.DEBUG: Fore.BLUE,
-            logging.INFO: Fore.WHITE,
-            logging.WARNING: Fore.YELLOW,
-            logging.ERROR: Fore.RED,
-            logging.CRITICAL: Fore.MAGENTA,
-        }
-        levelname = record.levelname
-        if record.levelno in level_color:
-            levelname_color = level_color[record.levelno] + levelname + Style.RESET_ALL
-        else:
-            levelname_color = levelname
+        message = record.getMessage()
 
         if record.levelno == logging.ERROR:
-            record.msg = Fore.RED + record.msg + Style.RESET_ALL
+            message = Fore.RED + message + Style.RESET_ALL
         elif record.levelno == logging.WARNING:
-            record.msg = Fore.YELLOW + record.msg + Style.RESET_ALL
+            message = Fore.YELLOW + message + Style.RESET_ALL
         elif record.levelno == logging.INFO:
-            record.msg = Fore.WHITE + record.msg + Style.RESET_ALL
-
-        if 'arguments:' in record.msg:
-            parts = record.msg.split('arguments:')
-            arguments = parts[1]
-            record.msg = parts[0] + 'arguments:' + Fore.YELLOW + arguments + Style.RESET_ALL
-
-        if 'returned a single value:' in record.msg:
-            parts = record.msg.split('returned a single value:')
-            returned_value = parts[1]
-            record.msg = parts[0] + 'returned a single value:' + Fore.YELLOW + returned_value + Style.RESET_ALL
-
-        lines = record.msg.split('\n')
+            message = Fore.WHITE + message + Style.RESET_ALL
+
+        if 'arguments:' in message:
+            parts = message.split('arguments:', 1)
+            message = parts[0] + 'arguments:' + Fore.YELLOW + parts[1] + Style.RESET_ALL
+
+        if 'returned a single value:' in message:
+            parts = message.split('returned a single value:', 1)
+            message = parts[0] + 'returned a single value:' + Fore.YELLOW + parts[1] + Style.RESET_ALL
+
+        if ': ' not in message:
+            return message
+        # Однострочное сообщение раскрашивается без разбиения на строки
+        if '\n' not in message:
+            if 'Struct' in message:
+                return message
+            key, value = message.split(': ', 1)
+            return f"{key}: {Fore.YELLOW}{value}{Style.RESET_ALL}"
+
+        lines = message.split('\n')
         for i in range(len(lines)):
             if 'Struct' in lines[i]:
                 continue
             if ': ' in lines[i]:
-                key_value = lines[i].split(': ', 1)
-                key = key_value[0]
-                value = ': '.join(key_value[1:])
+                key, value = lines[i].split(': ', 1)
                 lines[i] = f"{key}: {Fore.YELLOW}{value}{Style.RESET_ALL}"
-        record.msg = '\n'.join(lines)
+        return '\n'.join(lines)
+
+    def format(self, record):
+        """
+        Форматирует запись лога, добавляя цвет в зависимости от уровня лога и содержания сообщения.
+        Цветные msg и levelname подставляются в поверхностную копию записи, поэтому сама запись
+        не изменяется и другие обработчики (в том числе в других потоках) получают исходное сообщение.
+
+        Параметры:
+        record (logging.LogRecord): Запись лога, которую нужно форматировать.
+
+        Возвращаемое значение:
+        str: Отформатированное сообщение лога.
+        """
+        # Копия без вызова LogRecord.__init__ и copy.copy: атрибуты переносятся одним обновлением словаря
+        colored = logging.LogRecord.__new__(type(record))
+        colored.__dict__.update(record.__dict__)
+        colored.msg = colored.message = self.colorize_message(record)
+        colored.args = None
+        if record.levelno in self.level_color:
+            colored.levelname = self.level_color[record.levelno] + record.levelname + Style.RESET_ALL
+        if record.exc_info or record.exc_text or record.stack_info:
+            return super(ColoredFormatter, self).format(colored)
+        # Сообщение уже сформировано, поэтому повторный getMessage из Formatter.format не нужен
+        if self.usesTime():
+            colored.asctime = self.formatTime(colored, self.datefmt)
+        return self.formatMessage(colored)
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Форматтер без цветовой разметки для вывода в файлы, пайпы и системы сбора логов.
+
+    Сообщение формируется только при выводе записи (отложенное форматирование через аргументы логгера),
+    запись не изменяется. В режиме 'json' каждая запись выводится одной строкой JSON, дополнительные поля,
+    переданные через extra, попадают в объект как есть. В режиме 'plain' используется обычный текстовый формат.
+
+    Атрибуты:
+        output (str): Формат вывода: 'json' или 'plain'.
+    """
+
+    standard_attributes = frozenset(logging.makeLogRecord({}).__dict__) | {'message', 'asctime'}
 
-        record.levelname = levelname_color
-        return super(ColoredFormatter, self).format(record)
+    def __init__(self, output='json', fmt='%(asctime)s - %(levelname)s - %(message)s'):
+        super().__init__(fmt)
+        if output not in ('json', 'plain'):
+            raise ValueError(f"Неизвестный формат вывода логов: {output}")
+        self.output = output
+
+    def format(self, record):
+        """
+        Форматирует запись лога в JSON-строку или в обычный текст.
+
+        Параметры:
+        record (logging.LogRecord): Запись лога.
+
+        Возвращаемое значение:
+        str: Отформатированная запись.
+        """
+        if self.output == 'plain':
+            return super().format(record)
+
+        data = {
+            'ts': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in self.standard_attributes:
+                data[key] = value
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
 
 
 logger = logging.getLogger()
 handler = logging.StreamHandler()
-formatter = ColoredFormatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
 logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 original_print = print
+color_output = False
+
+
+def setup_logging(mode=None, stream=None):
+    """
+    Настраивает формат вывода логов модуля.
+
+    Параметры:
+    mode (str, optional): Режим вывода: 'auto', 'color', 'plain' или 'json'. Если не указан, берется из переменной
+                          окружения WEB3_UTILS_LOG_FORMAT, по умолчанию 'auto'.
+    stream (optional): Поток для вывода логов. По умолчанию sys.stderr.
+
+    Возвращаемое значение:
+    logging.Formatter: Установленный форматтер.
+
+    Логика:
+    1. В режиме 'auto' цветной вывод включается только если поток логов подключен к терминалу,
+       иначе используется обычный текстовый формат.
+    2. Цвет в colored_print также применяется только если stdout подключен к терминалу.
+    """
+    global color_output
+
+    if stream is not None:
+        handler.setStream(stream)
+    mode = mode or os.environ.get('WEB3_UTILS_LOG_FORMAT', 'auto')
+
+    if mode == 'auto':
+        isatty = getattr(handler.stream, 'isatty', None)
+        mode = 'color' if isatty is not None and isatty() else 'plain'
+
+    if mode == 'color':
+        formatter = ColoredFormatter('%(asctime)s - %(levelname)s - %(message)s')
+    else:
+        formatter = StructuredFormatter(mode)
+    handler.setFormatter(formatter)
+
+    color_output = sys.stdout is not None and sys.stdout.isatty()
+    return formatter
+
+
+setup_logging()
 
 
 def colored_print(*args, **kwargs):
@@ -89,10 +203,14 @@ def colored_print(*args, **kwargs):
     **kwargs: Дополнительные аргументы, передаваемые в функцию print.
 
     Логика:
-    1. Формирует список colored_args, в котором каждый аргумент оборачивается в желтый цвет с использованием Fore.YELLOW и сбрасывается стиль с помощью Style.RESET_ALL.
-    2. Вызывает оригинальную функцию print с измененными аргументами colored_args и дополнительными параметрами kwargs.
-    3. Переопределяет стандартную функцию print функцией colored_print для вывода текста в цвете.
+    1. Если stdout не подключен к терминалу, аргументы выводятся без изменений.
+    2. Иначе формирует список colored_args, в котором каждый аргумент оборачивается в желтый цвет с использованием Fore.YELLOW и сбрасывается стиль с помощью Style.RESET_ALL.
+    3. Вызывает оригинальную функцию print с измененными аргументами colored_args и дополнительными параметрами kwargs.
+    4. Переопределяет стандартную функцию print функцией colored_print для вывода текста в цвете.
     """
+    if not color_output:
+        original_print(*args, **kwargs)
+        return
     colored_args = [Fore.YELLOW + str(arg) + Style.RESET_ALL for arg in args]
     original_print(*colored_args, **kwargs)
 
@@ -125,35 +243,14 @@ def get_abi_outputs(method_name, abi_path):
           то возвращается список компонентов внутри кортежа с их именами и типами.
 
     Логика:
-    1. Открывает файл ABI по указанному пути.
-    2. Загружает содержимое ABI в формате JSON.
-    3. Перебирает функции в ABI:
-       - Если имя функции совпадает с заданным методом и у функции есть выходные параметры:
-         - Инициализирует пустой список для выходных параметров.
-         - Перебирает выходные параметры функции:
-           - Если тип параметра начинается с 'tuple':
-             - Инициализирует пустой список для компонентов кортежа.
-             - Перебирает компоненты кортежа и добавляет их в список компонентов.
-             - Добавляет кортеж (имя параметра или 'param{index}', список компонентов) в список выходных параметров.
-           - Иначе добавляет кортеж (имя параметра или 'param{index}', тип параметра) в список выходных параметров.
-         - Возвращает список выходных параметров.
-    4. Если метод не найден или не имеет выходных параметров, возвращает пустой список.
+    1. Получает схему ABI из общего реестра abi_registry: файл читается и разбирается только при первом
+       обращении, выходные параметры всех методов вычисляются заранее.
+    2. Возвращает выходные параметры первого метода с указанным именем, у которого они есть:
+       - Если тип параметра начинается с 'tuple', вместо типа возвращается список компонентов кортежа.
+       - Имя параметра берется из ABI или заменяется на 'param{index}'.
+    3. Если метод не найден или не имеет выходных параметров, возвращает пустой список.
     """
-    with open(abi_path, 'r') as abi_file:
-        abi = json.load(abi_file)
-        for func in abi:
-            if func.get('name') == method_name and func.get('outputs'):
-                outputs = []
-                for index, output in enumerate(func['outputs']):
-                    if output['type'].startswith('tuple'):
-                        components = []
-                        for component in output['components']:
-                            components.append({'name': component['name'], 'type': component['type']})
-                        outputs.append((output.get('name', f"param{index}"), components))
-                    else:
-                        outputs.append((output.get('name', f"param{index}"), output['type']))
-                return outputs
-    return []
+    return abi_registry.from_file(abi_path).get_outputs(method_name)
 
 
 def safe_read_method(web3_obj, method_name, *args):
@@ -182,10 +279,10 @@ def safe_read_method(web3_obj, method_name, *args):
     """
     try:
         result = web3_obj.read_method(method_name, *args)
-        logging.info(f"Method {method_name} executed successfully.")
+        logging.info("Method %s executed successfully.", method_name)
         return result
     except Exception as e:
-        logging.error(f"Error when calling method {method_name}: {str(e)}")
+        logging.error("Error when calling method %s: %s", method_name, e)
         return None
 
 
@@ -222,12 +319,12 @@ def safe_write_method(web3_obj, wallet_address, private_key, method_name, *args)
         param_info = ", ".join(f"{arg}" for arg in args) if args else "No arguments"
         tx_hash = web3_obj.send_transaction(method_name, *args, wallet_address=wallet_address, private_key=private_key)
         if tx_hash:
-            logging.info(f"Transaction {method_name} ({param_info}) initiated with tx_hash: {tx_hash}")
+            logging.info("Transaction %s (%s) initiated with tx_hash: %s", method_name, param_info, tx_hash)
         else:
-            logging.warning(f"Failed to send transaction for method {method_name}")
+            logging.warning("Failed to send transaction for method %s", method_name)
         return tx_hash
     except Exception as e:
-        logging.error(f"Error when sending transaction for method {method_name}: {str(e)}")
+        logging.error("Error when sending transaction for method %s: %s", method_name, e)
         return None
 
 
@@ -250,12 +347,12 @@ def wait_for_transaction_receipt(web3_obj, tx_hash):
     4. Если транзакция завершилась неудачно (receipt.status == 0):
        - Логгирует ошибку завершения транзакции.
     """
-    logger.info(f"Waiting for transaction {tx_hash} to be mined...")
+    logger.info("Waiting for transaction %s to be mined...", tx_hash)
     receipt = web3_obj.wait_transaction_receipt(tx_hash)
     if receipt.status:
-        logger.info(f"Transaction {tx_hash} was successfully mined.")
+        logger.info("Transaction %s was successfully mined.", tx_hash)
     else:
-        logger.error(f"Transaction {tx_hash} failed.")
+        logger.error("Transaction %s failed.", tx_hash)
 
 
 def detailed_log_results(method_name, result, abi_path):
@@ -289,7 +386,11 @@ def detailed_log_results(method_name, result, abi_path):
           - Логгирует единственный результат.
        b. Иначе:
           - Логгирует ошибку о несоответствии количества значений.
+    4. Если логирование отключено (например, в silent_read), функция сразу завершается без чтения ABI.
     """
+    if not logger.isEnabledFor(logging.ERROR):
+        return
+
     output_params = get_abi_outputs(method_name, abi_path)
 
     if isinstance(result, (list, tuple)):
@@ -297,28 +398,28 @@ def detailed_log_results(method_name, result, abi_path):
             expected_length = len(output_params[0][1])
             for struct_index, struct in enumerate(result):
                 if len(struct) != expected_length:
-                    logging.error(
-                        f"Struct {struct_index} in method {method_name} returned unexpected number of values: {len(struct)}. Expected: {expected_length}")
+                    logging.error("Struct %s in method %s returned unexpected number of values: %s. Expected: %s",
+                                  struct_index, method_name, len(struct), expected_length)
                 else:
-                    logging.info(f"Struct {struct_index}:")
+                    logging.info("Struct %s:", struct_index)
                     for param, value in zip(output_params[0][1], struct):
-                        logging.info(f"  {param['name']}: {value}")
+                        logging.info("  %s: %s", param['name'], value)
         else:
             if len(output_params) == 1 and isinstance(result, list):
-                logging.info(f"{output_params[0][0]}: {result}")
+                logging.info("%s: %s", output_params[0][0], result)
             else:
                 if len(output_params) != len(result):
-                    logging.error(
-                        f"Method {method_name} returned unexpected number of values: {len(result)}. Expected: {len(output_params)}")
+                    logging.error("Method %s returned unexpected number of values: %s. Expected: %s",
+                                  method_name, len(result), len(output_params))
                 else:
                     for param, value in zip(output_params, result):
-                        logging.info(f"{param[0]}: {value}")
+                        logging.info("%s: %s", param[0], value)
     else:
         if len(output_params) == 1:
-            logging.info(f"{output_params[0][0]}: {result}")
+            logging.info("%s: %s", output_params[0][0], result)
         else:
-            logging.error(
-                f"Method {method_name} returned a single value, but expected multiple values: {len(output_params)}")
+            logging.error("Method %s returned a single value, but expected multiple values: %s",
+                          method_name, len(output_params))
 
 def suppress_logging(func):
     @wraps(func)
@@ -355,7 +456,7 @@ def read(web3_obj, method_name, *args):
     5. Возвращает результат, полученный от safe_read_method.
     """
     print()
-    logging.info(f"Running method: {method_name} with arguments: {args}")
+    logging.info("Running method: %s with arguments: %s", method_name, args)
     result = safe_read_method(web3_obj, method_name, *args)
     detailed_log_results(method_name, result, web3_obj.path_abi)
     return result
@@ -386,10 +487,10 @@ def write(web3_obj, wallet_address, private_key, method_name, *args):
        - Логгирует ошибку выполнения метода записи.
     """
     print()
-    logging.info(f"Running write method: {method_name} with arguments: {args}")
+    logging.info("Running write method: %s with arguments: %s", method_name, args)
     tx_hash = safe_write_method(web3_obj, wallet_address, private_key, method_name, *args)
     if tx_hash:
-        logging.info(f"Write method {method_name} executed. Waiting for completion.")
+        logging.info("Write method %s executed. Waiting for completion.", method_name)
         wait_for_transaction_receipt(web3_obj, tx_hash)
     else:
-        logging.error(f"Failed to execute write method {method_name}")
\ No newline at end of file
+        logging.error("Failed to execute write method %s", method_name)
\ No newline at end of file
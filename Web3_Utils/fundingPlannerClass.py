@@ -0,0 +1,111 @@
+class FundingPlanner:
+    """
+    Пополняет множество кошельков нативной валютой и токенами ERC20 с одного или нескольких кошельков-источников.
+
+    Текущие балансы всех целей проверяются пакетными запросами (Web3Utils.rpc_batch и batch_call), кошельки,
+    у которых уже достаточно средств, пропускаются, а остальным отправляется только недостающая сумма.
+    Цена газа и nonce источников запрашиваются один раз, транзакции каждого источника отправляются подряд
+    с последовательными nonce без ожидания подтверждения, после чего подтверждения собираются пакетными
+    запросами квитанций.
+
+    Атрибуты:
+        web3_utils (Web3Utils): Объект Web3Utils; для пополнения токенами должен быть создан с адресом контракта.
+        faucets (list): Кошельки-источники (UserWallet). Цели распределяются между ними по кругу.
+        token_method (str): Метод контракта для пополнения токенами: 'transfer' (перевод с источника)
+                            или 'mint' (источник минтит токены на адрес цели).
+        token_gas (int): Лимит газа транзакции пополнения токенами.
+    """
+
+    def __init__(self, web3_utils, faucets, token_method='transfer', token_gas=200000):
+        if not faucets:
+            raise ValueError("Необходимо указать хотя бы один кошелек-источник.")
+        self.web3_utils = web3_utils
+        self.faucets = list(faucets)
+        self.token_method = token_method
+        self.token_gas = token_gas
+
+    def get_balances(self, addresses: list, with_tokens=True) -> tuple[list, list]:
+        """
+        Возвращает нативные балансы и балансы токена для списка адресов пакетными запросами.
+
+        Returns:
+            tuple[list, list]: Нативные балансы и балансы токена (пустой список, если with_tokens=False).
+        """
+        native = [self.web3_utils.to_int(balance) for balance in
+                  self.web3_utils.rpc_batch([('eth_getBalance', [address, 'latest']) for address in addresses])]
+        tokens = []
+        if with_tokens and addresses:
+            tokens = self.web3_utils.batch_call([('balanceOf', [address]) for address in addresses])
+        return native, tokens
+
+    def plan(self, targets: list) -> list:
+        """
+        Определяет, какие пополнения нужны для достижения целевых балансов.
+
+        Args:
+            targets (list): Цели вида (адрес, нативный баланс в wei, баланс токена). Нулевые суммы не проверяются.
+
+        Returns:
+            list: Пополнения вида ('native' | 'token', адрес, недостающая сумма).
+        """
+        addresses = [address for address, _, _ in targets]
+        with_tokens = any(token_amount for _, _, token_amount in targets)
+        native, tokens = self.get_balances(addresses, with_tokens)
+
+        transfers = []
+        for index, (address, native_amount, token_amount) in enumerate(targets):
+            if native_amount and native[index] < native_amount:
+                transfers.append(('native', address, native_amount - native[index]))
+            if token_amount and tokens[index] < token_amount:
+                transfers.append(('token', address, token_amount - tokens[index]))
+        return transfers
+
+    def fund(self, targets: list, wait=True, timeout=300) -> dict:
+        """
+        Пополняет кошельки до целевых балансов.
+
+        Args:
+            targets (list): Цели вида (адрес, нативный баланс в wei, баланс токена).
+            wait (bool): Дождаться подтверждения всех транзакций пополнения.
+            timeout (float): Максимальное время ожидания подтверждений в секундах.
+
+        Returns:
+            dict: {'planned': количество нужных пополнений, 'skipped': количество уже пополненных целей,
+                   'tx_hashes': хеши отправленных транзакций, 'failed': пополнения, которые не удалось отправить
+                   или которые откатились}.
+        """
+        transfers = self.plan(targets)
+        funded = {address for _, address, _ in transfers}
+        result = {'planned': len(transfers), 'skipped': len(targets) - len(funded), 'tx_hashes': [], 'failed': []}
+        if not transfers:
+            return result
+
+        web3 = self.web3_utils.web3
+        gas_price = web3.eth.gasPrice
+        nonces = [self.web3_utils.to_int(nonce) for nonce in self.web3_utils.rpc_batch(
+            [('eth_getTransactionCount', [faucet.public_key, 'pending']) for faucet in self.faucets])]
+
+        sent = []
+        for index, (kind, address, amount) in enumerate(transfers):
+            faucet_index = index % len(self.faucets)
+            faucet = self.faucets[faucet_index]
+            if kind == 'native':
+                tx_hash = self.web3_utils.send_native_currency(address, amount, user_wallet=faucet,
+                                                               nonce=nonces[faucet_index], gas_price=gas_price)
+            else:
+                tx_hash = self.web3_utils.send_transaction(self.token_method, address, amount, user_wallet=faucet,
+                                                           gas=self.token_gas, nonce=nonces[faucet_index],
+                                                           gas_price=gas_price)
+            if tx_hash:
+                nonces[faucet_index] += 1
+                sent.append(((kind, address, amount), tx_hash))
+            else:
+                result['failed'].append((kind, address, amount))
+
+        result['tx_hashes'] = [tx_hash for _, tx_hash in sent]
+        if wait:
+            receipts = self.web3_utils.wait_transaction_receipts(result['tx_hashes'], timeout)
+            for (transfer, _), receipt in zip(sent, receipts):
+                if receipt is None or not self.web3_utils.to_int(receipt['status']):
+                    result['failed'].append(transfer)
+        return result
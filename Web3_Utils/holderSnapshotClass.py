@@ -0,0 +1,224 @@
+import mmap
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+from hexbytes import HexBytes
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Multicall3 развернут по одному адресу в большинстве сетей
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+AGGREGATE3_SELECTOR = function_signature_to_4byte_selector('aggregate3((address,bool,bytes)[])')
+BALANCE_OF_SELECTOR = function_signature_to_4byte_selector('balanceOf(address)')
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+
+# Формат файла: заголовок (magic, количество адресов, блок, адрес токена), затем колонка адресов
+# по 20 байт и колонка балансов по 32 байта (big-endian). Колонки выровнены по 64 байтам.
+SNAPSHOT_MAGIC = b'HOLDERS1'
+HEADER_FORMAT = '<8sQQ20s'
+HEADER_SIZE = 64
+
+
+def _column_offsets(count: int) -> tuple[int, int]:
+    balances_offset = HEADER_SIZE + count * 20
+    balances_offset += -balances_offset % 64
+    return HEADER_SIZE, balances_offset
+
+
+class HolderSnapshot:
+    """
+    Снимок балансов держателей токена ERC20 на фиксированном блоке.
+
+    Балансы читаются пачками по chunk_size адресов: одним вызовом aggregate3 контракта Multicall3, если он
+    развернут в сети, иначе пакетным JSON-RPC запросом eth_call (Web3Utils.batch_call). Все вызовы
+    фиксируются на одном блоке и выполняются в пуле из max_workers потоков, неудачная пачка повторяется
+    до retries раз. Результат записывается в колоночный файл (см. save), который загружается без
+    копирования через отображение в память (HolderSnapshotFile).
+
+    Атрибуты:
+        web3_utils (Web3Utils): Объект Web3Utils с контрактом токена.
+        block (int): Блок, на котором читаются балансы.
+        chunk_size (int): Количество адресов в одном вызове.
+        max_workers (int): Максимальное количество одновременных вызовов.
+        retries (int): Количество повторов неудачного вызова.
+    """
+    # Начальный размер диапазона блоков для eth_getLogs; уменьшается, если узел отклоняет запрос
+    logs_step = 5000
+
+    def __init__(self, web3_utils, block=None, chunk_size=500, max_workers=8, retries=3):
+        self.web3_utils = web3_utils
+        self.block = web3_utils.web3.eth.blockNumber if block is None else block
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self._multicall = None
+
+    def holders_from_transfers(self, from_block=0, to_block=None) -> list:
+        """
+        Собирает адреса всех получателей и отправителей из истории событий Transfer токена.
+
+        Args:
+            from_block (int): Начальный блок истории (например, блок деплоя токена).
+            to_block (int, optional): Конечный блок. По умолчанию блок снимка.
+
+        Returns:
+            list: Адреса в порядке первого появления, без нулевого адреса.
+        """
+        to_block = self.block if to_block is None else to_block
+        holders = {}
+        for log in self.web3_utils.get_logs(from_block, to_block, [TRANSFER_TOPIC], self.logs_step):
+            for topic in log['topics'][1:3]:
+                holders.setdefault(HexBytes(topic)[-20:], None)
+        holders.pop(bytes(20), None)
+        return [to_checksum_address(address) for address in holders]
+
+    def _has_multicall(self) -> bool:
+        if self._multicall is None:
+            code = self.web3_utils.rpc_batch([('eth_getCode', [MULTICALL3_ADDRESS, hex(self.block)])])[0]
+            self._multicall = bool(code) and HexBytes(code) != HexBytes(b'')
+        return self._multicall
+
+    def _read_chunk(self, addresses: list) -> list:
+        if not self._has_multicall():
+            return self.web3_utils.batch_call([('balanceOf', [address]) for address in addresses], self.block)
+
+        codec = self.web3_utils.web3.codec
+        token = self.web3_utils.contract_obj.address
+        calls = [(token, False, BALANCE_OF_SELECTOR + codec.encode_abi(['address'], [address]))
+                 for address in addresses]
+        data = AGGREGATE3_SELECTOR + codec.encode_abi(['(address,bool,bytes)[]'], [calls])
+        raw = self.web3_utils.rpc_batch([('eth_call', [{'to': MULTICALL3_ADDRESS, 'data': '0x' + data.hex()},
+                                                      hex(self.block)])])[0]
+        results = codec.decode_abi(['(bool,bytes)[]'], HexBytes(raw))[0]
+        return [int.from_bytes(return_data[:32], 'big') for _, return_data in results]
+
+    def _read_chunk_with_retry(self, addresses: list) -> list:
+        for attempt in range(self.retries + 1):
+            try:
+                return self._read_chunk(addresses)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                print(f"Ошибка чтения балансов ({e}), повтор через {2 ** attempt} с")
+                time.sleep(2 ** attempt)
+
+    def read_balances(self, addresses: list) -> list:
+        """
+        Читает балансы адресов на блоке снимка.
+
+        Returns:
+            list: Балансы в порядке адресов.
+
+        Raises:
+            ValueError: Если пачку не удалось прочитать после всех повторов.
+        """
+        chunks = [addresses[start:start + self.chunk_size] for start in range(0, len(addresses), self.chunk_size)]
+        balances = []
+        with ThreadPoolExecutor(max_workers=max(min(self.max_workers, len(chunks)), 1)) as executor:
+            for chunk_balances in executor.map(self._read_chunk_with_retry, chunks):
+                balances.extend(chunk_balances)
+        return balances
+
+    def run(self, path: str, addresses=None, from_block=0) -> dict:
+        """
+        Выполняет снимок и записывает его в файл.
+
+        Args:
+            path (str): Путь к файлу снимка.
+            addresses (list, optional): Адреса держателей. Если не указаны, собираются из событий Transfer
+                                        (см. holders_from_transfers) начиная с from_block.
+            from_block (int): Начальный блок истории Transfer.
+
+        Returns:
+            dict: {'path', 'block', 'holders': количество адресов, 'nonzero': количество ненулевых балансов,
+                   'total': сумма балансов, 'seconds': длительность}.
+        """
+        started = time.monotonic()
+        if addresses is None:
+            addresses = self.holders_from_transfers(from_block)
+        balances = self.read_balances(addresses)
+        self.save(path, addresses, balances)
+        return {
+            'path': path,
+            'block': self.block,
+            'holders': len(addresses),
+            'nonzero': sum(1 for balance in balances if balance),
+            'total': sum(balances),
+            'seconds': round(time.monotonic() - started, 3),
+        }
+
+    def save(self, path: str, addresses: list, balances: list):
+        """
+        Записывает снимок в колоночный файл: заголовок, адреса по 20 байт, балансы по 32 байта big-endian.
+        """
+        addresses_offset, balances_offset = _column_offsets(len(addresses))
+        token = HexBytes(self.web3_utils.contract_obj.address)
+        with open(path, 'wb') as file:
+            file.write(struct.pack(HEADER_FORMAT, SNAPSHOT_MAGIC, len(addresses), self.block, token)
+                       .ljust(HEADER_SIZE, b'\0'))
+            file.write(b''.join(HexBytes(address) for address in addresses))
+            file.write(b'\0' * (balances_offset - addresses_offset - len(addresses) * 20))
+            file.write(b''.join(balance.to_bytes(32, 'big') for balance in balances))
+
+
+class HolderSnapshotFile:
+    """
+    Снимок балансов, загруженный из файла через отображение в память без копирования данных.
+
+    Если установлен NumPy, колонки доступны как массивы numpy.memmap: addresses (dtype 'S20') и balances
+    (байты uint8 формы (N, 32)). Иначе — как memoryview по отображенному файлу.
+
+    Атрибуты:
+        block (int): Блок снимка.
+        token (str): Адрес токена.
+        addresses: Колонка адресов.
+        balances: Колонка балансов.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as file:
+            magic, count, self.block, token = struct.unpack(HEADER_FORMAT, file.read(struct.calcsize(HEADER_FORMAT)))
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"Файл {path} не является снимком балансов.")
+        self.token = to_checksum_address(token)
+        self.count = count
+        addresses_offset, balances_offset = _column_offsets(count)
+
+        if np is not None:
+            if count:
+                self.addresses = np.memmap(path, dtype='S20', mode='r', offset=addresses_offset, shape=(count,))
+                self.balances = np.memmap(path, dtype=np.uint8, mode='r', offset=balances_offset, shape=(count, 32))
+            else:
+                self.addresses = np.empty(0, dtype='S20')
+                self.balances = np.empty((0, 32), dtype=np.uint8)
+        else:
+            with open(path, 'rb') as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(self._mmap)
+            self.addresses = view[addresses_offset:addresses_offset + count * 20]
+            self.balances = view[balances_offset:balances_offset + count * 32]
+
+    def __len__(self):
+        return self.count
+
+    def address(self, index: int) -> str:
+        if np is not None:
+            # Элементы 'S20' возвращаются без завершающих нулевых байтов
+            return to_checksum_address(self.addresses[index].ljust(20, b'\0'))
+        return to_checksum_address(bytes(self.addresses[index * 20:(index + 1) * 20]))
+
+    def balance(self, index: int) -> int:
+        if np is not None:
+            return int.from_bytes(self.balances[index].tobytes(), 'big')
+        return int.from_bytes(self.balances[index * 32:(index + 1) * 32], 'big')
+
+    def to_dict(self) -> dict:
+        """
+        Возвращает снимок в виде словаря {адрес: баланс}.
+        """
+        return {self.address(index): self.balance(index) for index in range(self.count)}
@@ -0,0 +1,136 @@
+import math
+import threading
+import time
+
+_local = threading.local()
+
+
+def percentiles(values, points=(50, 90, 99)) -> dict:
+    """
+    Считает сводку по набору длительностей: количество, минимум, среднее, максимум и перцентили (nearest-rank).
+
+    Args:
+        values (list): Значения (например, длительности в миллисекундах).
+        points (tuple): Перцентили для расчета.
+
+    Returns:
+        dict: Сводка вида {'count', 'min', 'mean', 'p50', 'p90', 'p99', 'max'}. Пустой словарь, если значений нет.
+    """
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return {}
+    summary = {'count': len(values), 'min': values[0], 'mean': round(sum(values) / len(values), 3)}
+    for point in points:
+        summary[f'p{point}'] = values[max(math.ceil(point / 100 * len(values)) - 1, 0)]
+    summary['max'] = values[-1]
+    return summary
+
+
+def to_ms(seconds) -> float:
+    return round(seconds * 1000, 3)
+
+
+class TimingRecorder:
+    """
+    Сборщик длительностей операций с блокчейном для одного тест-кейса (или другой единицы работы).
+
+    Пока сборщик активен в потоке (activate), Web3Utils записывает в него длительности чтений, получения цены газа
+    и nonce, подписи, отправки транзакций и ожидания квитанций, а также для каждой отправленной транзакции
+    время от отправки до получения квитанции и задержку включения в блоках. Используются монотонные часы.
+
+    Атрибуты:
+        samples (dict): Длительности операций в миллисекундах по имени операции.
+        transactions (dict): Данные транзакций по хешу: 'sendMs', 'inclusionMs', 'blockDelay'.
+        track_blocks (bool): Записывать задержку включения в блоках. Номер последнего блока запрашивается в одном
+                             пакете с отправкой транзакции (Web3Utils._broadcast).
+    """
+    __slots__ = ('samples', 'transactions', 'track_blocks', 'started', 'finished', '_submitted', '_previous')
+
+    def __init__(self, track_blocks=True):
+        self.samples = {}
+        self.transactions = {}
+        self.track_blocks = track_blocks
+        self.started = time.monotonic()
+        self.finished = None
+        self._submitted = {}
+        self._previous = None
+
+    def activate(self):
+        """
+        Делает сборщик текущим для потока. Предыдущий сборщик восстанавливается в deactivate.
+        """
+        self._previous = getattr(_local, 'recorder', None)
+        _local.recorder = self
+        return self
+
+    def deactivate(self):
+        if getattr(_local, 'recorder', None) is self:
+            _local.recorder = self._previous
+        self._previous = None
+        if self.finished is None:
+            self.finished = time.monotonic()
+
+    @property
+    def duration_ms(self) -> float:
+        return to_ms((self.finished or time.monotonic()) - self.started)
+
+    def record(self, name, seconds):
+        self.samples.setdefault(name, []).append(to_ms(seconds))
+
+    def submitted(self, tx_hash, started, block_number=None):
+        """
+        Отмечает отправку транзакции: длительность отправки с момента started и номер последнего блока
+        перед отправкой (block_number), от которого считается задержка включения в блоках.
+        """
+        now = time.monotonic()
+        self.transactions[tx_hash] = {'sendMs': to_ms(now - started), 'inclusionMs': None, 'blockDelay': None}
+        self._submitted[tx_hash] = (now, block_number)
+
+    def included(self, tx_hash, block_number, waited=True):
+        """
+        Отмечает получение квитанции транзакции. Время до включения записывается только если квитанция
+        была получена ожиданием (waited), иначе момент включения неизвестен.
+        """
+        if tx_hash not in self._submitted:
+            return
+        submitted_at, submitted_block = self._submitted[tx_hash]
+        info = self.transactions[tx_hash]
+        if waited and info['inclusionMs'] is None:
+            info['inclusionMs'] = to_ms(time.monotonic() - submitted_at)
+            self.samples.setdefault('submit_to_receipt', []).append(info['inclusionMs'])
+        if submitted_block is not None and block_number is not None and info['blockDelay'] is None:
+            info['blockDelay'] = block_number - submitted_block
+            self.samples.setdefault('block_delay', []).append(info['blockDelay'])
+
+    def summary(self) -> dict:
+        return {name: percentiles(values) for name, values in self.samples.items()}
+
+
+def current_recorder() -> TimingRecorder | None:
+    """
+    Возвращает активный в текущем потоке сборщик или None.
+    """
+    return getattr(_local, 'recorder', None)
+
+
+class timed:
+    """
+    Контекстный менеджер, записывающий длительность блока в активный сборщик потока под именем name.
+    Если сборщик не активен, ничего не делает.
+    """
+    __slots__ = ('name', 'recorder', 'started')
+
+    def __init__(self, name):
+        self.name = name
+        self.recorder = getattr(_local, 'recorder', None)
+        self.started = None
+
+    def __enter__(self):
+        if self.recorder is not None:
+            self.started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.recorder is not None:
+            self.recorder.record(self.name, time.monotonic() - self.started)
+        return False
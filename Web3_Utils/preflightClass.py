@@ -0,0 +1,176 @@
+import threading
+
+from eth_abi import decode_abi
+from hexbytes import HexBytes
+
+# Селекторы стандартных ошибок Solidity: Error(string) и Panic(uint256)
+ERROR_SELECTOR = '0x08c379a0'
+PANIC_SELECTOR = '0x4e487b71'
+
+PANIC_CODES = {
+    0x00: 'generic compiler panic',
+    0x01: 'assert failed',
+    0x11: 'arithmetic overflow or underflow',
+    0x12: 'division or modulo by zero',
+    0x21: 'invalid enum value',
+    0x22: 'invalid storage byte array encoding',
+    0x31: 'pop on empty array',
+    0x32: 'array index out of bounds',
+    0x41: 'out of memory',
+    0x51: 'call to zero-initialized internal function',
+}
+
+
+class TransactionReverted(ValueError):
+    """
+    Транзакция откатится: eth_call или eth_estimateGas перед отправкой завершились ошибкой.
+
+    Атрибуты:
+        reason (str): Расшифрованная причина отката.
+        data (HexBytes | None): Данные отката, возвращенные узлом.
+    """
+
+    def __init__(self, reason, data=None):
+        super().__init__(reason)
+        self.reason = reason
+        self.data = data
+
+
+def revert_data_from_error(error) -> tuple[str, HexBytes | None]:
+    """
+    Извлекает сообщение и данные отката из ошибки JSON-RPC. Узлы возвращают данные в разных местах:
+    geth и anvil — строкой в 'data', hardhat — в 'data.data', ganache — в 'data.<hash>.return'.
+
+    Returns:
+        tuple[str, HexBytes | None]: Сообщение узла и данные отката (если есть).
+    """
+    if not isinstance(error, dict):
+        return str(error), None
+    message = error.get('message', str(error))
+    data = error.get('data')
+    if isinstance(data, dict):
+        if 'data' in data:
+            data = data['data']
+        else:
+            data = next((value.get('return') for value in data.values()
+                         if isinstance(value, dict) and 'return' in value), None)
+    if isinstance(data, str) and data.startswith('0x') and len(data) >= 10:
+        return message, HexBytes(data)
+    return message, None
+
+
+def decode_revert_reason(data, errors=None, codec=None) -> str | None:
+    """
+    Расшифровывает данные отката: Error(string), Panic(uint256) и пользовательские ошибки из ABI.
+
+    Args:
+        data (bytes): Данные отката.
+        errors (dict, optional): Пользовательские ошибки ABI по селектору (AbiSchema.errors).
+        codec (optional): Кодек ABI (web3.codec). По умолчанию используется eth_abi.
+
+    Returns:
+        str | None: Причина отката или None, если данные не распознаны.
+    """
+    if not data or len(data) < 4:
+        return None
+    decode = codec.decode_abi if codec is not None else decode_abi
+    data = HexBytes(data)
+    selector = data[:4].hex()
+    selector = selector if selector.startswith('0x') else '0x' + selector
+    try:
+        if selector == ERROR_SELECTOR:
+            return decode(['string'], data[4:])[0]
+        if selector == PANIC_SELECTOR:
+            code = decode(['uint256'], data[4:])[0]
+            return f'Panic(0x{code:02x}): {PANIC_CODES.get(code, "unknown panic code")}'
+        if errors and selector in errors:
+            error_abi, types = errors[selector]
+            values = decode(types, data[4:])
+            args = ', '.join(f'{param["name"]}={value}' for param, value in zip(error_abi['inputs'], values))
+            return f'{error_abi["name"]}({args})'
+    except Exception:
+        return None
+    return None
+
+
+class GasEstimateCache:
+    """
+    Общий для процесса кэш оценок газа по ключу (сеть, адрес контракта, метод, форма аргументов). Сеть входит
+    в ключ, так как при детерминированном деплое (CREATE2) контракт имеет один адрес в разных сетях.
+
+    Форма аргументов учитывает типы и длины значений (строк, байтов, списков), но не сами значения, поэтому
+    повторные вызовы метода с однотипными аргументами используют одну оценку. Для ключа хранится
+    максимальная из полученных оценок, а лимит газа вычисляется как оценка * margin + extra: дополнительный
+    газ покрывает запись в новую ячейку хранилища (например, перевод на адрес с нулевым балансом),
+    которой могло не быть в оцененном вызове. Кэш потокобезопасен.
+
+    Атрибуты:
+        margin (float): Множитель запаса.
+        extra (int): Дополнительный газ к каждой оценке.
+    """
+
+    def __init__(self, margin=1.2, extra=20000):
+        self.margin = margin
+        self.extra = extra
+        self._estimates = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def argument_shape(args) -> tuple:
+        shape = []
+        for arg in args:
+            if isinstance(arg, (str, bytes, bytearray)):
+                shape.append((type(arg).__name__, len(arg)))
+            elif isinstance(arg, (list, tuple)):
+                shape.append(('seq', GasEstimateCache.argument_shape(arg)))
+            else:
+                shape.append(type(arg).__name__)
+        return tuple(shape)
+
+    def key(self, chain_id, contract_address, method_name, args) -> tuple:
+        return chain_id, contract_address.lower(), method_name, self.argument_shape(args)
+
+    def get(self, key) -> int | None:
+        """
+        Возвращает лимит газа с запасом для ключа или None, если оценки нет.
+        """
+        estimate = self._estimates.get(key)
+        if estimate is None:
+            return None
+        return int(estimate * self.margin) + self.extra
+
+    def put(self, key, estimate: int) -> int:
+        """
+        Сохраняет оценку газа и возвращает лимит газа с запасом.
+        """
+        with self._lock:
+            self._estimates[key] = max(estimate, self._estimates.get(key, 0))
+        return self.get(key)
+
+    def max_limit(self, chain_id, contract_address) -> int | None:
+        """
+        Возвращает наибольший лимит газа с запасом среди оценок методов контракта или None, если оценок нет.
+        """
+        contract_address = contract_address.lower()
+        estimates = [estimate for key, estimate in list(self._estimates.items())
+                     if key[0] == chain_id and key[1] == contract_address]
+        if not estimates:
+            return None
+        return int(max(estimates) * self.margin) + self.extra
+
+    def invalidate(self, contract_address=None, chain_id=None):
+        """
+        Удаляет оценки контракта (во всех сетях или только в сети chain_id) или, если ничего не указано,
+        очищает кэш целиком.
+        """
+        with self._lock:
+            if contract_address is None and chain_id is None:
+                self._estimates.clear()
+                return
+            address = contract_address.lower() if contract_address is not None else None
+            for key in [key for key in self._estimates
+                        if (chain_id is None or key[0] == chain_id) and (address is None or key[1] == address)]:
+                del self._estimates[key]
+
+
+gas_cache = GasEstimateCache()
@@ -0,0 +1,70 @@
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+INT64_MIN, INT64_MAX, UINT64_MAX = -2 ** 63, 2 ** 63 - 1, 2 ** 64 - 1
+
+
+class SeriesCache:
+    """
+    Общий для процесса кэш значений методов чтения на конкретных блоках.
+
+    Значения на финализированных блоках не меняются, поэтому хранятся без ограничения срока и повторно
+    не запрашиваются. Ключ ряда — (сеть, адрес контракта, метод, аргументы). Кэш потокобезопасен.
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(chain_id, contract_address, method_name, args) -> tuple:
+        return chain_id, contract_address.lower(), method_name, repr(tuple(args))
+
+    def get_many(self, key, blocks) -> dict:
+        """
+        Возвращает закэшированные значения ряда для блоков, которые есть в кэше.
+        """
+        values = self._series.get(key, {})
+        return {block: values[block] for block in blocks if block in values}
+
+    def put_many(self, key, values: dict):
+        with self._lock:
+            self._series.setdefault(key, {}).update(values)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+series_cache = SeriesCache()
+
+
+def value_dtype(values):
+    """
+    Подбирает тип NumPy для значений ряда. Целые, не помещающиеся в int64/uint64 (например, балансы токенов
+    с 18 знаками), а также строки, адреса и кортежи хранятся как объекты Python без потери точности.
+    """
+    if values and all(isinstance(value, bool) for value in values):
+        return np.bool_
+    if values and all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        low, high = min(values), max(values)
+        if INT64_MIN <= low and high <= INT64_MAX:
+            return np.int64
+        if low >= 0 and high <= UINT64_MAX:
+            return np.uint64
+    return object
+
+
+def to_series_array(blocks, values):
+    """
+    Собирает ряд в структурированный массив NumPy с полями 'block' и 'value'.
+    Если NumPy не установлен, возвращает список пар (блок, значение).
+    """
+    if np is None:
+        return list(zip(blocks, values))
+    dtype = [('block', np.uint64), ('value', value_dtype(values))]
+    return np.array(list(zip(blocks, values)), dtype=dtype)
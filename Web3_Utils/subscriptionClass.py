@@ -0,0 +1,257 @@
+import asyncio
+import itertools
+import json
+import threading
+
+import websockets
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted
+from web3._utils.method_formatters import receipt_formatter
+
+from .func import logger
+
+
+class SubscriptionClient:
+    """
+    Постоянное WebSocket-подключение к узлу с подписками eth_subscribe (newHeads, logs и т.д.).
+
+    Подключение обслуживается отдельным потоком с собственным циклом asyncio. При обрыве соединения клиент
+    переподключается с экспоненциальной задержкой и заново оформляет все подписки. Уведомления, пришедшие
+    во время обрыва, теряются, поэтому потребители должны иметь резервный опрос (см. ReceiptWaiter).
+
+    Обработчики подписок вызываются в потоке подключения и должны быстро возвращать управление.
+
+    Аргументы:
+        ws_url (str): URL WebSocket-провайдера (ws:// или wss://).
+    """
+    reconnect_delay = 1.0
+    max_reconnect_delay = 30.0
+    request_timeout = 10.0
+
+    def __init__(self, ws_url):
+        self.ws_url = ws_url
+        self._subscriptions = {}
+        self._server_ids = {}
+        self._pending = {}
+        self._request_ids = itertools.count(1)
+        self._keys = itertools.count(1)
+        self._lock = threading.Lock()
+        self._ws = None
+        self._closed = False
+        self.connected = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=f'ws-subscriptions {ws_url}', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._main())
+
+    async def _main(self):
+        delay = self.reconnect_delay
+        while not self._closed:
+            try:
+                async with websockets.connect(self.ws_url, max_size=None) as ws:
+                    self._ws = ws
+                    delay = self.reconnect_delay
+                    reader = asyncio.ensure_future(self._read(ws))
+                    try:
+                        await self._resubscribe()
+                        await reader
+                    finally:
+                        reader.cancel()
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                if not self._closed:
+                    logger.warning("WebSocket %s: соединение потеряно (%s), переподключение через %s с",
+                                   self.ws_url, e, delay)
+            except Exception:
+                # Ошибка не связана с сетью (например, несовместимая версия websockets): повтор ее не исправит
+                logger.exception("WebSocket %s: подключение остановлено из-за ошибки", self.ws_url)
+                raise
+            finally:
+                self.connected.clear()
+                self._ws = None
+                self._server_ids.clear()
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(ConnectionError('WebSocket connection closed'))
+                self._pending.clear()
+
+            if not self._closed:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _resubscribe(self):
+        # Оформляет все подписки заново. Подписки, добавленные методом subscribe во время восстановления,
+        # тоже оформляются здесь: connected устанавливается под той же блокировкой, под которой subscribe
+        # добавляет подписку, поэтому новая подписка либо видна здесь, либо отправляется самим subscribe
+        done = set()
+        while True:
+            with self._lock:
+                keys = [key for key in self._subscriptions if key not in done]
+                if not keys:
+                    self.connected.set()
+                    return
+            for key in keys:
+                done.add(key)
+                try:
+                    await self._subscribe(key)
+                except ValueError as e:
+                    # Узел отклонил подписку: остальные подписки продолжают работать
+                    logger.error("WebSocket %s: подписка %s отклонена узлом: %s",
+                                 self.ws_url, self._subscriptions.get(key, (key,))[0], e)
+
+    async def _read(self, ws):
+        async for message in ws:
+            try:
+                response = json.loads(message)
+            except ValueError:
+                logger.warning("WebSocket %s: пропущено сообщение не в формате JSON: %.200s", self.ws_url, message)
+                continue
+            if response.get('method') == 'eth_subscription':
+                params = response['params']
+                key = self._server_ids.get(params['subscription'])
+                subscription = self._subscriptions.get(key)
+                if subscription is None:
+                    continue
+                try:
+                    subscription[1](params['result'])
+                except Exception as e:
+                    logger.error("Ошибка в обработчике подписки %s: %s", subscription[0], e)
+            else:
+                future = self._pending.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    if 'error' in response:
+                        future.set_exception(ValueError(response['error']))
+                    else:
+                        future.set_result(response.get('result'))
+
+    async def _request(self, method, params):
+        request_id = next(self._request_ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        await self._ws.send(json.dumps({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}))
+        return await asyncio.wait_for(future, self.request_timeout)
+
+    async def _subscribe(self, key):
+        subscription = self._subscriptions.get(key)
+        if subscription is None or self._ws is None:
+            return
+        server_id = await self._request('eth_subscribe', subscription[0])
+        self._server_ids[server_id] = key
+
+    async def _unsubscribe(self, key):
+        for server_id, subscription_key in list(self._server_ids.items()):
+            if subscription_key == key:
+                del self._server_ids[server_id]
+                if self._ws is not None:
+                    await self._request('eth_unsubscribe', [server_id])
+
+    def subscribe(self, params: list, callback) -> int:
+        """
+        Оформляет подписку eth_subscribe. Подписка сохраняется и восстанавливается после переподключения.
+
+        Args:
+            params (list): Параметры eth_subscribe, например ['newHeads'] или ['logs', {'address': ...}].
+            callback: Функция, вызываемая с результатом каждого уведомления (словарь в формате JSON-RPC).
+
+        Returns:
+            int: Ключ подписки для unsubscribe.
+        """
+        with self._lock:
+            key = next(self._keys)
+            self._subscriptions[key] = (params, callback)
+            # Пока соединение восстанавливается, подписку оформит _resubscribe
+            connected = self.connected.is_set()
+        if connected:
+            asyncio.run_coroutine_threadsafe(self._subscribe(key), self._loop).result(self.request_timeout)
+        return key
+
+    def unsubscribe(self, key):
+        with self._lock:
+            self._subscriptions.pop(key, None)
+        if self.connected.is_set():
+            asyncio.run_coroutine_threadsafe(self._unsubscribe(key), self._loop).result(self.request_timeout)
+
+    def close(self):
+        self._closed = True
+        if self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+
+
+class ReceiptWaiter:
+    """
+    Ожидание квитанций транзакций по уведомлениям о новых блоках.
+
+    На каждое уведомление newHeads квитанции всех ожидаемых транзакций запрашиваются одним пакетным
+    запросом (Web3Utils.get_transaction_receipts), поэтому подтверждение обнаруживается сразу после
+    появления блока, а количество запросов не зависит от числа ожидающих потоков. Если уведомлений
+    нет дольше fallback_interval (например, во время переподключения), проверка выполняется по таймеру.
+
+    Аргументы:
+        web3_utils (Web3Utils): Объект Web3Utils для пакетных HTTP-запросов квитанций.
+        client (SubscriptionClient): WebSocket-клиент для подписки на newHeads.
+    """
+    fallback_interval = 5.0
+
+    def __init__(self, web3_utils, client):
+        self.web3_utils = web3_utils
+        self.client = client
+        self._receipts = {}
+        self._waiters = {}
+        self._condition = threading.Condition()
+        self._head = threading.Event()
+        self.client.subscribe(['newHeads'], lambda head: self._head.set())
+        self._thread = threading.Thread(target=self._check_loop, name=f'receipt-waiter {client.ws_url}', daemon=True)
+        self._thread.start()
+
+    def _check_loop(self):
+        while True:
+            self._head.wait(self.fallback_interval)
+            self._head.clear()
+            with self._condition:
+                tx_hashes = [tx_hash for tx_hash, receipt in self._receipts.items() if receipt is None]
+            if not tx_hashes:
+                continue
+            try:
+                receipts = self.web3_utils.get_transaction_receipts(tx_hashes)
+            except Exception as e:
+                logger.error("Ошибка при запросе квитанций: %s", e)
+                continue
+            with self._condition:
+                for tx_hash, receipt in zip(tx_hashes, receipts):
+                    if receipt is not None and tx_hash in self._receipts:
+                        self._receipts[tx_hash] = AttributeDict.recursive(receipt_formatter(receipt))
+                self._condition.notify_all()
+
+    def wait(self, tx_hash, timeout=120):
+        """
+        Ожидает квитанцию транзакции.
+
+        Args:
+            tx_hash (str): Хеш транзакции.
+            timeout (float): Максимальное время ожидания в секундах.
+
+        Returns:
+            AttributeDict: Квитанция в том же формате, что возвращает web3.eth.waitForTransactionReceipt.
+
+        Raises:
+            TimeExhausted: Если транзакция не подтвердилась за timeout.
+        """
+        tx_hash = tx_hash if isinstance(tx_hash, str) else '0x' + bytes(tx_hash).hex()
+        with self._condition:
+            self._receipts.setdefault(tx_hash, None)
+            self._waiters[tx_hash] = self._waiters.get(tx_hash, 0) + 1
+        # Транзакция могла быть включена в блок до начала ожидания
+        self._head.set()
+        with self._condition:
+            found = self._condition.wait_for(lambda: self._receipts.get(tx_hash) is not None, timeout)
+            receipt = self._receipts.get(tx_hash)
+            # Квитанция хранится, пока ее не получат все ожидающие той же транзакции
+            self._waiters[tx_hash] -= 1
+            if not self._waiters[tx_hash]:
+                del self._waiters[tx_hash]
+                del self._receipts[tx_hash]
+        if not found:
+            raise TimeExhausted(f"Transaction {tx_hash} is not in the chain after {timeout} seconds")
+        return receipt
@@ -1,6 +1,7 @@
 import os
 from eth_keys import keys
 from eth_account import Account
+from eth_utils import keccak, to_bytes
 
 class UserWallet:
     """
@@ -57,3 +58,23 @@ class UserWallet:
         account = Account.from_key(private_key)
         public_address = account.address
         return cls(str(public_address), str(private_key), username)
+
+    @classmethod
+    def generate_derived_wallet(cls, private_key, label: str, username=None):
+        """
+        Детерминированно получает новый кошелек из приватного ключа и метки.
+
+        Приватный ключ нового кошелька вычисляется как keccak256(исходный ключ + метка), поэтому
+        для одной и той же пары ключ-метка всегда получается один и тот же кошелек. Это позволяет
+        повторно использовать уже пополненные кошельки между запусками.
+
+        Args:
+            private_key (str): Исходный приватный ключ в hex формате.
+            label (str): Метка, отличающая производный кошелек.
+            username (str, optional): Имя пользователя, которое будет ассоциировано с новым кошельком.
+
+        Returns:
+            UserWallet: Объект класса UserWallet с производными публичным адресом и приватным ключом.
+        """
+        derived_key = keys.PrivateKey(keccak(to_bytes(hexstr=str(private_key)) + label.encode('utf-8')))
+        return cls(str(derived_key.public_key.to_checksum_address()), str(derived_key), username)
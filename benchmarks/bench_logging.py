@@ -0,0 +1,119 @@
+"""
+Бенчмарк накладных расходов логирования на один вызов.
+
+Сравнивает ColoredFormatter и StructuredFormatter (json/plain) на сообщениях того же вида, что пишут
+func.read и func.write, с исходным ColoredFormatter (LegacyColoredFormatter, изменяющий запись лога),
+а также вызов при отключенном логировании (как в silent_read).
+
+Запуск:
+    python -m benchmarks.bench_logging [количество_итераций]
+
+Для каждого режима выводится лучшее время одного вызова read_like_calls из пяти повторов.
+"""
+import io
+import logging
+import sys
+import timeit
+
+from colorama import Fore, Style
+
+from Web3_Utils.func import ColoredFormatter, StructuredFormatter
+
+
+class LegacyColoredFormatter(logging.Formatter):
+    """
+    Исходная версия ColoredFormatter для сравнения: раскрашивает сообщение, изменяя record.msg
+    и record.levelname, и разбирает сообщение построчно при каждом вызове.
+    """
+
+    def format(self, record):
+        level_color = {
+            logging.DEBUG: Fore.BLUE,
+            logging.INFO: Fore.WHITE,
+            logging.WARNING: Fore.YELLOW,
+            logging.ERROR: Fore.RED,
+            logging.CRITICAL: Fore.MAGENTA,
+        }
+        levelname = record.levelname
+        if record.levelno in level_color:
+            levelname_color = level_color[record.levelno] + levelname + Style.RESET_ALL
+        else:
+            levelname_color = levelname
+
+        if record.levelno == logging.ERROR:
+            record.msg = Fore.RED + record.msg + Style.RESET_ALL
+        elif record.levelno == logging.WARNING:
+            record.msg = Fore.YELLOW + record.msg + Style.RESET_ALL
+        elif record.levelno == logging.INFO:
+            record.msg = Fore.WHITE + record.msg + Style.RESET_ALL
+
+        if 'arguments:' in record.msg:
+            parts = record.msg.split('arguments:')
+            arguments = parts[1]
+            record.msg = parts[0] + 'arguments:' + Fore.YELLOW + arguments + Style.RESET_ALL
+
+        if 'returned a single value:' in record.msg:
+            parts = record.msg.split('returned a single value:')
+            returned_value = parts[1]
+            record.msg = parts[0] + 'returned a single value:' + Fore.YELLOW + returned_value + Style.RESET_ALL
+
+        lines = record.msg.split('\n')
+        for i in range(len(lines)):
+            if 'Struct' in lines[i]:
+                continue
+            if ': ' in lines[i]:
+                key_value = lines[i].split(': ', 1)
+                key = key_value[0]
+                value = ': '.join(key_value[1:])
+                lines[i] = f"{key}: {Fore.YELLOW}{value}{Style.RESET_ALL}"
+        record.msg = '\n'.join(lines)
+
+        record.levelname = levelname_color
+        return super(LegacyColoredFormatter, self).format(record)
+
+
+def make_logger(formatter):
+    bench_logger = logging.getLogger(f'bench.{id(formatter)}')
+    bench_logger.propagate = False
+    bench_logger.setLevel(logging.INFO)
+    bench_handler = logging.StreamHandler(io.StringIO())
+    bench_handler.setFormatter(formatter)
+    bench_logger.addHandler(bench_handler)
+    return bench_logger
+
+
+def read_like_calls(bench_logger):
+    args = ('0x34829AFe060AF59569225b009caCd1184cE0510a',)
+    bench_logger.info("Running method: %s with arguments: %s", 'balanceOf', args)
+    bench_logger.info("Method %s executed successfully.", 'balanceOf')
+    bench_logger.info("%s: %s", 'balance', 10 ** 21)
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    # Берется лучшее из нескольких повторов, чтобы сравнение не зависело от фоновой нагрузки
+    repeat = 5
+    formatters = {
+        'legacy': LegacyColoredFormatter('%(asctime)s - %(levelname)s - %(message)s'),
+        'color': ColoredFormatter('%(asctime)s - %(levelname)s - %(message)s'),
+        'plain': StructuredFormatter('plain'),
+        'json': StructuredFormatter('json'),
+    }
+
+    print(f"{'mode':10} {'us/call':>10}")
+    for name, formatter in formatters.items():
+        bench_logger = make_logger(formatter)
+        seconds = min(timeit.repeat(lambda: read_like_calls(bench_logger), number=number, repeat=repeat))
+        print(f"{name:10} {seconds / number * 1e6:10.2f}")
+
+    bench_logger = make_logger(StructuredFormatter('plain'))
+    logging.disable(logging.CRITICAL)
+    try:
+        seconds = min(timeit.repeat(lambda: read_like_calls(bench_logger), number=number, repeat=repeat))
+    finally:
+        logging.disable(logging.NOTSET)
+    print(f"{'disabled':10} {seconds / number * 1e6:10.2f}")
+
+
+if __name__ == '__main__':
+    main()
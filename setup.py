@@ -50,7 +50,7 @@ setup(
         'urllib3==2.2.1',
         'varint==1.0.2',
         'web3==5.9.0',
-        'websockets==8.1'
+        'websockets>=10'
     ],
     entry_points={
         # Ваши консольные скрипты или точки входа
@@ -0,0 +1,92 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from Web3_Utils.blockTimeClass import BlockTimeEstimator
+from Web3_Utils.classWeb3Utils import Web3Utils
+from Web3_Utils.metricsClass import TimingRecorder
+
+TX_HASH = '0x' + 'cd' * 32
+RAW_TRANSACTION = b'\x01\x02'
+
+
+def make_web3_utils(items):
+    """
+    Web3Utils без подключения к узлу: пакетный запрос возвращает заданные элементы и запоминается.
+    """
+    web3_utils = object.__new__(Web3Utils)
+    web3_utils.block_time_estimator = BlockTimeEstimator()
+    web3_utils.batches = []
+
+    def rpc_batch_items(calls):
+        web3_utils.batches.append(calls)
+        return items
+
+    web3_utils._rpc_batch_items = rpc_batch_items
+    web3_utils.web3 = SimpleNamespace(eth=SimpleNamespace(sendRawTransaction=lambda raw: bytes.fromhex('cd' * 32)))
+    return web3_utils
+
+
+def test_block_delay_counts_from_block_before_submit():
+    recorder = TimingRecorder()
+    recorder.submitted(TX_HASH, time.monotonic(), block_number=100)
+    recorder.included(TX_HASH, 103)
+    assert recorder.transactions[TX_HASH]['blockDelay'] == 3
+    assert recorder.samples['block_delay'] == [3]
+
+    # Повторная квитанция не добавляет второе значение
+    recorder.included(TX_HASH, 104)
+    assert recorder.samples['block_delay'] == [3]
+
+
+def test_block_delay_from_receipt_without_waiting():
+    recorder = TimingRecorder()
+    recorder.submitted(TX_HASH, time.monotonic(), block_number=7)
+    recorder.included(TX_HASH, 8, waited=False)
+    assert recorder.transactions[TX_HASH]['blockDelay'] == 1
+    assert recorder.transactions[TX_HASH]['inclusionMs'] is None
+
+
+def test_block_delay_unknown_without_submit_block():
+    recorder = TimingRecorder()
+    recorder.submitted(TX_HASH, time.monotonic())
+    recorder.included(TX_HASH, 8)
+    recorder.included('0x' + 'ee' * 32, 8)
+    assert recorder.transactions[TX_HASH]['blockDelay'] is None
+    assert 'block_delay' not in recorder.samples
+
+
+def test_broadcast_reads_head_in_send_batch():
+    web3_utils = make_web3_utils([{'result': hex(110)}, {'result': TX_HASH}])
+    # Оценщик видел блок 100, а с тех пор узел создал еще 10 блоков
+    web3_utils.block_time_estimator.observe(100)
+
+    tx_hash, head_block = web3_utils._broadcast(RAW_TRANSACTION, TimingRecorder())
+
+    assert (tx_hash, head_block) == (TX_HASH, 110)
+    assert web3_utils.batches == [[('eth_blockNumber', []), ('eth_sendRawTransaction', ['0x0102'])]]
+    assert web3_utils.block_time_estimator.last_block == 110
+
+    recorder = TimingRecorder()
+    recorder.submitted(tx_hash, time.monotonic(), head_block)
+    recorder.included(tx_hash, 111)
+    assert recorder.transactions[tx_hash]['blockDelay'] == 1
+
+
+def test_broadcast_without_block_tracking_sends_directly():
+    web3_utils = make_web3_utils([])
+    assert web3_utils._broadcast(RAW_TRANSACTION, None) == (TX_HASH, None)
+    assert web3_utils._broadcast(RAW_TRANSACTION, TimingRecorder(track_blocks=False)) == (TX_HASH, None)
+    assert web3_utils.batches == []
+
+
+def test_broadcast_raises_on_send_error():
+    web3_utils = make_web3_utils([{'result': hex(5)}, {'error': {'code': -32000, 'message': 'nonce too low'}}])
+    with pytest.raises(ValueError):
+        web3_utils._broadcast(RAW_TRANSACTION, TimingRecorder())
+
+
+def test_broadcast_keeps_hash_when_head_request_fails():
+    web3_utils = make_web3_utils([{'error': {'code': -32601, 'message': 'method not found'}}, {'result': TX_HASH}])
+    assert web3_utils._broadcast(RAW_TRANSACTION, TimingRecorder()) == (TX_HASH, None)
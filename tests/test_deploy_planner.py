@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from Web3_Utils.deployPlannerClass import DeployPlanner, create2_address, create_address, normalize_salt
+
+TEST_ERC20 = Path(__file__).resolve().parent.parent / 'DeployERC20_test'
+ZERO = '0x' + '00' * 20
+
+
+@pytest.mark.parametrize('nonce, address', [
+    (0, '0xcd234A471b72ba2F1Ccf0A70FCABA648a5eeCD8d'),
+    (1, '0x343c43A37D37dfF08AE8C4A11544c718AbB4fCF8'),
+    (2, '0xf778B86FA74E846c4f0a1fBd1335FE81c00a0C91'),
+    (3, '0xffFd933A0bC612844eaF0C6Fe3E5b8E9B6C1d19c'),
+])
+def test_create_address(nonce, address):
+    assert create_address('0x6ac7ea33f8831ea9dcc53393aaa88b25a785dbf0', nonce) == address
+
+
+# Примеры из EIP-1014
+@pytest.mark.parametrize('deployer, salt, init_code, address', [
+    (ZERO, '00' * 32, '00', '0x4D1A2e2bB4F88F0250f26Ffff098B0b30B26BF38'),
+    ('0xdeadbeef00000000000000000000000000000000', '00' * 32, '00', '0xB928f69Bb1D91Cd65274e3c79d8986362984fDA3'),
+    ('0xdeadbeef00000000000000000000000000000000', '000000000000000000000000feed' + '00' * 18, '00',
+     '0xD04116cDd17beBE565EB2422F2497E06cC1C9833'),
+    ('0x00000000000000000000000000000000deadbeef', '00' * 28 + 'cafebabe', 'deadbeef' * 11,
+     '0x1d8bfDC5D46DC4f61D6b6115972536eBE6A8854C'),
+    (ZERO, '00' * 32, '', '0xE33C0C7F7df4809055C3ebA6c09CFe4BaF1BD9e0'),
+])
+def test_create2_address(deployer, salt, init_code, address):
+    assert create2_address(deployer, bytes.fromhex(salt), bytes.fromhex(init_code)) == address
+
+
+def test_normalize_salt():
+    assert normalize_salt(7) == bytes(31) + b'\x07'
+    assert normalize_salt('0x0107') == bytes(30) + b'\x01\x07'
+    assert normalize_salt(b'\x01') == bytes(31) + b'\x01'
+    assert normalize_salt('v1') == normalize_salt('v1') != normalize_salt('v2')
+    assert len(normalize_salt('v1')) == 32
+    with pytest.raises(ValueError):
+        normalize_salt(bytes(33))
+
+
+def test_planned_addresses_match_deployment():
+    pytest.importorskip('eth_tester')
+    from Web3_Utils import UserWallet, Web3Utils, config
+    from Web3_Utils.devChainClass import DevChain
+
+    abi = json.loads((TEST_ERC20 / 'abi_test_erc20.json').read_text())
+    bytecode = (TEST_ERC20 / 'byte_test_erc20.txt').read_text().strip()
+    web3_utils = Web3Utils(config.in_process_config)
+    deployer = UserWallet.generate_user_from_private_key('0x' + '42' * 32)
+    DevChain(web3_utils).fund([deployer.public_key], 10 ** 21)
+    nonce = web3_utils.web3.eth.getTransactionCount(deployer.public_key, 'pending')
+
+    planner = DeployPlanner(web3_utils, deployer)
+    first = planner.add_contract('first', abi, bytecode, ['First', 'FST', 18])
+    # Адрес контракта плана можно передать в вызов до деплоя
+    second = planner.add_contract('second', abi, bytecode, ['Second', 'SND', 18])
+    planner.add_call('first', 'approve', second, 5)
+    assert [first, second] == [create_address(deployer.public_key, nonce + i) for i in range(2)]
+
+    result = planner.deploy()
+    assert result['failed'] == []
+    assert result['addresses'] == {'first': first, 'second': second}
+    assert planner.contract('second').functions.name().call() == 'Second'
+    assert planner.contract('first').functions.allowance(deployer.public_key, second).call() == 5
@@ -0,0 +1,60 @@
+import pytest
+
+from Web3_Utils.classWeb3Utils import Web3Utils
+from Web3_Utils.fundingPlannerClass import FundingPlanner
+
+ALICE = '0x' + '0a' * 20
+BOB = '0x' + '0b' * 20
+CAROL = '0x' + '0c' * 20
+
+
+class FakeWeb3Utils:
+    """
+    Заменяет пакетные чтения Web3Utils балансами из словарей и запоминает выполненные запросы.
+    """
+    to_int = staticmethod(Web3Utils.to_int)
+
+    def __init__(self, native, tokens):
+        self.native = native
+        self.tokens = tokens
+        self.batches = []
+
+    def rpc_batch(self, calls):
+        self.batches.append(calls)
+        # Как у HTTP-провайдера: числа возвращаются hex-строками
+        return [hex(self.native[params[0]]) for _, params in calls]
+
+    def batch_call(self, calls):
+        self.batches.append(calls)
+        return [self.tokens[args[0]] for _, args in calls]
+
+
+def test_plan_requests_only_shortfalls():
+    web3_utils = FakeWeb3Utils(native={ALICE: 10, BOB: 100, CAROL: 0}, tokens={ALICE: 5, BOB: 0, CAROL: 7})
+    planner = FundingPlanner(web3_utils, faucets=[object()])
+
+    transfers = planner.plan([(ALICE, 100, 5), (BOB, 100, 3), (CAROL, 0, 10)])
+
+    assert transfers == [('native', ALICE, 90), ('token', BOB, 3), ('token', CAROL, 3)]
+    # Все балансы читаются двумя пакетными запросами
+    assert [len(batch) for batch in web3_utils.batches] == [3, 3]
+    assert [method for method, _ in web3_utils.batches[0]] == ['eth_getBalance'] * 3
+    assert [method for method, _ in web3_utils.batches[1]] == ['balanceOf'] * 3
+
+
+def test_plan_skips_token_balances_when_no_tokens_requested():
+    web3_utils = FakeWeb3Utils(native={ALICE: 0, BOB: 50}, tokens={})
+    planner = FundingPlanner(web3_utils, faucets=[object()])
+
+    assert planner.plan([(ALICE, 50, 0), (BOB, 50, 0)]) == [('native', ALICE, 50)]
+    assert len(web3_utils.batches) == 1
+
+
+def test_plan_with_funded_targets_is_empty():
+    web3_utils = FakeWeb3Utils(native={ALICE: 10 ** 18}, tokens={ALICE: 10 ** 18})
+    assert FundingPlanner(web3_utils, faucets=[object()]).plan([(ALICE, 10 ** 18, 10 ** 18)]) == []
+
+
+def test_planner_requires_faucet():
+    with pytest.raises(ValueError):
+        FundingPlanner(FakeWeb3Utils({}, {}), faucets=[])
@@ -0,0 +1,120 @@
+from eth_abi import encode_abi
+from hexbytes import HexBytes
+
+from Web3_Utils.preflightClass import (ERROR_SELECTOR, PANIC_SELECTOR, GasEstimateCache, decode_revert_reason,
+                                       revert_data_from_error)
+
+TOKEN = '0x34829AFe060AF59569225b009caCd1184cE0510a'
+OTHER = '0x6ac7ea33f8831ea9dcc53393aaa88b25a785dbf0'
+
+
+def test_key_includes_chain_and_normalizes_address():
+    cache = GasEstimateCache()
+    key = cache.key(1, TOKEN, 'transfer', (OTHER, 10))
+    assert key == cache.key(1, TOKEN.lower(), 'transfer', (OTHER, 10))
+    assert key != cache.key(5, TOKEN, 'transfer', (OTHER, 10))
+    assert key != cache.key(1, OTHER, 'transfer', (OTHER, 10))
+    assert key != cache.key(1, TOKEN, 'approve', (OTHER, 10))
+
+
+def test_key_uses_argument_shape_not_values():
+    cache = GasEstimateCache()
+    assert cache.key(1, TOKEN, 'transfer', (OTHER, 10)) == cache.key(1, TOKEN, 'transfer', (TOKEN, 10 ** 30))
+    assert cache.key(1, TOKEN, 'setName', ('abc',)) != cache.key(1, TOKEN, 'setName', ('abcd',))
+    assert cache.key(1, TOKEN, 'batch', ([1, 2],)) != cache.key(1, TOKEN, 'batch', ([1, 2, 3],))
+
+
+def test_same_address_on_other_chain_does_not_share_estimate():
+    cache = GasEstimateCache(margin=1.5, extra=1000)
+    assert cache.put(cache.key(1, TOKEN, 'transfer', (OTHER, 1)), 50000) == 76000
+    assert cache.get(cache.key(1, TOKEN, 'transfer', (OTHER, 2))) == 76000
+    assert cache.get(cache.key(10, TOKEN, 'transfer', (OTHER, 1))) is None
+
+
+def test_put_keeps_largest_estimate():
+    cache = GasEstimateCache(margin=1, extra=0)
+    key = cache.key(1, TOKEN, 'transfer', (OTHER, 1))
+    cache.put(key, 50000)
+    assert cache.put(key, 30000) == 50000
+
+
+def test_max_limit_is_per_chain_and_contract():
+    cache = GasEstimateCache(margin=1, extra=100)
+    cache.put(cache.key(1, TOKEN, 'transfer', (OTHER, 1)), 50000)
+    cache.put(cache.key(1, TOKEN, 'mint', (OTHER, 1)), 70000)
+    cache.put(cache.key(5, TOKEN, 'mint', (OTHER, 1)), 90000)
+    assert cache.max_limit(1, TOKEN.lower()) == 70100
+    assert cache.max_limit(5, TOKEN) == 90100
+    assert cache.max_limit(1, OTHER) is None
+
+
+def test_invalidate_by_chain_and_address():
+    cache = GasEstimateCache()
+    keys = [cache.key(chain_id, address, 'transfer', (OTHER, 1)) for chain_id in (1, 5) for address in (TOKEN, OTHER)]
+    for key in keys:
+        cache.put(key, 50000)
+
+    cache.invalidate(TOKEN, chain_id=1)
+    assert [cache.get(key) is None for key in keys] == [True, False, False, False]
+
+    cache.invalidate(chain_id=5)
+    assert [cache.get(key) is None for key in keys] == [True, False, True, True]
+
+    cache.invalidate(OTHER.upper().replace('0X', '0x'))
+    assert all(cache.get(key) is None for key in keys)
+
+
+def test_invalidate_without_arguments_clears_cache():
+    cache = GasEstimateCache()
+    key = cache.key(1, TOKEN, 'transfer', (OTHER, 1))
+    cache.put(key, 50000)
+    cache.invalidate()
+    assert cache.get(key) is None
+
+
+REASON_DATA = ERROR_SELECTOR + encode_abi(['string'], ['Insufficient balance']).hex()
+PANIC_DATA = PANIC_SELECTOR + encode_abi(['uint256'], [0x11]).hex()
+
+
+def test_revert_data_from_geth_error():
+    error = {'code': 3, 'message': 'execution reverted: Insufficient balance', 'data': REASON_DATA}
+    message, data = revert_data_from_error(error)
+    assert message == 'execution reverted: Insufficient balance'
+    assert data == HexBytes(REASON_DATA)
+    assert decode_revert_reason(data) == 'Insufficient balance'
+
+
+def test_revert_data_from_hardhat_error():
+    error = {
+        'code': -32603,
+        'message': "Error: VM Exception while processing transaction: reverted with panic code 0x11",
+        'data': {'message': 'reverted with panic code 0x11', 'data': PANIC_DATA},
+    }
+    message, data = revert_data_from_error(error)
+    assert message == error['message']
+    assert data == HexBytes(PANIC_DATA)
+    assert decode_revert_reason(data) == 'Panic(0x11): arithmetic overflow or underflow'
+
+
+def test_revert_data_from_ganache_error():
+    tx_hash = '0x' + 'ab' * 32
+    error = {
+        'code': -32000,
+        'message': 'VM Exception while processing transaction: revert Insufficient balance',
+        'data': {
+            tx_hash: {'error': 'revert', 'program_counter': 130, 'return': REASON_DATA,
+                      'reason': 'Insufficient balance'},
+            'stack': 'RuntimeError: VM Exception while processing transaction',
+            'name': 'RuntimeError',
+        },
+    }
+    message, data = revert_data_from_error(error)
+    assert message == error['message']
+    assert decode_revert_reason(data) == 'Insufficient balance'
+
+
+def test_revert_data_without_payload():
+    assert revert_data_from_error({'code': -32000, 'message': 'execution reverted'}) == ('execution reverted', None)
+    # Пустой откат (revert() без причины) и ошибки не в формате JSON-RPC
+    assert revert_data_from_error({'code': 3, 'message': 'execution reverted', 'data': '0x'})[1] is None
+    assert revert_data_from_error('connection reset') == ('connection reset', None)
@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+from web3.exceptions import TimeExhausted
+
+from Web3_Utils.subscriptionClass import ReceiptWaiter
+
+TX_HASH = '0x' + 'ab' * 32
+
+
+class FakeClient:
+    ws_url = 'ws://fake'
+
+    def __init__(self):
+        self.callbacks = []
+
+    def subscribe(self, params, callback):
+        self.callbacks.append(callback)
+        return len(self.callbacks)
+
+    def new_head(self):
+        for callback in self.callbacks:
+            callback({'number': '0x5'})
+
+
+class FakeWeb3Utils:
+    def __init__(self):
+        self.mined = threading.Event()
+
+    def get_transaction_receipts(self, tx_hashes):
+        if not self.mined.is_set():
+            return [None] * len(tx_hashes)
+        return [{'transactionHash': tx_hash, 'blockNumber': '0x5', 'status': '0x1'} for tx_hash in tx_hashes]
+
+
+class FastReceiptWaiter(ReceiptWaiter):
+    fallback_interval = 0.05
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_two_waiters_on_same_hash_both_get_receipt():
+    client, web3_utils = FakeClient(), FakeWeb3Utils()
+    waiter = FastReceiptWaiter(web3_utils, client)
+    receipts = []
+    threads = [threading.Thread(target=lambda: receipts.append(waiter.wait(TX_HASH, timeout=5))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: waiter._waiters.get(TX_HASH) == 2)
+
+    web3_utils.mined.set()
+    client.new_head()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(receipts) == 2
+    assert all(receipt['blockNumber'] == 5 and receipt['status'] == 1 for receipt in receipts)
+    # Квитанция удаляется после того, как ее получили все ожидающие
+    assert waiter._receipts == {} and waiter._waiters == {}
+
+
+def test_wait_times_out_and_forgets_transaction():
+    waiter = FastReceiptWaiter(FakeWeb3Utils(), FakeClient())
+    with pytest.raises(TimeExhausted):
+        waiter.wait(bytes.fromhex('ab' * 32), timeout=0.2)
+    assert waiter._receipts == {} and waiter._waiters == {}